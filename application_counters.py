@@ -0,0 +1,148 @@
+"""
+Per-job application counters.
+
+Jobs keep an applicationCount and a statusCounts map (status -> count)
+instead of an ever-growing array of application ids. The counters are
+updated with $inc when an application is created or changes status, and
+per-job application listings query the indexed applications collection.
+
+Run this module directly to backfill the counters for existing jobs from the
+applications collection and drop the legacy applications arrays.
+"""
+from bson.objectid import ObjectId
+import datetime
+from pymongo import ReturnDocument, UpdateOne
+import application_view
+
+
+def record_application(db, job_id, status="pending"):
+    """Count a newly inserted application on its job."""
+    db.jobs.update_one(
+        {"_id": ObjectId(job_id)},
+        {"$inc": {"applicationCount": 1, f"statusCounts.{status}": 1}}
+    )
+
+
+def change_status(db, application_id, new_status, fields=None):
+    """
+    Set an application's status (plus any extra fields) and move it between
+    the job's status counters. The status condition makes the transition
+    atomic, so concurrent updates count each change once. Returns the updated
+    application, or None if it does not exist.
+    """
+    application_id = ObjectId(application_id)
+    update = {"$set": {"status": new_status, **(fields or {})}}
+    previous = db.applications.find_one_and_update(
+        {"_id": application_id, "status": {"$ne": new_status}},
+        update,
+        projection={"jobId": 1, "status": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is not None:
+        db.jobs.update_one(
+            {"_id": ObjectId(previous["jobId"])},
+            {"$inc": {
+                f"statusCounts.{previous.get('status') or 'pending'}": -1,
+                f"statusCounts.{new_status}": 1
+            }}
+        )
+    else:
+        # Already in this status; still record the other fields
+        db.applications.update_one({"_id": application_id}, update)
+    application_view.invalidate(application_id)
+    return db.applications.find_one({"_id": application_id}, {"status": 1, "jobId": 1})
+
+
+def change_statuses(db, changes, fields=None):
+    """
+    Apply many status changes with one bulk_write and move the job counters
+    with another. changes is a list of (application, new_status, extra_fields)
+    where application is the document as read, with _id, jobId and status.
+
+    Each update is conditional on the status that was read, like
+    change_status(). Applications created before the status field existed
+    count as pending. Returns the ids of applications that another request
+    changed in the meantime; those are left alone and not counted.
+    """
+    if not changes:
+        return set()
+    # Written with every update of this call, so the applied ones can be told apart
+    token = ObjectId()
+    now = datetime.datetime.utcnow()
+
+    operations = []
+    moves = []
+    for application, new_status, extra_fields in changes:
+        previous_status = application.get("status") or "pending"
+        # A legacy application without a status still matches as pending
+        status_filter = application.get("status") or {"$in": [None, "pending"]}
+        update = {"$set": {
+            "status": new_status, "updated_at": now, "status_change_token": token,
+            **(fields or {}), **(extra_fields or {})
+        }}
+        operations.append(UpdateOne({"_id": application["_id"], "status": status_filter}, update))
+        if previous_status != new_status:
+            moves.append((application, previous_status, new_status))
+
+    result = db.applications.bulk_write(operations, ordered=False)
+    application_view.invalidate(*[application["_id"] for application, _, _ in changes])
+    conflicts = set()
+    if result.matched_count < len(operations):
+        applied = {
+            doc["_id"] for doc in db.applications.find(
+                {"_id": {"$in": [application["_id"] for application, _, _ in changes]}, "status_change_token": token},
+                {"_id": 1}
+            )
+        }
+        conflicts = {application["_id"] for application, _, _ in changes if application["_id"] not in applied}
+
+    deltas = {}
+    for application, previous_status, new_status in moves:
+        if application["_id"] in conflicts:
+            continue
+        job_deltas = deltas.setdefault(str(application["jobId"]), {})
+        job_deltas[f"statusCounts.{previous_status}"] = job_deltas.get(f"statusCounts.{previous_status}", 0) - 1
+        job_deltas[f"statusCounts.{new_status}"] = job_deltas.get(f"statusCounts.{new_status}", 0) + 1
+    job_operations = [
+        UpdateOne({"_id": ObjectId(job_id)}, {"$inc": {key: value for key, value in job_deltas.items() if value}})
+        for job_id, job_deltas in deltas.items()
+        if any(job_deltas.values())
+    ]
+    if job_operations:
+        db.jobs.bulk_write(job_operations, ordered=False)
+    return conflicts
+
+
+def backfill_counters(db, batch_size=500):
+    """Recompute applicationCount and statusCounts for every job and drop the old arrays."""
+    counts = {}
+    pipeline = [{"$group": {"_id": {"jobId": "$jobId", "status": "$status"}, "count": {"$sum": 1}}}]
+    for row in db.applications.aggregate(pipeline):
+        job_counts = counts.setdefault(row["_id"]["jobId"], {})
+        job_counts[row["_id"].get("status") or "pending"] = row["count"]
+
+    updated = 0
+    operations = []
+    for job in db.jobs.find({}, {"_id": 1}):
+        status_counts = counts.get(str(job["_id"]), {})
+        operations.append(UpdateOne(
+            {"_id": job["_id"]},
+            {
+                "$set": {"applicationCount": sum(status_counts.values()), "statusCounts": status_counts},
+                "$unset": {"applications": ""}
+            }
+        ))
+        if len(operations) >= batch_size:
+            updated += db.jobs.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += db.jobs.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+if __name__ == "__main__":
+    from pymongo import MongoClient
+
+    client = MongoClient("mongodb://localhost:27017/")
+    count = backfill_counters(client["jobmatchdb"])
+    print(f"Backfilled application counters on {count} jobs")
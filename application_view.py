@@ -0,0 +1,171 @@
+"""
+Applicant-facing view of an application, shared by both services.
+
+auth.py used to read the application and then ask the job matching service,
+which read the same document again, for the feedback fields. Both services
+now serve the application from one projected read:
+- build_view() formats it for auth's /api/applications/status
+- build_feedback_view() keeps the snake_case format of the job matching
+  service's /api/get-application-feedback
+
+Projected documents are cached per application for
+APPLICATION_VIEW_CACHE_TTL seconds.
+Code that changes an application's status, analysis or feedback calls
+invalidate(), which drops the entry in the current process. The other
+service's cache expires within the TTL. Applications still waiting for the
+job matching service's workers (no analysis yet, or feedback queued) are
+not cached, so the worker's write shows up straight away in auth.py too.
+"""
+import os
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from llm_cache import LRUCache
+
+load_dotenv()
+
+APPLICATION_VIEW_CACHE_TTL = int(os.getenv("APPLICATION_VIEW_CACHE_TTL", "10"))  # seconds
+APPLICATION_VIEW_CACHE_MAX_ENTRIES = int(os.getenv("APPLICATION_VIEW_CACHE_MAX_ENTRIES", "4096"))
+
+# Only the fields the view needs; resumes and full analyses stay on the server
+VIEW_PROJECTION = {
+    "applicantId": 1,
+    "jobTitle": 1,
+    "companyName": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "matchScore": 1,
+    "feedback_status": 1,
+    "rejection_feedback": 1,
+    "acceptance_feedback": 1,
+    "analysis.overall_match_score": 1,
+    "analysis.missing_skills": 1,
+    "analysis.improvement_areas": 1,
+    "analysis.strengths": 1
+}
+
+# Where each final decision's feedback is stored
+FEEDBACK_FIELDS = {"rejected": "rejection_feedback", "shortlisted": "acceptance_feedback"}
+
+view_cache = LRUCache(max_size=APPLICATION_VIEW_CACHE_MAX_ENTRIES, ttl=APPLICATION_VIEW_CACHE_TTL)
+
+
+def _settled(application):
+    """True once no worker is about to write this application's analysis or feedback."""
+    return "analysis" in application and application.get("feedback_status") != "queued"
+
+
+def _isoformat(value):
+    return value.isoformat() if value else ""
+
+
+def build_view(application):
+    """Format an application read with VIEW_PROJECTION for the applicant."""
+    status = application.get("status", "pending")
+    analysis = application.get("analysis") or {}
+    view = {
+        "id": str(application["_id"]),
+        "jobTitle": application.get("jobTitle", ""),
+        "companyName": application.get("companyName", ""),
+        "status": status,
+        "appliedAt": _isoformat(application.get("created_at")),
+        "updatedAt": _isoformat(application.get("updated_at")),
+        "matchScore": application.get("matchScore", 0)
+    }
+    if application.get("feedback_status"):
+        view["feedbackStatus"] = application["feedback_status"]
+
+    if status == "rejected" and "rejection_feedback" in application:
+        view["feedback"] = application["rejection_feedback"]
+        # Improvement suggestions from the analysis
+        if analysis:
+            view["missingSkills"] = analysis.get("missing_skills", [])
+            view["improvementAreas"] = analysis.get("improvement_areas", [])
+    elif status == "shortlisted" and "acceptance_feedback" in application:
+        view["feedback"] = application["acceptance_feedback"]
+        # Strengths from the analysis
+        if analysis:
+            view["strengths"] = analysis.get("strengths", [])
+    return view
+
+
+def build_feedback_view(application):
+    """Format an application read with VIEW_PROJECTION in the /api/get-application-feedback schema."""
+    status = application.get("status", "pending")
+    analysis = application.get("analysis")
+    view = {
+        "status": status,
+        "jobTitle": application.get("jobTitle", ""),
+        "companyName": application.get("companyName", ""),
+        "appliedAt": application.get("created_at"),
+        "updatedAt": application.get("updated_at")
+    }
+    if status == "rejected" and "rejection_feedback" in application:
+        view["feedback"] = application["rejection_feedback"]
+        # Improvement suggestions from the analysis
+        if analysis is not None:
+            view["match_score"] = analysis.get("overall_match_score", 0)
+            view["missing_skills"] = analysis.get("missing_skills", [])
+            view["improvement_areas"] = analysis.get("improvement_areas", [])
+    elif status == "shortlisted" and "acceptance_feedback" in application:
+        view["feedback"] = application["acceptance_feedback"]
+        # Strengths from the analysis
+        if analysis is not None:
+            view["match_score"] = analysis.get("overall_match_score", 0)
+            view["strengths"] = analysis.get("strengths", [])
+    return view
+
+
+def get_application(db, application_id, applicant_id=None):
+    """
+    Return the projected application (VIEW_PROJECTION), or None if it does not
+    exist or, when applicant_id is given, belongs to someone else.
+    """
+    application_id = str(application_id)
+    application = view_cache.get(application_id)
+    if application is None:
+        application = db.applications.find_one({"_id": ObjectId(application_id)}, VIEW_PROJECTION)
+        if not application:
+            return None
+        if _settled(application):
+            view_cache.set(application_id, application)
+    if applicant_id is not None and application.get("applicantId") != str(applicant_id):
+        return None
+    return application
+
+
+def get_view(db, application_id, applicant_id=None):
+    """build_view() of one application, or None (see get_application)."""
+    application = get_application(db, application_id, applicant_id)
+    return build_view(application) if application else None
+
+
+def get_feedback_view(db, application_id):
+    """build_feedback_view() of one application, or None if it does not exist."""
+    application = get_application(db, application_id)
+    return build_feedback_view(application) if application else None
+
+
+def mark_feedback_queued(db, application_ids, status):
+    """
+    Set feedback_status "queued" on the applications that still have status
+    and don't already have that decision's feedback ready. Call it before
+    the feedback task is enqueued so a fast worker's "ready" always wins.
+    """
+    db.applications.update_many(
+        {
+            "_id": {"$in": [ObjectId(application_id) for application_id in application_ids]},
+            "status": status,
+            "$or": [
+                {"feedback_status": {"$ne": "ready"}},
+                {FEEDBACK_FIELDS[status]: {"$exists": False}}
+            ]
+        },
+        {"$set": {"feedback_status": "queued"}}
+    )
+    invalidate(*application_ids)
+
+
+def invalidate(*application_ids):
+    for application_id in application_ids:
+        view_cache.delete(str(application_id))
@@ -1,11 +1,20 @@
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
-from PyPDF2 import PdfReader
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import re
 import json
+import time
+import hashlib
+import threading
+import document_extraction
+import extraction_executor
+import model_registry
+import skill_scoring
+import skill_taxonomy
+import text_cache
+from llm_cache import response_cache
 
 # Load environment variables and configure API
 load_dotenv()
@@ -15,45 +24,37 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY environment variable not set")
 
-# Configure Gemini API
-genai.configure(api_key=GOOGLE_API_KEY)
+# Configure Gemini API; models are shared through the registry
+model_registry.configure(GOOGLE_API_KEY)
 
-# Set default model configuration
-generation_config = {
-    "temperature": 0.2,  # Lower temperature for more consistent outputs
-    "top_p": 0.95,
-    "top_k": 64,
-    "max_output_tokens": 8192,
-}
+# Load the skill taxonomy at startup; edits to the file are picked up while running
+skill_taxonomy.get_taxonomy()
 
-# Initialize model
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-pro", 
-    generation_config=generation_config
+# Fan out the independent Gemini calls of an analysis on a bounded pool
+CONCURRENT_ANALYSIS = os.getenv("ATS_CONCURRENT_ANALYSIS", "true").lower() == "true"
+ANALYSIS_MAX_WORKERS = int(os.getenv("ATS_ANALYSIS_MAX_WORKERS", "8"))
+
+# Per-call timeouts in seconds, measured from when the call starts running
+MAIN_ANALYSIS_TIMEOUT = float(os.getenv("ATS_MAIN_ANALYSIS_TIMEOUT", "90"))
+SKILLS_TIMEOUT = float(os.getenv("ATS_SKILLS_TIMEOUT", "30"))
+RECOMMENDATIONS_TIMEOUT = float(os.getenv("ATS_RECOMMENDATIONS_TIMEOUT", "30"))
+
+analysis_executor = ThreadPoolExecutor(
+    max_workers=ANALYSIS_MAX_WORKERS,
+    thread_name_prefix="gemini-analysis"
 )
 
+# Extracted PDF text keyed by file hash (this service has no database, so memory only)
+resume_text_cache = text_cache.TextCache()
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
 # Function to get Gemini output
 def get_gemini_output(pdf_text, prompt):
     try:
-        # Configure the model with the latest settings
-        generation_config = {
-            "temperature": 0.2,  # Lower temperature for more consistent outputs
-            "top_p": 0.95,
-            "top_k": 64,
-            "max_output_tokens": 8192,
-        }
-        
-        # Always reinitialize the model to use the latest API key
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-pro",
-            generation_config=generation_config
-        )
-        
-        response = model.generate_content([pdf_text, prompt])
-        return response.text
+        # Uses the shared model; identical prompts are served from the response cache
+        return model_registry.generate_text([pdf_text, prompt])
     except Exception as e:
         print(f"Error calling Gemini API: {str(e)}")
         # If we still encounter an error, don't use the marker - re-raise to get proper error
@@ -175,97 +176,53 @@ def extract_skills(resume_text, job_description=None):
 
 # Helper function to detect job role from description
 def detect_job_role(job_description):
-    job_roles = {
-        "UI/UX Designer": ["ui", "ux", "user interface", "user experience", "design", "designer", "figma", "sketch"],
-        "Cloud Engineer": ["cloud", "aws", "azure", "gcp", "devops", "infrastructure"],
-        "Frontend Developer": ["frontend", "front-end", "react", "angular", "vue", "ui developer"],
-        "Backend Developer": ["backend", "back-end", "api", "server-side", "database"],
-        "Full Stack Developer": ["full stack", "full-stack", "fullstack", "frontend", "backend"],
-        "Data Scientist": ["data scientist", "machine learning", "ai", "ml", "data analysis"],
-        "Mobile Developer": ["mobile", "ios", "android", "react native", "flutter"],
-        "Product Manager": ["product manager", "product owner", "roadmap", "stakeholder"]
-    }
-    
-    role_scores = {}
-    description_lower = job_description.lower()
-    
-    for role, keywords in job_roles.items():
-        score = 0
-        for keyword in keywords:
-            if keyword.lower() in description_lower:
-                score += 1
-        if score > 0:
-            role_scores[role] = score
-    
-    if not role_scores:
-        return "General"
-    
-    # Return the role with highest score
-    return max(role_scores.items(), key=lambda x: x[1])[0]
+    # Role keyword sets live in the shared skill taxonomy
+    return skill_taxonomy.get_taxonomy().detect_role(job_description, default="General")
+
+# Role that picks the resume analysis prompt: the taxonomy's prompt_roles, checked
+# in file order. Kept apart from the role keywords so the prompt choice stays stable.
+def detect_resume_prompt_role(job_description):
+    return skill_taxonomy.get_taxonomy().detect_prompt_role(job_description, default="general")
 
 # Fallback skill extraction when Gemini fails
 def fallback_skill_extraction(resume_text):
-    common_skills = [
-        "HTML", "CSS", "JavaScript", "TypeScript", "Python", "Java", "C#", "SQL",
-        "React", "Angular", "Vue", "Node.js", "Express", "Django", "Flask",
-        "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Git", "Jenkins",
-        "Figma", "Sketch", "Adobe XD", "Photoshop", "Illustrator",
-        "User Research", "Wireframing", "Prototyping", "UI Design", "UX Design"
-    ]
-    
+    # Deterministic prominence scores, mapped onto the 70-90 band Gemini is asked for
     skills_found = []
-    for skill in common_skills:
-        skill_pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(skill_pattern, resume_text, re.IGNORECASE):
-            import random
-            score = random.randint(70, 90)
-            skills_found.append({"skill": skill, "score": score})
-    
-    # Sort by score
-    skills_found.sort(key=lambda x: x["score"], reverse=True)
-    return skills_found[:5]  # Return top 5 skills
+    for scored in skill_scoring.score_skills(resume_text)[:5]:
+        skills_found.append({"skill": scored["skill"], "score": skill_scoring.scale(scored["score"], 70, 90)})
+    return skills_found  # Return top 5 skills
 
 # Fallback skill-job matching when Gemini fails
 def fallback_skill_job_matching(resume_text, job_description):
     # Extract skills that appear in both resume and job description
-    words_in_job = set(re.findall(r'\b\w+\b', job_description.lower()))
-    
-    # Common technical skills to look for
-    common_skills = [
-        "HTML", "CSS", "JavaScript", "TypeScript", "Python", "Java", "C#", "SQL",
-        "React", "Angular", "Vue", "Node.js", "Express", "Django", "Flask",
-        "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Git", "Jenkins",
-        "Figma", "Sketch", "Adobe XD", "Photoshop", "Illustrator",
-        "User Research", "Wireframing", "Prototyping", "UI Design", "UX Design"
-    ]
+    skills_in_job = skill_taxonomy.get_taxonomy().matcher.match_names(job_description)
     
     skills_found = []
-    for skill in common_skills:
-        skill_pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(skill_pattern, resume_text, re.IGNORECASE):
-            import random
-            # Check if skill is in job description
-            skill_in_job = skill.lower() in words_in_job or any(word in skill.lower() for word in words_in_job)
-            
-            if skill_in_job:
-                score = random.randint(85, 95)
-                skills_found.append({"skill": skill, "score": score, "jobMatch": True})
-            else:
-                score = random.randint(70, 84)
-                skills_found.append({"skill": skill, "score": score, "jobMatch": False})
+    for scored in skill_scoring.score_skills(resume_text):
+        # Same bands as the Gemini prompt: 85-95 for job matches, 70-84 otherwise
+        if scored["skill"] in skills_in_job:
+            score = skill_scoring.scale(scored["score"], 85, 95)
+            skills_found.append({"skill": scored["skill"], "score": score, "jobMatch": True})
+        else:
+            score = skill_scoring.scale(scored["score"], 70, 84)
+            skills_found.append({"skill": scored["skill"], "score": score, "jobMatch": False})
     
-    # Sort: job matches first, then by score
-    skills_found.sort(key=lambda x: (-x.get("jobMatch", False), -x["score"]))
+    # Sort: job matches first, then by score, then by name so ties are stable
+    skills_found.sort(key=lambda x: (-x.get("jobMatch", False), -x["score"], x["skill"]))
     return skills_found[:5]  # Return top 5 skills
 
-# Function to read PDF
+# Function to read PDF, skipping the parse when the same file was seen before
 def read_pdf(file):
     try:
-        pdf_reader = PdfReader(file)
-        pdf_text = ""
-        for page in pdf_reader.pages:
-            pdf_text += page.extract_text()
-        return pdf_text
+        pdf_bytes = file.read()
+        entry = resume_text_cache.get_or_extract(
+            hashlib.sha256(pdf_bytes).hexdigest(),
+            lambda: extraction_executor.extract_pdf(pdf_bytes),
+            "application/pdf"
+        )
+        return entry["text"]
+    except (document_extraction.DocumentTooLarge, extraction_executor.ExtractionTimeout):
+        raise
     except Exception as e:
         return str(e)
 
@@ -318,36 +275,36 @@ def extract_ats_score(response_text):
     # Default score if no match found
     return 75  # A reasonable default
 
+# Default recommendations if we can't get them from Gemini
+DEFAULT_SKILL_RECOMMENDATIONS = [
+    {
+        "skill": "React",
+        "why": "Essential for modern frontend development",
+        "courses": [
+            {"title": "React - The Complete Guide", "platform": "Udemy", "url": "https://www.udemy.com/course/react-the-complete-guide-incl-redux/"},
+            {"title": "Modern React with Redux", "platform": "Udemy", "url": "https://www.udemy.com/course/react-redux/"}
+        ]
+    },
+    {
+        "skill": "Python",
+        "why": "Versatile programming language for data science and backend",
+        "courses": [
+            {"title": "Complete Python Bootcamp", "platform": "Udemy", "url": "https://www.udemy.com/course/complete-python-bootcamp/"},
+            {"title": "Python for Everybody", "platform": "Coursera", "url": "https://www.coursera.org/specializations/python"}
+        ]
+    },
+    {
+        "skill": "SQL",
+        "why": "Data management is crucial for all developers",
+        "courses": [
+            {"title": "The Complete SQL Bootcamp", "platform": "Udemy", "url": "https://www.udemy.com/course/the-complete-sql-bootcamp/"},
+            {"title": "SQL for Data Science", "platform": "Coursera", "url": "https://www.coursera.org/learn/sql-for-data-science"}
+        ]
+    }
+]
+
 # Generate skill development recommendations
 def generate_skill_recommendations(resume_text, job_description=None):
-    # Default recommendations if we can't get them from Gemini
-    default_recommendations = [
-        {
-            "skill": "React",
-            "why": "Essential for modern frontend development",
-            "courses": [
-                {"title": "React - The Complete Guide", "platform": "Udemy", "url": "https://www.udemy.com/course/react-the-complete-guide-incl-redux/"},
-                {"title": "Modern React with Redux", "platform": "Udemy", "url": "https://www.udemy.com/course/react-redux/"}
-            ]
-        },
-        {
-            "skill": "Python",
-            "why": "Versatile programming language for data science and backend",
-            "courses": [
-                {"title": "Complete Python Bootcamp", "platform": "Udemy", "url": "https://www.udemy.com/course/complete-python-bootcamp/"},
-                {"title": "Python for Everybody", "platform": "Coursera", "url": "https://www.coursera.org/specializations/python"}
-            ]
-        },
-        {
-            "skill": "SQL",
-            "why": "Data management is crucial for all developers",
-            "courses": [
-                {"title": "The Complete SQL Bootcamp", "platform": "Udemy", "url": "https://www.udemy.com/course/the-complete-sql-bootcamp/"},
-                {"title": "SQL for Data Science", "platform": "Coursera", "url": "https://www.coursera.org/learn/sql-for-data-science"}
-            ]
-        }
-    ]
-    
     try:
         # Prepare a prompt for Gemini to get skill recommendations
         prompt = f"""
@@ -405,10 +362,83 @@ def generate_skill_recommendations(resume_text, job_description=None):
         except (json.JSONDecodeError, ValueError) as e:
             print(f"Error parsing skill recommendations: {e}")
             print(f"Response was: {response}")
-            return default_recommendations
+            return DEFAULT_SKILL_RECOMMENDATIONS
     except Exception as e:
         print(f"Error generating skill recommendations: {e}")
-        return default_recommendations
+        return DEFAULT_SKILL_RECOMMENDATIONS
+
+# Fallback skills used when skill extraction times out
+def fallback_skills(resume_text, job_description=None):
+    if job_description:
+        return fallback_skill_job_matching(resume_text, job_description)
+    return fallback_skill_extraction(resume_text)
+
+# A call submitted to the analysis pool that records when a worker picks it up,
+# so time spent queued behind other requests' calls doesn't count against it
+class AnalysisCall:
+    def __init__(self, fn, *args):
+        self.started = threading.Event()
+        self.started_at = None
+        self.future = analysis_executor.submit(self._run, fn, args)
+    
+    def _run(self, fn, args):
+        self.started_at = time.monotonic()
+        self.started.set()
+        return fn(*args)
+    
+    def cancel(self):
+        self.future.cancel()
+
+# Wait for a call until its own deadline, falling back if it is late or fails.
+# A call still queued after timeout seconds is cancelled and counts as late.
+def collect_result(call, timeout, label, fallback=None):
+    try:
+        if not call.started.wait(timeout) and call.future.cancel():
+            raise FutureTimeoutError()
+        call.started.wait()
+        remaining = max(0, timeout - (time.monotonic() - call.started_at))
+        return call.future.result(timeout=remaining)
+    except FutureTimeoutError:
+        if fallback is None:
+            raise TimeoutError(f"{label} did not finish within {timeout:g} seconds")
+        print(f"{label} timed out after {timeout:g}s, using fallback")
+        return fallback()
+    except Exception as e:
+        if fallback is None:
+            raise
+        print(f"{label} failed: {e}, using fallback")
+        return fallback()
+
+# Run the main analysis, skill extraction and recommendations Gemini calls
+def run_analysis_calls(pdf_text, prompt, job_description):
+    if not CONCURRENT_ANALYSIS:
+        response = get_gemini_output(pdf_text, prompt)
+        skill_matches = extract_skills(pdf_text, job_description)
+        skill_recommendations = generate_skill_recommendations(pdf_text, job_description)
+        return response, skill_matches, skill_recommendations
+    
+    # The three calls don't depend on each other, so fan them out and join
+    main_call = AnalysisCall(get_gemini_output, pdf_text, prompt)
+    skills_call = AnalysisCall(extract_skills, pdf_text, job_description)
+    recommendations_call = AnalysisCall(generate_skill_recommendations, pdf_text, job_description)
+    
+    # The main analysis has no fallback, so it is the only call allowed to fail the request
+    try:
+        response = collect_result(main_call, MAIN_ANALYSIS_TIMEOUT, "Main analysis")
+    except Exception:
+        skills_call.cancel()
+        recommendations_call.cancel()
+        raise
+    
+    skill_matches = collect_result(
+        skills_call, SKILLS_TIMEOUT, "Skill extraction",
+        fallback=lambda: fallback_skills(pdf_text, job_description)
+    )
+    skill_recommendations = collect_result(
+        recommendations_call, RECOMMENDATIONS_TIMEOUT, "Skill recommendations",
+        fallback=lambda: DEFAULT_SKILL_RECOMMENDATIONS
+    )
+    return response, skill_matches, skill_recommendations
 
 @app.route('/api/analyze-resume', methods=['POST'])
 def analyze_resume():
@@ -426,30 +456,17 @@ def analyze_resume():
     analysis_type = request.form.get('analysisType', 'quick')
     
     try:
-        pdf_text = read_pdf(file)
+        try:
+            pdf_text = read_pdf(file)
+        except document_extraction.DocumentTooLarge as e:
+            return jsonify({"error": str(e)}), 413
+        except extraction_executor.ExtractionTimeout:
+            return jsonify({"error": "Timed out reading the PDF; the file may be damaged"}), 422
         if not pdf_text or len(pdf_text) < 50:
             return jsonify({"error": "Could not extract text from PDF or PDF has insufficient content"}), 400
         
         # Detect job role from job description if available
-        job_role = "general"
-        if job_description:
-            # Check for common job roles in the description
-            job_roles = {
-                "cloud engineer": ["cloud engineer", "cloud infrastructure", "aws engineer", "azure engineer", "gcp engineer", "cloud architect"],
-                "frontend developer": ["frontend", "front-end", "react", "angular", "vue", "ui developer"],
-                "backend developer": ["backend", "back-end", "api developer", "server-side"],
-                "full stack": ["full stack", "full-stack", "fullstack"],
-                "data scientist": ["data scientist", "machine learning", "ai engineer", "ml engineer"],
-                "devops": ["devops", "sre", "site reliability", "platform engineer"],
-                "mobile developer": ["mobile developer", "ios developer", "android developer", "react native"],
-                "security engineer": ["security engineer", "cybersecurity", "information security"]
-            }
-            
-            # Find which role the job description best matches
-            for role, keywords in job_roles.items():
-                if any(keyword.lower() in job_description.lower() for keyword in keywords):
-                    job_role = role
-                    break
+        job_role = detect_resume_prompt_role(job_description)
         
         prompt_prefix = ""
         if job_role == "cloud engineer":
@@ -526,14 +543,12 @@ def analyze_resume():
             Job description: {job_description}
             """
         
-        # Force direct API call - no fallbacks
-        response = get_gemini_output(pdf_text, prompt)
+        # Force direct API call for the main analysis - no fallbacks
+        response, skill_matches, skill_recommendations = run_analysis_calls(pdf_text, prompt, job_description)
         
         # Extract structured data from the response
         ats_score = extract_ats_score(response)
-        skill_matches = extract_skills(pdf_text, job_description)
         suggestions = process_suggestions(response)
-        skill_recommendations = generate_skill_recommendations(pdf_text, job_description)
         
         return jsonify({
             "success": True,
@@ -552,6 +567,14 @@ def analyze_resume():
         traceback.print_exc()
         return jsonify({"error": f"Failed to analyze resume: {str(e)}. Please try again."}), 500
 
+@app.route('/api/llm-cache/stats', methods=['GET'])
+def llm_cache_stats():
+    return jsonify(response_cache.stats())
+
+@app.route('/api/extraction/stats', methods=['GET'])
+def extraction_stats():
+    return jsonify(extraction_executor.stats())
+
 @app.route('/api/skill-recommendations', methods=['POST'])
 def skill_recommendations():
     if 'resumeText' not in request.json:
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, g
 from flask_cors import CORS
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, verify_jwt_in_request, current_user
@@ -8,6 +8,17 @@ import datetime
 from datetime import timedelta
 from bson.objectid import ObjectId
 import json
+import queue
+from pymongo.errors import DuplicateKeyError
+import application_counters
+import application_view
+import db_indexes
+import notification_stream
+import pagination
+import resume_storage
+import service_client
+import task_queue
+from llm_cache import LRUCache
 
 app = Flask(__name__)
 CORS(app, supports_credentials=True)
@@ -43,6 +54,60 @@ def user_lookup_callback(_jwt_header, jwt_data):
     except:
         return identity
 
+# Users resolved from JWT identities are cached briefly across requests
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "30"))  # seconds
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", "1024"))
+user_cache = LRUCache(max_size=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL)
+
+def parse_identity(identity):
+    """Return (email, role) from a JWT identity: a JSON string, a dict or a plain email."""
+    if isinstance(identity, str) and identity.startswith('{'):
+        try:
+            identity = json.loads(identity)
+        except ValueError:
+            print("Failed to parse JSON identity")
+            return None, None
+    if isinstance(identity, dict):
+        return identity.get("email"), identity.get("role")
+    return identity, None
+
+def load_user(email):
+    """Find a user by email, without the password hash, through the user cache."""
+    if not email:
+        return None
+    user = user_cache.get(email)
+    if user is None:
+        user = mongo.db.users.find_one({"email": email}, {"password": 0})
+        if not user:
+            return None
+        user_cache.set(email, user)
+    return dict(user)
+
+def invalidate_user(email):
+    user_cache.delete(email)
+    g.pop("user", None)
+
+def current_identity():
+    """(email, role) of the caller, parsed once per request."""
+    if "identity" not in g:
+        g.identity = parse_identity(get_jwt_identity())
+    return g.identity
+
+def current_user_record():
+    """The caller's user document, loaded once per request."""
+    if "user" not in g:
+        g.user = load_user(current_identity()[0])
+    return g.user
+
+# Operators allowed to read the service stats endpoints, by account email.
+# Roles are chosen at sign-up, so they cannot gate operational data.
+STATS_ALLOWED_EMAILS = {
+    email.strip().lower() for email in os.environ.get("STATS_ALLOWED_EMAILS", "").split(",") if email.strip()
+}
+
+def is_stats_operator(email):
+    return bool(email) and email.lower() in STATS_ALLOWED_EMAILS
+
 # User registration
 @app.route("/api/register", methods=["POST"])
 def register():
@@ -68,8 +133,11 @@ def register():
         "created_at": datetime.datetime.utcnow()
     }
     
-    # Insert into MongoDB
-    mongo.db.users.insert_one(user)
+    # Insert into MongoDB; the unique email index catches concurrent sign-ups
+    try:
+        mongo.db.users.insert_one(user)
+    except DuplicateKeyError:
+        return jsonify({"error": "Email already exists"}), 400
     
     # Create JWT token
     access_token = create_access_token(
@@ -132,30 +200,14 @@ def login():
 @jwt_required()
 def get_user():
     try:
-        current_user_identity = get_jwt_identity()
-        print(f"Current user from JWT (raw): {current_user_identity}")
-        
-        # Handle string or dict identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                print(f"Parsed user identity: {current_user_dict}")
-                email = current_user_dict.get("email")
-            except:
-                print("Failed to parse JSON identity")
-                email = current_user_identity
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            print(f"Using dictionary identity with email: {email}")
-        else:
-            email = current_user_identity
-            print(f"Using string identity: {email}")
+        # Resolve the caller once per request
+        email, role = current_identity()
             
         if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -180,30 +232,14 @@ def get_profile():
         auth_header = request.headers.get('Authorization', '')
         print(f"Auth header: {auth_header}")
         
-        current_user_identity = get_jwt_identity()
-        print(f"Current user from JWT (raw): {current_user_identity}")
-        
-        # Handle string or dict identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                print(f"Parsed user identity: {current_user_dict}")
-                email = current_user_dict.get("email")
-            except:
-                print("Failed to parse JSON identity")
-                email = current_user_identity
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            print(f"Using dictionary identity with email: {email}")
-        else:
-            email = current_user_identity
-            print(f"Using string identity: {email}")
+        # Resolve the caller once per request
+        email, role = current_identity()
         
         if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -247,24 +283,8 @@ def update_profile():
         auth_header = request.headers.get('Authorization', '')
         print(f"Auth header: {auth_header}")
         
-        current_user_identity = get_jwt_identity()
-        print(f"Current user from JWT (raw): {current_user_identity}")
-        
-        # Handle string or dict identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                print(f"Parsed user identity: {current_user_dict}")
-                email = current_user_dict.get("email")
-            except:
-                print("Failed to parse JSON identity")
-                email = current_user_identity
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            print(f"Using dictionary identity with email: {email}")
-        else:
-            email = current_user_identity
-            print(f"Using string identity: {email}")
+        # Resolve the caller once per request
+        email, role = current_identity()
         
         if not email:
             return jsonify({"error": "Invalid user identity"}), 400
@@ -292,8 +312,8 @@ def update_profile():
             
         print(f"Received profile data: {data}")
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -305,6 +325,8 @@ def update_profile():
                 {"_id": user["_id"]},
                 {"$set": {"name": data["name"]}}
             )
+            # Drop the cached user record so the new name is served everywhere
+            invalidate_user(email)
             print(f"Updated user name to: {data['name']}")
         
         # Create profile object - ensure all fields have proper default values
@@ -387,25 +409,9 @@ def expired_token_callback(jwt_header, jwt_payload):
 @jwt_required()
 def create_job():
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        print(f"Current user from JWT (raw): {current_user_identity}")
-        
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
-                userId = current_user_dict.get("userId")
-            except:
-                print("Failed to parse JSON identity")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-            userId = current_user_identity.get("userId")
-        else:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
         # Verify user is a recruiter
@@ -424,8 +430,8 @@ def create_job():
             if not data.get(field):
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -439,7 +445,8 @@ def create_job():
             "recruiterId": str(user["_id"]),
             "recruiterEmail": email,
             "active": True,
-            "applications": [],
+            "applicationCount": 0,
+            "statusCounts": {},
             "created_at": datetime.datetime.utcnow(),
             "updated_at": datetime.datetime.utcnow()
         }
@@ -465,6 +472,57 @@ def create_job():
         traceback.print_exc()
         return jsonify({"error": f"Failed to create job: {str(e)}"}), 500
 
+JOB_FIELDS = {
+    "title", "company", "location", "description", "skills", "recruiterId",
+    "recruiterEmail", "active", "applicationCount", "statusCounts", "created_at", "updated_at"
+}
+JOB_FIELD_ALIASES = {"createdAt": "created_at", "updatedAt": "updated_at"}
+# Jobs created before the application counters may still carry an array of application ids
+JOB_PROJECTION = {"applications": 0}
+# List views also shorten descriptions
+LIST_VIEW_DESCRIPTION_CHARS = 280
+
+def format_job(job, list_view=False):
+    # Convert ObjectIds to strings for JSON serialization and rename fields
+    job["_id"] = str(job["_id"])
+    # Convert created_at to createdAt for frontend compatibility
+    if "created_at" in job:
+        job["createdAt"] = job.pop("created_at").isoformat()
+    if "updated_at" in job:
+        job["updatedAt"] = job.pop("updated_at").isoformat()
+    if list_view and len(job.get("description") or "") > LIST_VIEW_DESCRIPTION_CHARS:
+        job["description"] = job["description"][:LIST_VIEW_DESCRIPTION_CHARS].rstrip() + "…"
+    return job
+
+def jobs_page_response(query):
+    """
+    Return one page of jobs matching the query, newest first.
+    Query parameters: limit, cursor (nextCursor of the previous page),
+    fields (comma-separated) and view=list.
+    """
+    try:
+        limit = pagination.parse_limit(request.args.get("limit"))
+        projection = pagination.parse_fields(request.args.get("fields"), JOB_FIELDS, JOB_FIELD_ALIASES)
+    except pagination.InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
+    
+    list_view = request.args.get("view") == "list"
+    if projection is None:
+        projection = JOB_PROJECTION
+    
+    try:
+        jobs, next_cursor = pagination.fetch_page(
+            mongo.db.jobs, query, cursor=request.args.get("cursor"), limit=limit, projection=projection
+        )
+    except pagination.InvalidPageRequest as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "jobs": [format_job(job, list_view) for job in jobs],
+        "nextCursor": next_cursor,
+        "hasMore": next_cursor is not None
+    }), 200
+
 # Get all jobs for the applicant view
 @app.route("/api/jobs", methods=["GET"])
 @jwt_required()
@@ -478,19 +536,8 @@ def get_jobs():
         if active_only:
             query["active"] = True
         
-        # Get jobs from MongoDB
-        jobs = list(mongo.db.jobs.find(query).sort("created_at", -1))
-        
-        # Convert ObjectIds to strings for JSON serialization and rename fields
-        for job in jobs:
-            job["_id"] = str(job["_id"])
-            # Convert created_at to createdAt for frontend compatibility
-            if "created_at" in job:
-                job["createdAt"] = job.pop("created_at").isoformat()
-            if "updated_at" in job:
-                job["updatedAt"] = job.pop("updated_at").isoformat()
-        
-        return jsonify({"jobs": jobs}), 200
+        # Get one page of jobs from MongoDB
+        return jobs_page_response(query)
     
     except Exception as e:
         print(f"Error getting jobs: {str(e)}")
@@ -501,46 +548,22 @@ def get_jobs():
 @jwt_required()
 def get_recruiter_jobs():
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
-            except:
-                print("Failed to parse JSON identity")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-        else:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
         # Verify user is a recruiter
         if role != "recruiter":
             return jsonify({"error": "Only recruiters can access their posted jobs"}), 403
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
-        # Get jobs from MongoDB where recruiterId matches
-        jobs = list(mongo.db.jobs.find({"recruiterId": str(user["_id"])}).sort("created_at", -1))
-        
-        # Convert ObjectIds to strings for JSON serialization and rename fields
-        for job in jobs:
-            job["_id"] = str(job["_id"])
-            # Convert created_at to createdAt for frontend compatibility
-            if "created_at" in job:
-                job["createdAt"] = job.pop("created_at").isoformat()
-            if "updated_at" in job:
-                job["updatedAt"] = job.pop("updated_at").isoformat()
-        
-        return jsonify({"jobs": jobs}), 200
+        # Get one page of jobs from MongoDB where recruiterId matches
+        return jobs_page_response({"recruiterId": str(user["_id"])})
     
     except Exception as e:
         print(f"Error getting recruiter jobs: {str(e)}")
@@ -551,26 +574,13 @@ def get_recruiter_jobs():
 @jwt_required()
 def get_job(job_id):
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        
         # Check if this is a request from the management page
         is_management = request.args.get('management', 'false').lower() == 'true'
         
-        # Parse user identity if we need to check ownership
+        # Resolve the caller if we need to check ownership
         if is_management:
-            if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-                try:
-                    current_user_dict = json.loads(current_user_identity)
-                    email = current_user_dict.get("email")
-                    role = current_user_dict.get("role")
-                except:
-                    print("Failed to parse JSON identity")
-                    return jsonify({"error": "Invalid user identity"}), 400
-            elif isinstance(current_user_identity, dict):
-                email = current_user_identity.get("email")
-                role = current_user_identity.get("role")
-            else:
+            email, role = current_identity()
+            if not email:
                 return jsonify({"error": "Invalid user identity"}), 400
                 
             # Verify user is a recruiter if management access is requested
@@ -578,27 +588,18 @@ def get_job(job_id):
                 return jsonify({"error": "Only recruiters can manage jobs"}), 403
         
         # Get job from MongoDB
-        job = mongo.db.jobs.find_one({"_id": ObjectId(job_id)})
+        job = mongo.db.jobs.find_one({"_id": ObjectId(job_id)}, JOB_PROJECTION)
         
         if not job:
             return jsonify({"error": "Job not found"}), 404
             
         # If this is a management request, check if the job belongs to this recruiter
         if is_management:
-            user = mongo.db.users.find_one({"email": email})
+            user = current_user_record()
             if not user or str(user["_id"]) != job.get("recruiterId"):
                 return jsonify({"error": "You do not have permission to manage this job"}), 403
         
-        # Convert ObjectId to string for JSON serialization
-        job["_id"] = str(job["_id"])
-        
-        # Convert created_at to createdAt for frontend compatibility
-        if "created_at" in job:
-            job["createdAt"] = job.pop("created_at").isoformat()
-        if "updated_at" in job:
-            job["updatedAt"] = job.pop("updated_at").isoformat()
-        
-        return jsonify({"job": job}), 200
+        return jsonify({"job": format_job(job)}), 200
     
     except Exception as e:
         print(f"Error getting job: {str(e)}")
@@ -609,30 +610,17 @@ def get_job(job_id):
 @jwt_required()
 def apply_for_job(job_id):
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
-            except:
-                print("Failed to parse JSON identity")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-        else:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
         # Verify user is an applicant
         if role != "applicant":
             return jsonify({"error": "Only applicants can apply for jobs"}), 403
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -664,6 +652,12 @@ def apply_for_job(job_id):
         if not data.get("resumeData"):
             return jsonify({"error": "Resume is required"}), 400
         
+        # Store the resume binary once in GridFS; the application keeps a reference
+        try:
+            resume_ref = resume_storage.store_resume(mongo.db, data["resumeData"], filename=data.get("resumeName"))
+        except resume_storage.InvalidResumeData as e:
+            return jsonify({"error": str(e)}), 400
+        
         # Create application document
         application = {
             "jobId": job_id,
@@ -672,7 +666,7 @@ def apply_for_job(job_id):
             "applicantId": str(user["_id"]),
             "applicantName": user.get("name", ""),
             "applicantEmail": email,
-            "resumeData": data.get("resumeData"),
+            "resume": resume_ref,
             "matchScore": data.get("matchScore", 0),
             "status": "pending",
             "notes": "",
@@ -680,57 +674,32 @@ def apply_for_job(job_id):
             "updated_at": datetime.datetime.utcnow()
         }
         
-        # Insert application into MongoDB
-        result = mongo.db.applications.insert_one(application)
+        # Insert application into MongoDB; the unique (jobId, applicantId) index rejects double submits
+        try:
+            result = mongo.db.applications.insert_one(application)
+        except DuplicateKeyError:
+            return jsonify({"error": "You have already applied for this job"}), 400
         application_id = result.inserted_id
         
-        # Add application reference to job
-        mongo.db.jobs.update_one(
-            {"_id": ObjectId(job_id)},
-            {"$push": {"applications": str(application_id)}}
-        )
+        # Count the application on the job
+        application_counters.record_application(mongo.db, job_id, application["status"])
         
         # Return application with ID
         application["_id"] = str(application_id)
         
         print(f"Application submitted successfully for job: {job['title']}")
         
-        # Trigger AI analysis in the background
+        # Queue AI analysis; the job matching service's workers pick it up
         try:
-            import requests
-            import threading
-            
-            def trigger_analysis():
-                try:
-                    # Allow some time for the application to be fully saved
-                    import time
-                    time.sleep(1)
-                    
-                    analysis_url = "http://localhost:5002/api/analyze-application"
-                    analysis_payload = {
-                        "application_id": str(application_id),
-                        "job_id": job_id
-                    }
-                    
-                    response = requests.post(analysis_url, json=analysis_payload)
-                    
-                    if response.status_code == 200:
-                        print(f"AI analysis triggered successfully for application {application_id}")
-                    else:
-                        print(f"AI analysis request failed with status {response.status_code}: {response.text}")
-                        
-                except Exception as e:
-                    print(f"Error triggering AI analysis: {str(e)}")
-            
-            # Start analysis in background thread
-            analysis_thread = threading.Thread(target=trigger_analysis)
-            analysis_thread.daemon = True
-            analysis_thread.start()
-            
-            print("Started background analysis of application")
-            
+            task_queue.enqueue(
+                mongo.db,
+                task_queue.TASK_ANALYSIS,
+                str(application_id),
+                {"application_id": str(application_id), "job_id": job_id}
+            )
+            print(f"Queued AI analysis for application {application_id}")
         except Exception as e:
-            print(f"Failed to trigger AI analysis: {str(e)}")
+            print(f"Failed to queue AI analysis: {str(e)}")
             # Continue with the application process even if analysis fails
         
         return jsonify({
@@ -757,30 +726,17 @@ def apply_for_job(job_id):
 @jwt_required()
 def get_job_applicants(job_id):
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
-            except:
-                print("Failed to parse JSON identity")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-        else:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
         # Verify user is a recruiter
         if role != "recruiter":
             return jsonify({"error": "Only recruiters can access job applicants"}), 403
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -793,8 +749,8 @@ def get_job_applicants(job_id):
         if not job:
             return jsonify({"error": "Job not found or you don't have permission to access it"}), 404
         
-        # Get all applications for this job
-        applications = list(mongo.db.applications.find({"jobId": job_id}))
+        # Get all applications for this job without the resume contents
+        applications = list(mongo.db.applications.find({"jobId": job_id}, {"resumeData": 0}))
         
         # Process applications for the response
         processed_applications = []
@@ -810,9 +766,11 @@ def get_job_applicants(job_id):
             if "updated_at" in app:
                 app["updatedAt"] = app.pop("updated_at").isoformat()
             
-            # Remove resume data for the list view (will be fetched individually)
-            if "resumeData" in app:
-                del app["resumeData"]
+            # Replace the stored resume reference with a download link
+            resume_ref = app.pop("resume", None)
+            if resume_ref:
+                app["resumeUrl"] = f"/api/applications/{app_id}/resume"
+                app["resumeContentType"] = resume_ref.get("contentType", "")
             
             processed_applications.append(app)
         
@@ -827,35 +785,132 @@ def get_job_applicants(job_id):
         traceback.print_exc()
         return jsonify({"error": f"Failed to get job applicants: {str(e)}"}), 500
 
+# Rank a job's applicants by resume relevance (recruiter only)
+@app.route("/api/jobs/<job_id>/ranked-candidates", methods=["GET"])
+@jwt_required()
+def get_ranked_candidates(job_id):
+    try:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
+            return jsonify({"error": "Invalid user identity"}), 400
+        
+        # Verify user is a recruiter
+        if role != "recruiter":
+            return jsonify({"error": "Only recruiters can rank job applicants"}), 403
+        
+        # Load the caller's user record
+        user = current_user_record()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        
+        if not ObjectId.is_valid(job_id):
+            return jsonify({"error": "Invalid job ID"}), 400
+        
+        # Check if job exists and belongs to this recruiter
+        if not mongo.db.jobs.find_one({"_id": ObjectId(job_id), "recruiterId": str(user["_id"])}, {"_id": 1}):
+            return jsonify({"error": "Job not found or you don't have permission to access it"}), 404
+        
+        # The job matching service holds the index
+        params = {"job_id": job_id}
+        if request.args.get("limit"):
+            params["limit"] = request.args.get("limit")
+        try:
+            status_code, body = ai_service.get_json("/api/rank-candidates", params=params)
+        except service_client.ServiceUnavailable as e:
+            print(f"Candidate ranking unavailable: {str(e)}")
+            return jsonify({"error": "Candidate ranking is temporarily unavailable"}), 503
+        
+        if body is None:
+            return jsonify({"error": "Invalid response from the job matching service"}), 502
+        return jsonify(body), status_code
+    
+    except Exception as e:
+        print(f"Error ranking job applicants: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Failed to rank job applicants: {str(e)}"}), 500
+
+# Download the resume of an application (owning recruiter or the applicant)
+@app.route("/api/applications/<application_id>/resume", methods=["GET"])
+@jwt_required()
+def download_resume(application_id):
+    try:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
+            return jsonify({"error": "Invalid user identity"}), 400
+        
+        # Load the caller's user record
+        user = current_user_record()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        
+        application = mongo.db.applications.find_one(
+            {"_id": ObjectId(application_id)},
+            {"jobId": 1, "applicantId": 1, "resume": 1, "resumeData": 1}
+        )
+        if not application:
+            return jsonify({"error": "Application not found"}), 404
+        
+        # Applicants can download their own resume, recruiters the resumes for their jobs
+        if role == "recruiter":
+            job = mongo.db.jobs.find_one(
+                {"_id": ObjectId(application["jobId"]), "recruiterId": str(user["_id"])},
+                {"_id": 1}
+            )
+            if not job:
+                return jsonify({"error": "You don't have permission to access this resume"}), 403
+        elif application.get("applicantId") != str(user["_id"]):
+            return jsonify({"error": "You don't have permission to access this resume"}), 403
+        
+        resume_ref = resume_storage.get_resume_ref(application)
+        if resume_ref:
+            # Stream the file from GridFS chunk by chunk
+            resume_file = resume_storage.open_resume(mongo.db, resume_ref)
+            filename = (resume_ref.get("filename") or "resume").replace('"', '')
+            response = Response(
+                resume_storage.iter_resume_chunks(resume_file),
+                mimetype=resume_ref.get("contentType") or "application/octet-stream"
+            )
+            response.headers["Content-Length"] = str(resume_ref.get("length", 0))
+            response.headers["Content-Disposition"] = f'inline; filename="{filename}"'
+            return response
+        
+        # Older applications still embed the resume as a data URL
+        if application.get("resumeData"):
+            content_type, content = resume_storage.parse_data_url(application["resumeData"])
+            return Response(content, mimetype=content_type)
+        
+        return jsonify({"error": "No resume found for this application"}), 404
+    
+    except FileNotFoundError:
+        return jsonify({"error": "Resume file not found"}), 404
+    except Exception as e:
+        print(f"Error downloading resume: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Failed to download resume: {str(e)}"}), 500
+
+BULK_STATUS_MAX_ITEMS = int(os.environ.get("BULK_STATUS_MAX_ITEMS", "100"))
+APPLICATION_STATUSES = ["pending", "reviewed", "shortlisted", "rejected"]
+
 # Update application status (recruiter only)
 @app.route("/api/applications/<application_id>/status", methods=["PUT"])
 @jwt_required()
 def update_application_status(application_id):
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
-            except:
-                print("Failed to parse JSON identity")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-        else:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
         # Verify user is a recruiter
         if role != "recruiter":
             return jsonify({"error": "Only recruiters can update application status"}), 403
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -872,9 +927,8 @@ def update_application_status(application_id):
         
         # Validate status
         new_status = data["status"]
-        valid_statuses = ["pending", "reviewed", "shortlisted", "rejected"]
-        if new_status not in valid_statuses:
-            return jsonify({"error": f"Invalid status. Must be one of: {', '.join(valid_statuses)}"}), 400
+        if new_status not in APPLICATION_STATUSES:
+            return jsonify({"error": f"Invalid status. Must be one of: {', '.join(APPLICATION_STATUSES)}"}), 400
         
         # Get the application
         application = mongo.db.applications.find_one({"_id": ObjectId(application_id)})
@@ -890,49 +944,34 @@ def update_application_status(application_id):
         if not job:
             return jsonify({"error": "You don't have permission to update this application"}), 403
         
-        # Update the application status
-        result = mongo.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {
-                "$set": {
-                    "status": new_status,
-                    "notes": recruiter_notes,
-                    "updated_at": datetime.datetime.utcnow()
-                }
-            }
+        # Update the application status and the job's status counters
+        updated = application_counters.change_status(
+            mongo.db,
+            application_id,
+            new_status,
+            {"notes": recruiter_notes, "updated_at": datetime.datetime.utcnow()}
         )
         
-        if result.modified_count == 0:
+        if not updated:
             return jsonify({"error": "Failed to update application status"}), 500
             
-        # If this is a final decision (shortlisted or rejected), generate feedback via AI
-        feedback = ""
+        # Feedback on final decisions is written by the job matching service's queue
+        # workers, which attach it to the application and notify the applicant
+        feedback_status = None
         if new_status in ["shortlisted", "rejected"]:
             try:
-                import requests
-                
-                # Call the AI service to generate feedback
-                ai_url = "http://localhost:5002/api/update-application-status"
-                ai_payload = {
-                    "application_id": str(application_id),
-                    "status": new_status,
-                    "notes": recruiter_notes
-                }
-                
-                print(f"Sending AI feedback request for application {application_id} with status {new_status}")
-                response = requests.post(ai_url, json=ai_payload)
-                
-                if response.status_code == 200:
-                    ai_response = response.json()
-                    feedback = ai_response.get("feedback", "")
-                    print(f"AI feedback generated for {new_status} application")
-                else:
-                    print(f"AI feedback request failed with status {response.status_code}: {response.text}")
-                    
+                # Marked before enqueueing so the worker's "ready" is never overwritten
+                application_view.mark_feedback_queued(mongo.db, [application_id], new_status)
+                task_queue.enqueue(
+                    mongo.db,
+                    task_queue.TASK_FEEDBACK,
+                    f"{application_id}:{new_status}",
+                    {"application_id": str(application_id), "status": new_status, "notes": recruiter_notes}
+                )
+                feedback_status = "queued"
+                print(f"Queued AI feedback for application {application_id} with status {new_status}")
             except Exception as e:
-                print(f"Error generating AI feedback: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                print(f"Failed to queue AI feedback: {str(e)}")
                 # Continue with the status update even if feedback generation fails
             
             # Create a notification for the applicant
@@ -942,11 +981,6 @@ def update_application_status(application_id):
                 
                 print(f"Creating notification for applicant {application['applicantId']} about {new_status} status")
                 
-                # Ensure notifications collection exists
-                if "notifications" not in mongo.db.list_collection_names():
-                    print("Creating notifications collection")
-                    mongo.db.create_collection("notifications")
-                
                 # Make sure we have the applicant user ID
                 applicant_id = application.get("applicantId")
                 if not applicant_id:
@@ -954,7 +988,7 @@ def update_application_status(application_id):
                     # Try to find the applicant by email if ID is missing
                     applicant_email = application.get("applicantEmail")
                     if applicant_email:
-                        applicant = mongo.db.users.find_one({"email": applicant_email})
+                        applicant = load_user(applicant_email)
                         if applicant:
                             applicant_id = str(applicant["_id"])
                 
@@ -973,10 +1007,9 @@ def update_application_status(application_id):
                     "timestamp": datetime.datetime.utcnow()
                 }
                 
-                print(f"Notification to be created: {notification}")
-                
-                # Insert notification into MongoDB
+                # Insert notification into MongoDB and push it to open streams
                 mongo.db.notifications.insert_one(notification)
+                notification_broker.publish(notification)
                 print(f"Created notification for applicant {applicant_id} about {new_status} status")
             except Exception as e:
                 print(f"Error creating notification: {str(e)}")
@@ -987,7 +1020,9 @@ def update_application_status(application_id):
         return jsonify({
             "success": True,
             "message": f"Application status updated to {new_status}",
-            "feedback": feedback
+            # Feedback arrives later as a "feedback" notification
+            "feedback": "",
+            "feedbackStatus": feedback_status
         }), 200
     
     except Exception as e:
@@ -996,31 +1031,177 @@ def update_application_status(application_id):
         traceback.print_exc()
         return jsonify({"error": f"Failed to update application status: {str(e)}"}), 500
 
-# Test endpoint to create a notification for current user
-@app.route("/api/test/create-notification", methods=["POST"])
+# Update the status of many applications at once (recruiter only)
+@app.route("/api/applications/bulk-status", methods=["POST"])
 @jwt_required()
-def test_create_notification():
+def bulk_update_application_status():
+    """
+    Accepts {"updates": [{"id", "status", "notes"}, ...]} or the shorthand
+    {"ids": [...], "status": ..., "notes": ...}. Ownership is checked for the
+    whole batch with two $in queries, the changes are written with one
+    bulk_write and the notifications with one insert_many, and feedback for
+    final decisions is queued as one batch. Returns a result per item.
+    """
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
+            return jsonify({"error": "Invalid user identity"}), 400
         
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
+        # Verify user is a recruiter
+        if role != "recruiter":
+            return jsonify({"error": "Only recruiters can update application status"}), 403
+        
+        # Load the caller's user record
+        user = current_user_record()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+        
+        if "updates" in data:
+            updates = data["updates"]
+        elif "ids" in data:
+            updates = [{"id": application_id, "status": data.get("status"), "notes": data.get("notes", "")} for application_id in data["ids"]]
+        else:
+            return jsonify({"error": "Provide updates or ids"}), 400
+        
+        if not isinstance(updates, list) or not updates:
+            return jsonify({"error": "No updates provided"}), 400
+        if len(updates) > BULK_STATUS_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_STATUS_MAX_ITEMS} applications can be updated at once"}), 400
+        
+        # Validate every item before touching the database
+        results = []
+        requested = {}
+        for update in updates:
+            update = update if isinstance(update, dict) else {}
+            result = {"id": str(update.get("id", "")), "status": update.get("status")}
+            results.append(result)
+            if update.get("status") not in APPLICATION_STATUSES:
+                result["error"] = f"Invalid status. Must be one of: {', '.join(APPLICATION_STATUSES)}"
+            elif not ObjectId.is_valid(result["id"]):
+                result["error"] = "Invalid application ID"
+            elif ObjectId(result["id"]) in requested:
+                result["error"] = "Application listed more than once"
+            else:
+                requested[ObjectId(result["id"])] = (result, update.get("notes", ""))
+        
+        # Check ownership of the whole batch: one query for the applications, one for their jobs
+        applications = {
+            application["_id"]: application
+            for application in mongo.db.applications.find(
+                {"_id": {"$in": list(requested)}},
+                {"jobId": 1, "status": 1, "applicantId": 1, "jobTitle": 1, "companyName": 1}
+            )
+        }
+        job_ids = {ObjectId(application["jobId"]) for application in applications.values()}
+        jobs = {
+            str(job["_id"]): job
+            for job in mongo.db.jobs.find(
+                {"_id": {"$in": list(job_ids)}, "recruiterId": str(user["_id"])},
+                {"title": 1, "company": 1}
+            )
+        }
+        
+        changes = []
+        for application_id, (result, notes) in requested.items():
+            application = applications.get(application_id)
+            if not application:
+                result["error"] = "Application not found"
+            elif str(application["jobId"]) not in jobs:
+                result["error"] = "You don't have permission to update this application"
+            else:
+                changes.append((application, result["status"], {"notes": notes}))
+        
+        # One bulk_write for the applications and one for the job counters
+        conflicts = application_counters.change_statuses(mongo.db, changes)
+        
+        now = datetime.datetime.utcnow()
+        notifications = []
+        feedback_tasks = []
+        final = []
+        for application, new_status, fields in changes:
+            result = requested[application["_id"]][0]
+            if application["_id"] in conflicts:
+                result["error"] = "Application was updated by another request"
+                continue
+            result["updated"] = True
+            if new_status not in ["shortlisted", "rejected"]:
+                continue
+            final.append((application["_id"], new_status))
+            feedback_tasks.append((
+                f"{application['_id']}:{new_status}",
+                {"application_id": str(application["_id"]), "status": new_status, "notes": fields["notes"]}
+            ))
+            if not application.get("applicantId"):
+                print(f"No applicantId found in application {application['_id']}; skipping notification")
+                continue
+            job = jobs[str(application["jobId"])]
+            notifications.append({
+                "userId": application["applicantId"],
+                "type": "status",
+                "jobId": str(application["jobId"]),
+                "jobTitle": application.get("jobTitle", job.get("title", "Job")),
+                "company": application.get("companyName", job.get("company", "Company")),
+                "status": "accepted" if new_status == "shortlisted" else new_status,
+                "read": False,
+                "timestamp": now
+            })
+        
+        if notifications:
             try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
+                mongo.db.notifications.insert_many(notifications)
+                for notification in notifications:
+                    notification_broker.publish(notification)
             except Exception as e:
-                print(f"Failed to parse JSON identity: {str(e)}")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-        else:
+                print(f"Error creating notifications: {str(e)}")
+                # Continue even if notification creation fails
+        
+        # Feedback on final decisions is written by the job matching service's queue workers
+        if feedback_tasks:
+            try:
+                # Marked before enqueueing so the workers' "ready" is never overwritten
+                for status in ["shortlisted", "rejected"]:
+                    application_ids = [application_id for application_id, decision in final if decision == status]
+                    if application_ids:
+                        application_view.mark_feedback_queued(mongo.db, application_ids, status)
+                task_queue.enqueue_many(mongo.db, task_queue.TASK_FEEDBACK, feedback_tasks)
+                for application_id, _ in final:
+                    requested[application_id][0]["feedbackStatus"] = "queued"
+            except Exception as e:
+                print(f"Failed to queue AI feedback: {str(e)}")
+                # Continue with the status update even if feedback generation fails
+        
+        updated = sum(1 for result in results if result.get("updated"))
+        print(f"Bulk status update: {updated} of {len(results)} applications updated")
+        return jsonify({
+            "success": True,
+            "updated": updated,
+            "failed": len(results) - updated,
+            "results": results
+        }), 200
+    
+    except Exception as e:
+        print(f"Error updating application statuses: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Failed to update application statuses: {str(e)}"}), 500
+
+# Test endpoint to create a notification for current user
+@app.route("/api/test/create-notification", methods=["POST"])
+@jwt_required()
+def test_create_notification():
+    try:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -1041,14 +1222,9 @@ def test_create_notification():
             "timestamp": datetime.datetime.utcnow()
         }
         
-        # Ensure notifications collection exists
-        if "notifications" not in mongo.db.list_collection_names():
-            mongo.db.create_collection("notifications")
-            mongo.db.notifications.create_index("timestamp")
-            mongo.db.notifications.create_index("userId")
-        
-        # Insert notification
+        # Insert notification and push it to open streams
         result = mongo.db.notifications.insert_one(notification)
+        notification_broker.publish(notification)
         
         return jsonify({
             "success": True,
@@ -1062,99 +1238,157 @@ def test_create_notification():
         traceback.print_exc()
         return jsonify({"error": f"Failed to create test notification: {str(e)}"}), 500
 
+def time_ago(timestamp, now):
+    # Human-readable age of a notification
+    diff = now - timestamp
+    hours = diff.seconds // 3600
+    minutes = (diff.seconds % 3600) // 60
+    if diff.days > 0:
+        return f"{diff.days} days ago"
+    elif hours > 0:
+        return f"{hours} hours ago"
+    elif minutes > 0:
+        return f"{minutes} minutes ago"
+    return "just now"
+
+def format_notification(notification, now):
+    notification["id"] = str(notification.pop("_id"))
+    timestamp = notification.get("timestamp")
+    if isinstance(timestamp, datetime.datetime):
+        notification["timestamp"] = timestamp.isoformat()
+        notification["timestamp_readable"] = time_ago(timestamp, now)
+    return notification
+
+def serialize_notification(notification):
+    return json.dumps(format_notification(dict(notification), datetime.datetime.utcnow()), default=str)
+
+# Pushes new notifications to open /api/notifications/stream connections
+notification_broker = notification_stream.NotificationBroker(serialize_notification)
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_REPLAY_LIMIT = int(os.environ.get("SSE_REPLAY_LIMIT", "100"))
+
+def sse_event(event_id, data, event="notification"):
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+# Stream new notifications to the current user with Server-Sent Events
+@app.route("/api/notifications/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_notifications():
+    """
+    EventSource cannot set headers, so the token may also be passed as ?jwt=.
+    Reconnecting clients send Last-Event-ID (or ?lastEventId=) and first
+    receive the notifications they missed.
+    """
+    try:
+        user = current_user_record()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        user_id = str(user["_id"])
+        
+        last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+        missed = []
+        if last_event_id:
+            try:
+                missed = list(mongo.db.notifications.find(
+                    {"userId": user_id, "_id": {"$gt": ObjectId(last_event_id)}}
+                ).sort("_id", 1).limit(SSE_REPLAY_LIMIT))
+            except Exception:
+                return jsonify({"error": "Invalid Last-Event-ID"}), 400
+        
+        notification_broker.start(mongo.db.notifications)
+        try:
+            subscriber = notification_broker.subscribe(user_id)
+        except notification_stream.TooManyConnections as e:
+            return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        print(f"Error opening notification stream: {str(e)}")
+        return jsonify({"error": f"Failed to open notification stream: {str(e)}"}), 500
+    
+    def events():
+        try:
+            # Ask EventSource to reconnect after 3s if the connection drops
+            yield "retry: 3000\n\n"
+            for notification in missed:
+                yield sse_event(notification["_id"], serialize_notification(notification))
+            while True:
+                try:
+                    event_id, data = subscriber.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                yield sse_event(event_id, data)
+        finally:
+            notification_broker.unsubscribe(user_id, subscriber)
+    
+    return Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@app.route("/api/notifications/stream/stats", methods=["GET"])
+@jwt_required()
+def notification_stream_stats():
+    email, role = current_identity()
+    if not email:
+        return jsonify({"error": "Invalid user identity"}), 400
+    if not is_stats_operator(email):
+        return jsonify({"error": "Only operators can view stream stats"}), 403
+    return jsonify(notification_broker.stats()), 200
+
 # Get notifications for current user
 @app.route("/api/notifications", methods=["GET"])
 @jwt_required()
 def get_notifications():
+    """
+    Newest notifications first, one page at a time.
+    Query parameters: limit, before (nextCursor of the previous page) and
+    since (latestCursor of an earlier response) to fetch only newer ones,
+    oldest first; repeat with the new latestCursor while hasMore is true.
+    """
     try:
-        print("Notifications API endpoint called")
-        
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        print(f"User identity: {current_user_identity}")
-        
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
-            except Exception as e:
-                print(f"Failed to parse JSON identity: {str(e)}")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-        else:
-            print(f"Invalid user identity type: {type(current_user_identity)}")
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
-        print(f"Looking up user with email: {email}, role: {role}")
-        
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
-            print(f"User not found with email: {email}")
             return jsonify({"error": "User not found"}), 404
         
-        user_id = str(user["_id"])
-        print(f"Found user with ID: {user_id}")
-        
-        # Get all notifications for this user
-        print(f"Fetching notifications for user ID: {user_id}")
-        query = {"userId": user_id}
-        print(f"Query: {query}")
-        
-        # Check if notifications collection exists
-        if "notifications" not in mongo.db.list_collection_names():
-            print("Notifications collection does not exist - creating it")
-            mongo.db.create_collection("notifications")
-        
-        notifications = list(mongo.db.notifications.find(query).sort("timestamp", -1))
-        print(f"Found {len(notifications)} notifications")
-        
-        # Format notifications for response
-        formatted_notifications = []
-        for notification in notifications:
-            print(f"Processing notification: {notification}")
-            
-            # Convert ObjectId to string
-            notification["id"] = str(notification["_id"])
-            del notification["_id"]
-            
-            # Format timestamp
-            if "timestamp" in notification:
-                try:
-                    # Simple timestamp formatting
-                    timestamp = notification["timestamp"]
-                    notification["timestamp"] = timestamp.isoformat()
-                    
-                    # Generate a human-readable timestamp
-                    now = datetime.datetime.utcnow()
-                    diff = now - timestamp
-                    
-                    days = diff.days
-                    seconds = diff.seconds
-                    hours = seconds // 3600
-                    minutes = (seconds % 3600) // 60
-                    
-                    if days > 0:
-                        notification["timestamp_readable"] = f"{days} days ago"
-                    elif hours > 0:
-                        notification["timestamp_readable"] = f"{hours} hours ago"
-                    elif minutes > 0:
-                        notification["timestamp_readable"] = f"{minutes} minutes ago"
-                    else:
-                        notification["timestamp_readable"] = "just now"
-                except Exception as e:
-                    print(f"Error formatting timestamp: {str(e)}")
-                    notification["timestamp_readable"] = "recently"
-            
-            formatted_notifications.append(notification)
+        query = {"userId": str(user["_id"])}
+        since = request.args.get("since")
+        try:
+            limit = pagination.parse_limit(request.args.get("limit"))
+            if since:
+                # Delta sync: only notifications newer than the client's latest one
+                notifications, has_more = pagination.newer_than(
+                    mongo.db.notifications, query, since, limit=limit, field="timestamp"
+                )
+                next_cursor = None
+            else:
+                notifications, next_cursor = pagination.fetch_page(
+                    mongo.db.notifications, query, cursor=request.args.get("before"), limit=limit, field="timestamp"
+                )
+                has_more = next_cursor is not None
+        except pagination.InvalidPageRequest as e:
+            return jsonify({"error": str(e)}), 400
+        
+        if notifications:
+            # Delta pages run oldest to newest, so the latest is the last one returned
+            latest = notifications[-1] if since else notifications[0]
+            latest_cursor = pagination.encode_cursor(latest, "timestamp")
+        else:
+            latest_cursor = since
         
-        response_data = {"notifications": formatted_notifications}
-        print(f"Returning response: {response_data}")
-        return jsonify(response_data), 200
+        now = datetime.datetime.utcnow()
+        return jsonify({
+            "notifications": [format_notification(notification, now) for notification in notifications],
+            "nextCursor": next_cursor,
+            "latestCursor": latest_cursor,
+            "hasMore": has_more
+        }), 200
     
     except Exception as e:
         print(f"Error getting notifications: {str(e)}")
@@ -1162,35 +1396,84 @@ def get_notifications():
         traceback.print_exc()
         return jsonify({"error": f"Failed to get notifications: {str(e)}"}), 500
 
+# Count unread notifications for current user
+@app.route("/api/notifications/unread-count", methods=["GET"])
+@jwt_required()
+def get_unread_notification_count():
+    try:
+        user = current_user_record()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        
+        # Served from the (userId, read) index
+        count = mongo.db.notifications.count_documents({"userId": str(user["_id"]), "read": False})
+        return jsonify({"unreadCount": count}), 200
+    
+    except Exception as e:
+        print(f"Error counting notifications: {str(e)}")
+        return jsonify({"error": f"Failed to count notifications: {str(e)}"}), 500
+
+# Mark notifications as read
+@app.route("/api/notifications/mark-read", methods=["POST"])
+@jwt_required()
+def mark_notifications_read():
+    """Mark the notifications in "ids" as read, or all of them with {"all": true}."""
+    try:
+        user = current_user_record()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        
+        data = request.get_json(silent=True) or {}
+        query = {"userId": str(user["_id"]), "read": False}
+        if not data.get("all"):
+            ids = data.get("ids")
+            if not isinstance(ids, list) or not ids:
+                return jsonify({"error": "Provide a list of notification ids or \"all\": true"}), 400
+            try:
+                query["_id"] = {"$in": [ObjectId(notification_id) for notification_id in ids]}
+            except Exception:
+                return jsonify({"error": "Invalid notification id"}), 400
+        
+        result = mongo.db.notifications.update_many(
+            query,
+            {"$set": {"read": True, "read_at": datetime.datetime.utcnow()}}
+        )
+        return jsonify({"success": True, "updated": result.modified_count}), 200
+    
+    except Exception as e:
+        print(f"Error marking notifications as read: {str(e)}")
+        return jsonify({"error": f"Failed to mark notifications as read: {str(e)}"}), 500
+
+# Calls to the job matching service share one pooled client with timeouts and a circuit breaker
+ai_service = service_client.ai_service
+
+# Inter-service call metrics: latency, errors and circuit breaker state
+@app.route("/api/ai-service/stats", methods=["GET"])
+@jwt_required()
+def ai_service_stats():
+    email, role = current_identity()
+    if not email:
+        return jsonify({"error": "Invalid user identity"}), 400
+    if not is_stats_operator(email):
+        return jsonify({"error": "Only operators can view service stats"}), 403
+    return jsonify(ai_service.stats()), 200
+
 # Get applicant's application status and feedback
 @app.route("/api/applications/status", methods=["GET"])
 @jwt_required()
 def get_application_status():
     try:
-        # Get current user identity
-        current_user_identity = get_jwt_identity()
-        
-        # Parse user identity
-        if isinstance(current_user_identity, str) and current_user_identity.startswith('{'):
-            try:
-                current_user_dict = json.loads(current_user_identity)
-                email = current_user_dict.get("email")
-                role = current_user_dict.get("role")
-            except:
-                print("Failed to parse JSON identity")
-                return jsonify({"error": "Invalid user identity"}), 400
-        elif isinstance(current_user_identity, dict):
-            email = current_user_identity.get("email")
-            role = current_user_identity.get("role")
-        else:
+        # Resolve the caller once per request
+        email, role = current_identity()
+        if not email:
             return jsonify({"error": "Invalid user identity"}), 400
         
         # Verify user is an applicant
         if role != "applicant":
             return jsonify({"error": "This endpoint is for applicants only"}), 403
         
-        # Find user by email
-        user = mongo.db.users.find_one({"email": email})
+        # Load the caller's user record
+        user = current_user_record()
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -1198,86 +1481,21 @@ def get_application_status():
         application_id = request.args.get('application_id')
         
         if application_id:
-            # Get specific application
-            application = mongo.db.applications.find_one({
-                "_id": ObjectId(application_id),
-                "applicantId": str(user["_id"])
-            })
+            if not ObjectId.is_valid(application_id):
+                return jsonify({"error": "Invalid application ID"}), 400
             
-            if not application:
+            # One projected read (cached per application) replaces the AI service round trip
+            view = application_view.get_view(mongo.db, application_id, applicant_id=str(user["_id"]))
+            if not view:
                 return jsonify({"error": "Application not found or you don't have access"}), 404
             
-            # Get feedback for this application
-            try:
-                import requests
-                
-                # Call the AI service to get feedback
-                ai_url = f"http://localhost:5002/api/get-application-feedback?application_id={application_id}"
-                
-                response = requests.get(ai_url)
-                
-                if response.status_code == 200:
-                    ai_response = response.json()
-                    application_data = ai_response.get("application", {})
-                    
-                    # Format the response
-                    formatted_response = {
-                        "application": {
-                            "id": str(application["_id"]),
-                            "jobTitle": application.get("jobTitle", ""),
-                            "companyName": application.get("companyName", ""),
-                            "status": application.get("status", "pending"),
-                            "appliedAt": application.get("created_at").isoformat() if application.get("created_at") else "",
-                            "updatedAt": application.get("updated_at").isoformat() if application.get("updated_at") else "",
-                            "matchScore": application.get("matchScore", 0)
-                        }
-                    }
-                    
-                    # Add feedback if available
-                    if "feedback" in application_data:
-                        formatted_response["application"]["feedback"] = application_data["feedback"]
-                    
-                    # Add improvement areas if rejected
-                    if application.get("status") == "rejected" and "improvement_areas" in application_data:
-                        formatted_response["application"]["improvementAreas"] = application_data["improvement_areas"]
-                        formatted_response["application"]["missingSkills"] = application_data["missing_skills"]
-                    
-                    # Add strengths if shortlisted
-                    if application.get("status") == "shortlisted" and "strengths" in application_data:
-                        formatted_response["application"]["strengths"] = application_data["strengths"]
-                    
-                    return jsonify(formatted_response), 200
-                else:
-                    # Fallback to basic info if AI service fails
-                    return jsonify({
-                        "application": {
-                            "id": str(application["_id"]),
-                            "jobTitle": application.get("jobTitle", ""),
-                            "companyName": application.get("companyName", ""),
-                            "status": application.get("status", "pending"),
-                            "appliedAt": application.get("created_at").isoformat() if application.get("created_at") else "",
-                            "updatedAt": application.get("updated_at").isoformat() if application.get("updated_at") else "",
-                            "matchScore": application.get("matchScore", 0)
-                        }
-                    }), 200
-                    
-            except Exception as e:
-                print(f"Error getting AI feedback: {str(e)}")
-                # Return basic application info without AI feedback
-                return jsonify({
-                    "application": {
-                        "id": str(application["_id"]),
-                        "jobTitle": application.get("jobTitle", ""),
-                        "companyName": application.get("companyName", ""),
-                        "status": application.get("status", "pending"),
-                        "appliedAt": application.get("created_at").isoformat() if application.get("created_at") else "",
-                        "updatedAt": application.get("updated_at").isoformat() if application.get("updated_at") else "",
-                        "matchScore": application.get("matchScore", 0)
-                    }
-                }), 200
+            return jsonify({"application": view}), 200
         else:
             # Get all applications for this user
-            applications = list(mongo.db.applications.find({"applicantId": str(user["_id"])}))
+            applications = list(mongo.db.applications.find(
+                {"applicantId": str(user["_id"])},
+                {"jobTitle": 1, "companyName": 1, "status": 1, "created_at": 1, "updated_at": 1, "matchScore": 1}
+            ))
             
             # Format response
             formatted_applications = []
@@ -1302,4 +1520,6 @@ def get_application_status():
         return jsonify({"error": f"Failed to get application status: {str(e)}"}), 500
 
 if __name__ == "__main__":
+    with app.app_context():
+        db_indexes.ensure_indexes(mongo.db)
     app.run(debug=True, port=5001) 
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Indexing and ranking speed of the BM25 candidate index.
+
+Indexes a synthetic corpus of resume texts for one job, then ranks it
+against generated job descriptions and reports milliseconds per ranking.
+The index is kept in memory; pass --persist to also time the append-only
+log and a reload from disk.
+
+Usage:
+    python benchmarks/bench_candidate_index.py
+    python benchmarks/bench_candidate_index.py --resumes 10000 --queries 200 --persist
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus
+import candidate_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--persist", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [corpus.make_resume_text(rng, args.pages) for _ in range(args.resumes)]
+    jobs = [corpus.make_job(rng) for _ in range(args.queries)]
+    directory = tempfile.mkdtemp() if args.persist else None
+    path = os.path.join(directory, "bench.jsonl") if directory else None
+
+    index = candidate_index.JobIndex("bench", path)
+    started = time.perf_counter()
+    for i, text in enumerate(texts):
+        index.add(f"{i:08d}", text)
+    elapsed = time.perf_counter() - started
+    print(f"indexed {len(texts)} resumes in {elapsed * 1000:.0f} ms ({len(texts) / elapsed:.0f} resumes/s), {index.stats()['terms']} terms")
+
+    if path:
+        started = time.perf_counter()
+        reloaded = candidate_index.JobIndex("bench", path).load()
+        print(f"reloaded {len(reloaded)} resumes from disk in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    queries = [candidate_index.build_query(job["description"], job["skills"]) for job in jobs]
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.rank(query, limit=args.limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"ranked top {args.limit} of {len(index)} for {len(queries)} jobs: "
+          f"p50 {timings[len(timings) // 2]:.1f} ms, p95 {timings[int(len(timings) * 0.95) - 1]:.1f} ms, max {timings[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
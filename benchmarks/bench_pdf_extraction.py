@@ -0,0 +1,115 @@
+"""
+Compare PDF text extraction backends on a corpus of sample PDFs.
+
+Times the old PyPDF2 path (per-page `text +=` concatenation) against the
+shared PyMuPDF extractor in document_extraction.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py                 # PDFs in the repo root
+    python benchmarks/bench_pdf_extraction.py path/to/pdfs -n 20
+    python benchmarks/bench_pdf_extraction.py --synthetic 5 --pages 12
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+import document_extraction
+
+try:
+    from PyPDF2 import PdfReader
+except ImportError:
+    PdfReader = None
+
+
+def extract_pypdf2(pdf_bytes):
+    import io
+    pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
+    pdf_text = ""
+    for page in pdf_reader.pages:
+        pdf_text += page.extract_text()
+    return pdf_text
+
+
+def extract_pymupdf(pdf_bytes):
+    return document_extraction.extract_pdf(pdf_bytes, max_pages=0, max_bytes=0)["text"]
+
+
+def make_synthetic_pdf(pages):
+    """Build a multi-page CV-like PDF in memory."""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        lines = [f"Experience block {page_num}-{i}: Built Python, React and AWS services for client {i}." for i in range(45)]
+        page.insert_text((40, 50), "\n".join(lines), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def load_corpus(args):
+    corpus = []
+    if args.synthetic:
+        for i in range(args.synthetic):
+            corpus.append((f"synthetic-{i}-{args.pages}p.pdf", make_synthetic_pdf(args.pages)))
+    else:
+        pattern = os.path.join(args.corpus, "*.pdf")
+        for path in sorted(glob.glob(pattern)):
+            with open(path, "rb") as f:
+                corpus.append((os.path.basename(path), f.read()))
+    return corpus
+
+
+def time_backend(extract, pdf_bytes, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        extract(pdf_bytes)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", default=root, help="directory of PDFs to benchmark")
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--synthetic", type=int, default=0, help="generate this many synthetic PDFs instead")
+    parser.add_argument("--pages", type=int, default=8, help="pages per synthetic PDF")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("No PDFs found")
+        return
+
+    backends = [("pymupdf", extract_pymupdf)]
+    if PdfReader is not None:
+        backends.insert(0, ("pypdf2", extract_pypdf2))
+    else:
+        print("PyPDF2 is not installed, only timing PyMuPDF")
+
+    print(f"{'document':<32}{'pages':>6}{'KB':>8}" + "".join(f"{name + ' ms':>14}" for name, _ in backends))
+    totals = {name: 0.0 for name, _ in backends}
+    for name, pdf_bytes in corpus:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_file:
+            pages = pdf_file.page_count
+        row = f"{name[:31]:<32}{pages:>6}{len(pdf_bytes) // 1024:>8}"
+        for backend_name, extract in backends:
+            median_ms = time_backend(extract, pdf_bytes, args.iterations)
+            totals[backend_name] += median_ms
+            row += f"{median_ms:>14.2f}"
+        print(row)
+
+    print(f"{'total':<46}" + "".join(f"{totals[name]:>14.2f}" for name, _ in backends))
+    if "pypdf2" in totals and totals["pymupdf"]:
+        print(f"PyMuPDF speed-up: {totals['pypdf2'] / totals['pymupdf']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
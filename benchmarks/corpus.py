@@ -0,0 +1,101 @@
+"""
+Synthetic resume and job corpus for benchmarks.
+
+Everything is generated from a seed, so two runs with the same arguments see
+the same documents. Resumes are rendered as PDF (PyMuPDF) or DOCX
+(python-docx) bytes with a configurable number of pages.
+"""
+import io
+import random
+import fitz  # PyMuPDF
+import docx
+
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Angular", "Node.js", "Flask", "Django",
+    "MongoDB", "PostgreSQL", "AWS", "Azure", "Docker", "Kubernetes", "Terraform", "Java",
+    "Go", "SQL", "Machine Learning", "TensorFlow", "Pandas", "Git", "CI/CD", "GraphQL"
+]
+
+TITLES = [
+    "Backend Developer", "Frontend Developer", "Full Stack Engineer", "Data Scientist",
+    "Cloud Engineer", "DevOps Engineer", "Machine Learning Engineer"
+]
+
+FIRST_NAMES = ["Asha", "Ravi", "Maya", "Leo", "Nina", "Omar", "Iris", "Kenji", "Sara", "Tomas"]
+LAST_NAMES = ["Kumar", "Silva", "Chen", "Okafor", "Novak", "Haddad", "Berg", "Ito", "Reyes", "Walsh"]
+
+
+def _resume_lines(rng, name, skills, pages):
+    lines = [name, "SUMMARY", f"Engineer with {rng.randint(1, 12)} years of experience in {', '.join(skills[:3])}.", ""]
+    lines.append("SKILLS")
+    lines.append(", ".join(skills))
+    lines.append("")
+    lines.append("EXPERIENCE")
+    for i in range(pages * 8):
+        skill = rng.choice(skills)
+        lines.append(f"- Delivered project {i + 1} using {skill}, improving throughput by {rng.randint(5, 60)}%.")
+    lines.append("")
+    lines.append("EDUCATION")
+    lines.append("B.Tech in Computer Science")
+    return lines
+
+
+def make_resume_text(rng, pages=2):
+    """Plain resume text, for benchmarks that skip document parsing."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    return "\n".join(_resume_lines(rng, name, rng.sample(SKILLS, rng.randint(5, 10)), pages))
+
+
+def render_pdf(lines, lines_per_page=45):
+    doc = fitz.open()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((40, 50), "\n".join(lines[start:start + lines_per_page]), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def render_docx(lines):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_resume(rng, pages=2, fmt="pdf"):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, rng.randint(5, 10))
+    lines = _resume_lines(rng, name, skills, pages)
+    if fmt == "docx":
+        content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        data = render_docx(lines)
+    else:
+        content_type = "application/pdf"
+        data = render_pdf(lines)
+    return {"name": name, "skills": skills, "content_type": content_type, "data": data}
+
+
+def make_job(rng):
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, rng.randint(3, 6))
+    return {
+        "title": title,
+        "company": "Benchmark Co",
+        "location": "Remote",
+        "description": f"We are hiring a {title} with strong {', '.join(skills)} experience.",
+        "skills": [{"name": skill, "weight": rng.choice([40, 60, 80, 100])} for skill in skills]
+    }
+
+
+def generate(num_resumes=20, num_jobs=3, pages=2, docx_ratio=0.0, seed=42):
+    """Return (resumes, jobs) for the given sizes."""
+    rng = random.Random(seed)
+    resumes = [
+        make_resume(rng, pages=pages, fmt="docx" if rng.random() < docx_ratio else "pdf")
+        for _ in range(num_resumes)
+    ]
+    jobs = [make_job(rng) for _ in range(num_jobs)]
+    return resumes, jobs
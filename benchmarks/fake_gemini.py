@@ -0,0 +1,118 @@
+"""
+Fake Gemini backend for benchmarks.
+
+FakeGenerativeModel mimics the part of genai.GenerativeModel the services use
+(generate_content(...).text). It picks a canned response that the service's
+parser understands from the prompt wording, and sleeps for a configurable,
+seeded latency to stand in for the network round-trip.
+"""
+import json
+import time
+import random
+import threading
+
+import model_registry
+from llm_cache import response_cache
+
+JOB_ANALYSIS_RESPONSE = {
+    "overall_match_score": 78,
+    "skill_matches": [
+        {"skill_name": "Python", "importance_weight": 80, "match_score": 85, "evidence": "Built Flask services"},
+        {"skill_name": "React", "importance_weight": 60, "match_score": 70, "evidence": "Frontend projects"}
+    ],
+    "missing_skills": [
+        {"skill_name": "Kubernetes", "importance_weight": 40, "improvement_suggestion": "Deploy a side project on a cluster"}
+    ],
+    "strengths": ["Backend development", "API design"],
+    "improvement_areas": ["Container orchestration"],
+    "detailed_feedback": "Solid backend profile; add infrastructure experience."
+}
+
+SKILLS_RESPONSE = [
+    {"skill": "Python", "score": 88, "jobMatch": True},
+    {"skill": "React", "score": 72, "jobMatch": True},
+    {"skill": "SQL", "score": 65, "jobMatch": False}
+]
+
+RECOMMENDATIONS_RESPONSE = [
+    {"skill": "Kubernetes", "why": "Common in the target role", "courses": [
+        {"name": "Kubernetes Basics", "platform": "Coursera", "url": "https://www.coursera.org/", "level": "Beginner"}
+    ]}
+]
+
+ATS_RESPONSE = """ATS score: 81
+
+Strengths:
+1. Clear section headings that parse cleanly in applicant tracking systems
+2. Quantified achievements in the experience section
+
+Suggestions:
+1. Add a dedicated skills section that mirrors the job description keywords
+2. Replace the two-column layout with a single column for better parsing
+"""
+
+FEEDBACK_RESPONSE = (
+    "Thank you for applying. Your backend experience stood out, and strengthening "
+    "your infrastructure skills would make your next application even stronger."
+)
+
+
+def canned_response(prompt):
+    """Return a response in the format the calling prompt asks for."""
+    if "overall_match_score" in prompt:
+        return "```json\n" + json.dumps(JOB_ANALYSIS_RESPONSE) + "\n```"
+    if "career advisor" in prompt:
+        return json.dumps(RECOMMENDATIONS_RESPONSE)
+    if '"skill":' in prompt:
+        return json.dumps(SKILLS_RESPONSE)
+    if "ResumeChecker" in prompt:
+        return ATS_RESPONSE
+    return FEEDBACK_RESPONSE
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Stand-in for genai.GenerativeModel with seeded, configurable latency."""
+
+    def __init__(self, model_name, generation_config=None, latency=0.2, jitter=0.05, error_rate=0.0, seed=0):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, contents):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._random.gauss(self.latency, self.jitter))
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("Fake Gemini error")
+        prompt = contents if isinstance(contents, str) else "\n".join(str(part) for part in contents)
+        return FakeResponse(canned_response(prompt))
+
+
+def install(latency=0.2, jitter=0.05, error_rate=0.0, seed=0, use_cache=False):
+    """
+    Route every model built by the registry to the fake backend. The response
+    cache is disabled by default so each request pays the simulated latency.
+    """
+    models = []
+
+    def factory(model_name, generation_config):
+        model = FakeGenerativeModel(model_name, generation_config, latency, jitter, error_rate, seed + len(models))
+        models.append(model)
+        return model
+
+    model_registry.set_model_factory(factory)
+    response_cache.enabled = use_cache
+    response_cache.memory.clear()
+    return models
@@ -0,0 +1,43 @@
+"""
+Scripted load profiles.
+
+A profile is a list of stages run one after another. Each stage sends a fixed
+number of requests to one target with a fixed number of concurrent clients.
+Targets:
+    ats        POST /api/analyze-resume (ats.py)
+    match      POST /api/analyze-application (job_matching_ai.py)
+    reanalyze  POST /api/reanalyze-job-applications (job_matching_ai.py)
+
+Reanalysis runs are exclusive per job, so reanalyze stages should not use
+more clients than the corpus has jobs.
+"""
+from collections import namedtuple
+
+Stage = namedtuple("Stage", ["name", "target", "requests", "concurrency"])
+
+PROFILES = {
+    # Quick check that every pipeline works end to end
+    "smoke": [
+        Stage("ats-serial", "ats", 5, 1),
+        Stage("match-serial", "match", 5, 1),
+        Stage("reanalyze-serial", "reanalyze", 1, 1),
+    ],
+    # Sustained moderate concurrency on each pipeline
+    "steady": [
+        Stage("ats-steady", "ats", 40, 4),
+        Stage("match-steady", "match", 40, 4),
+        Stage("reanalyze-steady", "reanalyze", 3, 3),
+    ],
+    # Upload spike on the ATS: ramp up, burst, then recover
+    "spike": [
+        Stage("ats-warm", "ats", 10, 2),
+        Stage("ats-burst", "ats", 64, 16),
+        Stage("ats-recover", "ats", 10, 2),
+    ],
+    # Recruiter-driven bulk reanalysis next to live application analysis
+    "bulk": [
+        Stage("match-baseline", "match", 20, 4),
+        Stage("reanalyze-bulk", "reanalyze", 3, 3),
+        Stage("match-after", "match", 20, 4),
+    ],
+}
@@ -0,0 +1,307 @@
+"""
+Benchmark the ATS and job matching pipelines without calling Gemini.
+
+The services are driven in-process through Flask test clients. Gemini is
+replaced by benchmarks.fake_gemini and MongoDB by mongomock (or a scratch
+database on a local server with --mongo-uri). job_matching_ai is imported
+with its queue workers held back; its db, the resume text cache and the
+worker pool are then pointed at the benchmark database before the workers
+start, so nothing reaches the real server. Each stage of the chosen load
+profile reports p50/p95/p99 latency, requests per second, errors, simulated
+Gemini calls and the peak RSS of the process so far.
+
+Usage:
+    python benchmarks/run_benchmarks.py --profile smoke
+    python benchmarks/run_benchmarks.py --profile steady --latency 0.5 --output report.json
+    python benchmarks/run_benchmarks.py --profile steady --baseline report.json --max-regression 0.2
+
+With --baseline the run exits with status 1 if any stage's p95 latency grew,
+or its throughput dropped, by more than --max-regression compared to the
+baseline report.
+"""
+import io
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import datetime
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# The services refuse to start without a key; the fake backend never uses it
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+os.environ.setdefault("LLM_CACHE_BACKEND", "")
+# Started by Targets.matching() once the pool points at the benchmark database
+os.environ["ANALYSIS_WORKERS_AUTOSTART"] = "false"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (and finished child processes) in MB."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        # Windows: psutil reports the peak working set
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(peak, children) / scale, 1)
+
+
+def connect_database(mongo_uri):
+    if mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(mongo_uri)
+        client.drop_database("jobmatch_benchmark")
+        return client["jobmatch_benchmark"]
+    import mongomock
+    import mongomock.gridfs
+    mongomock.gridfs.enable_gridfs_integration()
+    return mongomock.MongoClient()["jobmatch_benchmark"]
+
+
+def seed_database(db, resumes, jobs):
+    """Insert the corpus as jobs and applications with resumes stored in GridFS."""
+    import resume_storage
+
+    job_ids = []
+    for job in jobs:
+        result = db.jobs.insert_one({**job, "recruiterId": "benchmark", "created_at": datetime.datetime.utcnow(), "applicationCount": 0, "statusCounts": {}})
+        job_ids.append(str(result.inserted_id))
+
+    application_ids = []
+    for i, resume in enumerate(resumes):
+        data_url = f"data:{resume['content_type']};base64," + base64.b64encode(resume["data"]).decode()
+        ref = resume_storage.store_resume(db, data_url, filename=f"resume-{i}")
+        result = db.applications.insert_one({
+            "jobId": job_ids[i % len(job_ids)],
+            "applicantId": f"applicant-{i}",
+            "applicantName": resume["name"],
+            "resume": ref,
+            "status": "pending",
+            "created_at": datetime.datetime.utcnow()
+        })
+        application_ids.append((str(result.inserted_id), job_ids[i % len(job_ids)]))
+    return job_ids, application_ids
+
+
+class Targets:
+    """Builds one request function per target, importing each service only when needed."""
+
+    def __init__(self, db, resumes, jobs):
+        self.db = db
+        self.all_resumes = resumes
+        # The ATS endpoint only accepts PDFs
+        self.resumes = [resume for resume in resumes if resume["content_type"] == "application/pdf"]
+        self.jobs = jobs
+        self.job_ids = []
+        self.application_ids = []
+        self._ats = None
+        self._matching = None
+
+    def ats(self):
+        if self._ats is None:
+            import ats
+            self._ats = ats
+        return self._ats
+
+    def matching(self):
+        if self._matching is None:
+            import job_matching_ai
+            job_matching_ai.db = self.db
+            job_matching_ai.resume_text_cache.collection = self.db.resume_texts
+            job_matching_ai.analysis_workers.db = self.db
+            job_matching_ai.analysis_workers.start()
+            self.job_ids, self.application_ids = seed_database(self.db, self.all_resumes, self.jobs)
+            self._matching = job_matching_ai
+        return self._matching
+
+    def prepare(self, stages):
+        for stage in stages:
+            if stage.target == "ats":
+                self.ats()
+            else:
+                self.matching()
+
+    def reset_caches(self):
+        """Drop extracted-text caches so each stage pays for parsing again."""
+        if self._ats is not None:
+            self._ats.resume_text_cache.memory.clear()
+        if self._matching is not None:
+            self._matching.resume_text_cache.memory.clear()
+            self.db.resume_texts.delete_many({})
+
+    def send(self, target, i):
+        """Send request i of a stage and return True if it succeeded."""
+        if target == "ats":
+            resume = self.resumes[i % len(self.resumes)]
+            job = self.jobs[i % len(self.jobs)]
+            response = self.ats().app.test_client().post(
+                "/api/analyze-resume",
+                data={
+                    "file": (io.BytesIO(resume["data"]), f"resume-{i}.pdf"),
+                    "jobDescription": job["description"],
+                    "analysisType": "quick"
+                },
+                content_type="multipart/form-data"
+            )
+        elif target == "match":
+            application_id, job_id = self.application_ids[i % len(self.application_ids)]
+            response = self.matching().app.test_client().post(
+                "/api/analyze-application",
+                json={"application_id": application_id, "job_id": job_id}
+            )
+        elif target == "reanalyze":
+            response = self.matching().app.test_client().post(
+                "/api/reanalyze-job-applications",
+                json={"job_id": self.job_ids[i % len(self.job_ids)]}
+            )
+        else:
+            raise ValueError(f"Unknown benchmark target: {target}")
+        response.get_data()
+        return response.status_code == 200
+
+
+def run_stage(stage, targets, models):
+    calls_before = sum(model.calls for model in models)
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            ok = targets.send(stage.target, i)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=stage.concurrency) as pool:
+        results = list(pool.map(timed, range(stage.requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    return {
+        "stage": stage.name,
+        "target": stage.target,
+        "requests": stage.requests,
+        "concurrency": stage.concurrency,
+        "errors": sum(1 for _, ok in results if not ok),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+        "rps": round(stage.requests / wall, 2) if wall else None,
+        "wall_seconds": round(wall, 3),
+        "gemini_calls": sum(model.calls for model in models) - calls_before,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def print_report(report):
+    columns = ["requests", "concurrency", "errors", "p50_ms", "p95_ms", "p99_ms", "rps", "gemini_calls", "peak_rss_mb"]
+    print(f"{'stage':<20}" + "".join(f"{column:>13}" for column in columns))
+    for row in report["stages"]:
+        print(f"{row['stage']:<20}" + "".join(f"{str(row[column]):>13}" for column in columns))
+
+
+def compare_to_baseline(report, baseline, max_regression):
+    """Return a list of regressions beyond the allowed ratio."""
+    previous = {row["stage"]: row for row in baseline.get("stages", [])}
+    regressions = []
+    for row in report["stages"]:
+        before = previous.get(row["stage"])
+        if not before:
+            continue
+        if before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{row['stage']}: p95 {before['p95_ms']}ms -> {row['p95_ms']}ms")
+        if before["rps"] and row["rps"] < before["rps"] * (1 - max_regression):
+            regressions.append(f"{row['stage']}: throughput {before['rps']} -> {row['rps']} req/s")
+        if row["errors"] > before["errors"]:
+            regressions.append(f"{row['stage']}: errors {before['errors']} -> {row['errors']}")
+    return regressions
+
+
+def main():
+    from load_profiles import PROFILES
+    import corpus
+    import fake_gemini
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="smoke")
+    parser.add_argument("--latency", type=float, default=0.2, help="mean fake Gemini latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="standard deviation of the fake latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake Gemini calls that raise")
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--docx-ratio", type=float, default=0.0, help="fraction of resumes rendered as DOCX")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo-uri", help="use a scratch database on this server instead of mongomock")
+    parser.add_argument("--warm-cache", action="store_true", help="keep extracted-text caches between stages")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--verbose", action="store_true", help="show service logs")
+    args = parser.parse_args()
+
+    stages = PROFILES[args.profile]
+    resumes, jobs = corpus.generate(args.resumes, args.jobs, args.pages, args.docx_ratio, args.seed)
+    models = fake_gemini.install(args.latency, args.jitter, args.error_rate, args.seed)
+    db = connect_database(args.mongo_uri)
+
+    targets = Targets(db, resumes, jobs)
+    report = {
+        "profile": args.profile,
+        "created_at": datetime.datetime.utcnow().isoformat(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "stages": []
+    }
+
+    logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with logs:
+        targets.prepare(stages)
+        for stage in stages:
+            if not args.warm_cache:
+                targets.reset_caches()
+            report["stages"].append(run_stage(stage, targets, models))
+
+    print(f"Profile '{args.profile}', fake Gemini latency {args.latency}s, {len(resumes)} resumes x {args.pages} pages")
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.max_regression)
+        if regressions:
+            print("Performance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+BM25 index of applicant resumes, one per job.
+
+matchScore only exists once the analysis worker has analyzed an application,
+one at a time. This index ranks every applicant of a job against the job's
+description and skills straight away. It works from the extracted resume
+text alone, without Gemini.
+
+Each job's index keeps the term counts of every indexed resume and an
+inverted index (term -> {application id: term count}) built from them. A
+ranking only reads the postings of the query's terms, so thousands of
+applicants rank in milliseconds. Resumes are added one at a time as their
+text is extracted. Re-adding a resume whose text has not changed costs a
+hash comparison.
+
+Indexes are persisted under CANDIDATE_INDEX_DIR, one append-only JSON Lines
+file per job. Every add or removal appends one line, and loading replays the
+file. The file is rewritten without superseded lines once they outnumber the
+live entries. Bump INDEX_VERSION whenever tokenization changes; entries
+written by older versions are ignored and re-indexed.
+"""
+import os
+import re
+import json
+import math
+import heapq
+import hashlib
+import threading
+from dotenv import load_dotenv
+from llm_cache import LRUCache
+import skill_taxonomy
+
+load_dotenv()
+
+INDEX_VERSION = 1
+
+CANDIDATE_INDEX_DIR = os.getenv("CANDIDATE_INDEX_DIR", ".candidate_index")
+CANDIDATE_INDEX_MAX_JOBS = int(os.getenv("CANDIDATE_INDEX_MAX_JOBS", "64"))  # job indexes kept in memory
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Query term weights: a skill's terms count more than words of the description
+SKILL_QUERY_WEIGHT = 3.0
+DESCRIPTION_QUERY_WEIGHT = 1.0
+DEFAULT_SKILL_WEIGHT = 50
+
+# Keeps "c++", "c#", "node.js" and "ci/cd" whole
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can do for from has have in into is it its
+of on or our such that the their this to was we were will with you your
+""".split())
+
+_JOB_ID_PATTERN = re.compile(r"[0-9a-f]{24}")
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def build_query(description, skills, taxonomy=None):
+    """
+    Turn a job's description and required skills into {term: weight}. Skills
+    known to the taxonomy also match their synonyms (JS for JavaScript).
+    """
+    taxonomy = taxonomy or skill_taxonomy.get_taxonomy()
+    query = {}
+    for term in set(tokenize(description)):
+        query[term] = DESCRIPTION_QUERY_WEIGHT
+    for skill in skills or []:
+        name = skill.get("name", "")
+        weight = SKILL_QUERY_WEIGHT * (skill.get("weight") or DEFAULT_SKILL_WEIGHT) / 100
+        canonical = taxonomy.canonical(name)
+        terms = [name]
+        if canonical:
+            terms += [canonical] + taxonomy.skills[canonical].get("aliases", [])
+        for term in {token for text in terms for token in tokenize(text)}:
+            query[term] = query.get(term, 0) + weight
+    return query
+
+
+class JobIndex:
+    """Resume term counts and postings for the applicants of one job."""
+
+    def __init__(self, job_id, path=None):
+        self.job_id = job_id
+        self.path = path
+        self.docs = {}  # application id -> {"hash", "length", "terms"}
+        self.postings = {}  # term -> {application id: count}
+        self.total_length = 0
+        self.log_lines = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.docs
+
+    def ids(self):
+        with self._lock:
+            return set(self.docs)
+
+    def _insert(self, doc_id, entry):
+        self._delete(doc_id)
+        self.docs[doc_id] = entry
+        self.total_length += entry["length"]
+        for term, count in entry["terms"].items():
+            self.postings.setdefault(term, {})[doc_id] = count
+
+    def _delete(self, doc_id):
+        entry = self.docs.pop(doc_id, None)
+        if entry is None:
+            return
+        self.total_length -= entry["length"]
+        for term in entry["terms"]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def load(self):
+        """Replay the persisted log, if any."""
+        if not self.path or not os.path.exists(self.path):
+            return self
+        with self._lock:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self.log_lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash; the next compaction drops it
+                        continue
+                    if record.get("removed"):
+                        self._delete(record["id"])
+                    elif record.get("v") == INDEX_VERSION:
+                        self._insert(record["id"], {
+                            "hash": record["hash"], "length": record["length"], "terms": record["terms"]
+                        })
+        return self
+
+    def _append(self, record):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.log_lines += 1
+        if self.log_lines > 2 * len(self.docs) + 100:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for doc_id, entry in self.docs.items():
+                f.write(json.dumps({"v": INDEX_VERSION, "id": doc_id, **entry}) + "\n")
+        os.replace(tmp_path, self.path)
+        self.log_lines = len(self.docs)
+
+    def add(self, doc_id, text):
+        """Index (or re-index) one resume; returns False if its text is unchanged."""
+        doc_id = str(doc_id)
+        text_hash = hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+        with self._lock:
+            if self.docs.get(doc_id, {}).get("hash") == text_hash:
+                return False
+        tokens = tokenize(text)
+        terms = {}
+        for token in tokens:
+            terms[token] = terms.get(token, 0) + 1
+        entry = {"hash": text_hash, "length": len(tokens), "terms": terms}
+        with self._lock:
+            self._insert(doc_id, entry)
+            self._append({"v": INDEX_VERSION, "id": doc_id, **entry})
+        return True
+
+    def remove(self, doc_id):
+        doc_id = str(doc_id)
+        with self._lock:
+            if doc_id in self.docs:
+                self._delete(doc_id)
+                self._append({"id": doc_id, "removed": True})
+
+    def rank(self, query, limit=None):
+        """Return [(application id, BM25 score)] for query {term: weight}, best first."""
+        with self._lock:
+            count = len(self.docs)
+            if not count:
+                return []
+            average_length = max(self.total_length / count, 1e-9)
+            scores = {}
+            norms = {}
+            for term, weight in query.items():
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                term_weight = weight * idf
+                for doc_id, frequency in postings.items():
+                    norm = norms.get(doc_id)
+                    if norm is None:
+                        norm = norms[doc_id] = BM25_K1 * (1 - BM25_B + BM25_B * self.docs[doc_id]["length"] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + term_weight * frequency * (BM25_K1 + 1) / (frequency + norm)
+        # Highest score first; the id breaks ties so the order is stable
+        order = lambda item: (-item[1], item[0])
+        if limit is not None and limit < len(scores):
+            return heapq.nsmallest(limit, scores.items(), key=order)
+        return sorted(scores.items(), key=order)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "documents": len(self.docs),
+                "terms": len(self.postings),
+                "average_length": round(self.total_length / len(self.docs), 1) if self.docs else 0,
+                "log_lines": self.log_lines
+            }
+
+
+_indexes = LRUCache(max_size=CANDIDATE_INDEX_MAX_JOBS)
+_indexes_lock = threading.Lock()
+
+
+def get_index(job_id, directory=None):
+    """Return the index of a job, loading it from disk on first use."""
+    job_id = str(job_id)
+    if not _JOB_ID_PATTERN.fullmatch(job_id):
+        raise ValueError(f"Invalid job id: {job_id}")
+    with _indexes_lock:
+        index = _indexes.get(job_id)
+        if index is None:
+            path = os.path.join(directory or CANDIDATE_INDEX_DIR, f"{job_id}.jsonl")
+            index = JobIndex(job_id, path).load()
+            _indexes.set(job_id, index)
+        return index
@@ -0,0 +1,169 @@
+"""
+Index bootstrap for the jobmatchdb collections.
+
+ensure_indexes() creates the compound and unique indexes behind the hot
+queries of both services: user lookup by email on every authenticated
+request, application lookups by job and applicant, job listings sorted by
+creation time, and notification feeds. It is idempotent, so both services
+call it at startup. An index that cannot be built (for example a unique index
+over existing duplicates) is reported and skipped instead of stopping the
+service.
+
+slow_queries() summarises the MongoDB profiler (system.profile), grouping
+slow operations and collection scans by collection and query shape.
+
+Run this module directly to create the indexes, or with --slow-queries to
+print the profiler report:
+    python db_indexes.py
+    python db_indexes.py --enable-profiler 50
+    python db_indexes.py --slow-queries
+"""
+import argparse
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+import resume_storage
+import task_queue
+
+INDEXES = {
+    "users": [
+        # Every authenticated request resolves the user by email
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "profiles": [
+        IndexModel([("userId", ASCENDING)]),
+    ],
+    "jobs": [
+        # Job listings page newest first on (created_at, _id)
+        IndexModel([("active", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("recruiterId", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "applications": [
+        # One application per applicant and job; also serves lookups by jobId
+        IndexModel([("jobId", ASCENDING), ("applicantId", ASCENDING)], unique=True),
+        # Bulk reanalysis walks a job's applications in _id order
+        IndexModel([("jobId", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("applicantId", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "notifications": [
+        # Notification feed: a user's notifications, newest first
+        IndexModel([("userId", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("userId", ASCENDING), ("read", ASCENDING)]),
+    ],
+}
+
+
+def ensure_indexes(db):
+    """Create any missing indexes and return the names of the ones that failed."""
+    failed = []
+    for collection_name, models in INDEXES.items():
+        for model in models:
+            name = model.document["name"]
+            try:
+                db[collection_name].create_indexes([model])
+            except OperationFailure as e:
+                # Duplicate keys or an existing index with other options
+                print(f"Could not create index {collection_name}.{name}: {str(e)}")
+                failed.append(f"{collection_name}.{name}")
+    # Modules that own a collection define its indexes
+    for collection_name, ensure in [
+        (task_queue.QUEUE_COLLECTION, task_queue.ensure_queue_indexes),
+        (f"{resume_storage.RESUME_BUCKET}.files", resume_storage.ensure_resume_indexes),
+    ]:
+        try:
+            ensure(db)
+        except OperationFailure as e:
+            print(f"Could not create {collection_name} indexes: {str(e)}")
+            failed.append(collection_name)
+    return failed
+
+
+def find_duplicate_applications(db, limit=20):
+    """List (jobId, applicantId) pairs with more than one application."""
+    pipeline = [
+        {"$group": {"_id": {"jobId": "$jobId", "applicantId": "$applicantId"}, "count": {"$sum": 1}, "ids": {"$push": "$_id"}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit}
+    ]
+    return list(db.applications.aggregate(pipeline))
+
+
+def enable_profiler(db, slow_ms=100):
+    """Record operations slower than slow_ms milliseconds in system.profile."""
+    return db.command("profile", 1, slowms=slow_ms)
+
+
+def _query_shape(value):
+    # Replace values with their type so identical queries group together
+    if isinstance(value, dict):
+        return {key: _query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_query_shape(item) for item in value[:1]]
+    return type(value).__name__
+
+
+def slow_queries(db, min_millis=100, limit=20):
+    """
+    Group profiled operations that took at least min_millis or scanned a whole
+    collection, slowest first.
+    """
+    entries = db["system.profile"].find(
+        {
+            "op": {"$in": ["query", "getmore", "update", "remove", "command"]},
+            "$or": [{"millis": {"$gte": min_millis}}, {"planSummary": {"$regex": "^COLLSCAN"}}]
+        },
+        {"ns": 1, "op": 1, "command": 1, "millis": 1, "planSummary": 1, "docsExamined": 1, "nreturned": 1}
+    ).sort("ts", DESCENDING).limit(5000)
+
+    groups = {}
+    for entry in entries:
+        command = entry.get("command", {})
+        query = command.get("filter") or command.get("q") or command.get("query") or {}
+        shape = repr(_query_shape(query))
+        key = (entry.get("ns"), entry.get("op"), shape)
+        group = groups.setdefault(key, {
+            "ns": entry.get("ns"),
+            "op": entry.get("op"),
+            "query_shape": shape,
+            "plan": entry.get("planSummary", ""),
+            "count": 0,
+            "total_millis": 0,
+            "max_millis": 0,
+            "docs_examined": 0
+        })
+        group["count"] += 1
+        group["total_millis"] += entry.get("millis", 0)
+        group["max_millis"] = max(group["max_millis"], entry.get("millis", 0))
+        group["docs_examined"] += entry.get("docsExamined", 0)
+
+    report = sorted(groups.values(), key=lambda group: group["total_millis"], reverse=True)[:limit]
+    for group in report:
+        group["avg_millis"] = round(group.pop("total_millis") / group["count"], 1)
+        group["unindexed"] = group["plan"].startswith("COLLSCAN")
+    return report
+
+
+if __name__ == "__main__":
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description="Create jobmatchdb indexes or report slow queries")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--slow-queries", action="store_true", help="print the profiler report instead")
+    parser.add_argument("--enable-profiler", type=int, metavar="MS", help="profile operations slower than MS milliseconds")
+    args = parser.parse_args()
+
+    database = MongoClient(args.uri)["jobmatchdb"]
+    if args.enable_profiler is not None:
+        enable_profiler(database, args.enable_profiler)
+        print(f"Profiling operations slower than {args.enable_profiler}ms")
+    elif args.slow_queries:
+        for row in slow_queries(database):
+            flag = "COLLSCAN" if row["unindexed"] else row["plan"]
+            print(f"{row['ns']} {row['op']} x{row['count']} avg {row['avg_millis']}ms max {row['max_millis']}ms [{flag}] {row['query_shape']}")
+    else:
+        failed = ensure_indexes(database)
+        if failed:
+            duplicates = find_duplicate_applications(database)
+            if duplicates:
+                print(f"Found {len(duplicates)} duplicate (jobId, applicantId) applications, e.g. {duplicates[0]['_id']}")
+        print("Indexes are up to date" if not failed else f"{len(failed)} indexes could not be created")
@@ -0,0 +1,85 @@
+"""
+Shared resume text extraction for both services.
+
+PDFs are parsed with PyMuPDF, which is several times faster than PyPDF2 on
+multi-page CVs. The extract_* helpers join the pages once instead of
+concatenating strings in a loop. Every entry point enforces a size guard so
+an oversized upload cannot monopolise a worker.
+"""
+import io
+import os
+import fitz  # PyMuPDF for PDF handling
+import docx  # python-docx for DOCX handling
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MAX_DOCUMENT_BYTES = int(os.getenv("MAX_DOCUMENT_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+
+
+class DocumentTooLarge(ValueError):
+    pass
+
+
+def _read(data):
+    return data.read() if hasattr(data, "read") else data
+
+
+def check_size(size, max_bytes=MAX_DOCUMENT_BYTES):
+    if max_bytes and size > max_bytes:
+        raise DocumentTooLarge(f"Document is {size} bytes, the limit is {max_bytes} bytes")
+
+
+def _iter_pages(pdf_file, max_pages):
+    for page_num in range(min(pdf_file.page_count, max_pages or pdf_file.page_count)):
+        yield pdf_file[page_num].get_text()
+
+
+def extract_pdf(pdf_data, max_pages=MAX_PDF_PAGES, max_bytes=MAX_DOCUMENT_BYTES):
+    """Extract text from PDF bytes or a file object, joining the pages once."""
+    pdf_bytes = _read(pdf_data)
+    check_size(len(pdf_bytes), max_bytes)
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_file:
+        page_count = pdf_file.page_count
+        text = "".join(_iter_pages(pdf_file, max_pages))
+    return {
+        "text": text,
+        "page_count": page_count,
+        "truncated": bool(max_pages) and page_count > max_pages,
+        "extractor": "pymupdf"
+    }
+
+
+def extract_docx(docx_data, max_bytes=MAX_DOCUMENT_BYTES):
+    """Extract paragraph text from DOCX bytes or a seekable file object."""
+    if hasattr(docx_data, "read"):
+        # GridFS files and uploads report their size without being read
+        size = getattr(docx_data, "length", None)
+        if size is not None:
+            check_size(size, max_bytes)
+        doc = docx.Document(docx_data)
+    else:
+        check_size(len(docx_data), max_bytes)
+        doc = docx.Document(io.BytesIO(docx_data))
+    return {
+        "text": "\n".join([para.text for para in doc.paragraphs]),
+        "page_count": None,
+        "truncated": False,
+        "extractor": "python-docx"
+    }
+
+
+def extract_plain(data, max_bytes=MAX_DOCUMENT_BYTES):
+    data = _read(data)
+    check_size(len(data), max_bytes)
+    return {"text": data.decode("utf-8", errors="ignore"), "page_count": None, "truncated": False, "extractor": "plain"}
+
+
+def extract_document(data, content_type, max_pages=MAX_PDF_PAGES, max_bytes=MAX_DOCUMENT_BYTES):
+    """Extract text from a resume according to its content type."""
+    if "pdf" in content_type:
+        return extract_pdf(data, max_pages=max_pages, max_bytes=max_bytes)
+    elif "word" in content_type or "docx" in content_type or "doc" in content_type:
+        return extract_docx(data, max_bytes=max_bytes)
+    return extract_plain(data, max_bytes=max_bytes)
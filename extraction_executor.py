@@ -0,0 +1,230 @@
+"""
+Process pool for CPU-bound resume parsing.
+
+PDF and DOCX parsing holds the GIL, so running it on a Flask request thread
+blocks every other request in the process. extract_document() sends the raw
+bytes to a pool of worker processes and waits for the result.
+
+Each document gets EXTRACTION_TIMEOUT seconds from the moment a worker picks
+it up, so time spent queued behind other uploads does not count against it.
+Workers report every document they start; a monitor thread terminates the
+one worker whose document ran too long (a malformed or huge PDF), and the
+pool replaces it. The other documents keep running. A document that waits
+longer than EXTRACTION_TIMEOUT for a free worker is given up on as well.
+
+Workers are started with the "spawn" method because the services also run
+threads (Flask, task workers), and forking a threaded process is unsafe.
+Set EXTRACTION_WORKERS=0 to parse inline on the calling thread.
+"""
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from dotenv import load_dotenv
+import document_extraction
+
+load_dotenv()
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "30"))  # seconds per document
+
+# How often the monitor checks running documents against their timeout
+MONITOR_INTERVAL = 0.1
+
+
+class ExtractionTimeout(TimeoutError):
+    pass
+
+
+_lock = threading.Lock()
+_pool = None
+_job_ids = itertools.count()
+_stats = {"submitted": 0, "inline": 0, "timeouts": 0, "restarts": 0}
+
+# Set in each worker process by _init_worker
+_worker_started = None
+
+
+def _init_worker(started):
+    global _worker_started
+    _worker_started = started
+
+
+def _run_job(job_id, data, content_type, max_pages, max_bytes):
+    """Runs in a worker: report the start, then parse."""
+    _worker_started.put((job_id, os.getpid()))
+    return document_extraction.extract_document(data, content_type, max_pages, max_bytes)
+
+
+class _Job:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.pid = None
+        self.started_at = None
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.timed_out = False
+        self.result = None
+        self.error = None
+
+
+class _WorkerPool:
+    """A multiprocessing.Pool plus the monitor that enforces per-document timeouts."""
+
+    def __init__(self, workers):
+        context = multiprocessing.get_context("spawn")
+        self.started = context.Queue()
+        self.pool = context.Pool(workers, initializer=_init_worker, initargs=(self.started,))
+        self.jobs = {}  # job id -> _Job, until it finishes or is killed
+        self.running = {}  # worker pid -> id of the job it is running
+        self.closed = threading.Event()
+        self.monitor = threading.Thread(target=self._monitor, name="extraction-monitor")
+        self.monitor.daemon = True
+        self.monitor.start()
+
+    def submit(self, timeout, args):
+        job_id = next(_job_ids)
+        job = _Job(timeout)
+        with _lock:
+            self.jobs[job_id] = job
+
+        def finished(result):
+            job.result = result
+            self._finish(job_id, job)
+
+        def failed(error):
+            job.error = error
+            self._finish(job_id, job)
+
+        self.pool.apply_async(_run_job, (job_id, *args), callback=finished, error_callback=failed)
+        return job
+
+    def _finish(self, job_id, job):
+        with _lock:
+            self.jobs.pop(job_id, None)
+        # A quick document can finish before the monitor sees it start
+        job.started.set()
+        job.done.set()
+
+    def _monitor(self):
+        while not self.closed.is_set():
+            # Record every start reported so far before looking for overdue documents
+            reports = []
+            try:
+                reports.append(self.started.get(timeout=MONITOR_INTERVAL))
+                while True:
+                    reports.append(self.started.get_nowait())
+            except queue.Empty:
+                pass
+            except (EOFError, OSError):
+                return
+            now = time.monotonic()
+            overdue = []
+            with _lock:
+                for job_id, pid in reports:
+                    self.running[pid] = job_id
+                    job = self.jobs.get(job_id)
+                    if job is not None:
+                        job.pid = pid
+                        job.started_at = now
+                        job.started.set()
+                for job_id, job in list(self.jobs.items()):
+                    if job.started_at is not None and now - job.started_at > job.timeout and not job.done.is_set():
+                        # Only if the worker has not moved on to another document
+                        if self.running.get(job.pid) == job_id:
+                            overdue.append((job_id, job))
+                            del self.jobs[job_id]
+                            del self.running[job.pid]
+            for job_id, job in overdue:
+                self._kill(job.pid)
+                job.timed_out = True
+                job.done.set()
+
+    def _kill(self, pid):
+        # A running document cannot be cancelled, so stop its worker; the pool starts a new one
+        for process in list(getattr(self.pool, "_pool", None) or []):
+            if process.pid == pid:
+                process.terminate()
+                with _lock:
+                    _stats["restarts"] += 1
+
+    def close(self):
+        self.closed.set()
+        # terminate(): close() and join() would wait forever on a killed document's result
+        self.pool.terminate()
+        self.pool.join()
+        self.monitor.join()
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = _WorkerPool(EXTRACTION_WORKERS)
+        return _pool
+
+
+def _read_bytes(data, max_bytes):
+    """Worker processes need picklable input, so file objects are read here."""
+    if not hasattr(data, "read"):
+        return data
+    size = getattr(data, "length", None)
+    if size is not None:
+        document_extraction.check_size(size, max_bytes)
+    return data.read()
+
+
+def extract_document(data, content_type, timeout=EXTRACTION_TIMEOUT,
+                     max_pages=document_extraction.MAX_PDF_PAGES,
+                     max_bytes=document_extraction.MAX_DOCUMENT_BYTES):
+    """
+    Parse a resume in the process pool and return the document_extraction result.
+    Raises ExtractionTimeout if parsing takes longer than timeout seconds once
+    it has started, or if no worker picks it up within timeout seconds.
+    """
+    data = _read_bytes(data, max_bytes)
+    document_extraction.check_size(len(data), max_bytes)
+
+    if EXTRACTION_WORKERS <= 0:
+        with _lock:
+            _stats["inline"] += 1
+        return document_extraction.extract_document(data, content_type, max_pages=max_pages, max_bytes=max_bytes)
+
+    job = _get_pool().submit(timeout, (data, content_type, max_pages, max_bytes))
+    with _lock:
+        _stats["submitted"] += 1
+    if not job.started.wait(timeout):
+        with _lock:
+            _stats["timeouts"] += 1
+        # The monitor still bounds the document if a worker picks it up later
+        raise ExtractionTimeout(f"No extraction worker was free within {timeout}s")
+    job.done.wait()
+    if job.timed_out:
+        with _lock:
+            _stats["timeouts"] += 1
+        raise ExtractionTimeout(f"Document extraction took longer than {timeout}s")
+    if job.error is not None:
+        raise job.error
+    return job.result
+
+
+def extract_pdf(data, timeout=EXTRACTION_TIMEOUT, **kwargs):
+    return extract_document(data, "application/pdf", timeout=timeout, **kwargs)
+
+
+def stats():
+    with _lock:
+        counters = dict(_stats)
+    counters["workers"] = EXTRACTION_WORKERS
+    counters["timeout_seconds"] = EXTRACTION_TIMEOUT
+    return counters
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
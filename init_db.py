@@ -2,11 +2,17 @@ from pymongo import MongoClient
 import bcrypt
 import os
 import datetime
+import db_indexes
 
 # Connect to MongoDB
 client = MongoClient('mongodb://localhost:27017/')
 db = client['jobmatchdb']
 
+# Create the indexes used by both services (safe to run repeatedly); this
+# also creates the notifications collection
+db_indexes.ensure_indexes(db)
+print("Database indexes are up to date")
+
 # Check if users collection already has data
 if db.users.count_documents({}) > 0:
     print("Database already has users. Skipping initialization.")
@@ -34,14 +40,6 @@ sample_users = [
 result = db.users.insert_many(sample_users)
 print(f"Created {len(result.inserted_ids)} sample users")
 
-# Ensure the notifications collection exists
-if 'notifications' not in db.list_collection_names():
-    # Create the notifications collection with a timestamp index
-    db.create_collection('notifications')
-    db.notifications.create_index('timestamp')
-    db.notifications.create_index('userId')
-    print("Created notifications collection with indexes")
-
 print("\nSample login credentials:")
 print("Recruiter: recruiter@example.com / password123")
 print("Applicant: applicant@example.com / password123")
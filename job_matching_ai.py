@@ -1,16 +1,27 @@
 from flask import Flask, request, jsonify
-import google.generativeai as genai
 import os
 import re
 import json
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import datetime
-import base64
-import fitz  # PyMuPDF for PDF handling
-import docx  # python-docx for DOCX handling
-import io
+import hashlib
+import threading
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+import application_counters
+import application_view
+import candidate_index
+import db_indexes
+import extraction_executor
+import model_registry
+import resume_storage
+import skill_scoring
+import skill_taxonomy
+import task_queue
+import text_cache
+from llm_cache import response_cache
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,7 +31,10 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY environment variable not set")
 
-genai.configure(api_key=GOOGLE_API_KEY)
+model_registry.configure(GOOGLE_API_KEY)
+
+# Load the skill taxonomy at startup; edits to the file are picked up while running
+skill_taxonomy.get_taxonomy()
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -30,229 +44,265 @@ MONGO_URI = "mongodb://localhost:27017/jobmatchdb"
 client = MongoClient(MONGO_URI)
 db = client.jobmatchdb
 
-# Configure Gemini model
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-pro",
-    generation_config={
-        "temperature": 0.2,
-        "top_p": 0.95,
-        "top_k": 64,
-        "max_output_tokens": 8192,
-    }
-)
+# Reanalysis pipeline settings
+REANALYSIS_WORKERS = int(os.getenv("REANALYSIS_WORKERS", "4"))
+REANALYSIS_BATCH_SIZE = int(os.getenv("REANALYSIS_BATCH_SIZE", "50"))
+REANALYSIS_STALE_SECONDS = int(os.getenv("REANALYSIS_STALE_SECONDS", "600"))
+REANALYSIS_PROJECTION = {"jobId": 1, "resume": 1, "resumeData": 1, "matchScore": 1, "applicantName": 1}
+
+# Analysis tiers: "llm", "tiered" (rule-based first, Gemini for uncertain results) or "local"
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "llm").lower()
+ANALYSIS_CONFIDENCE_THRESHOLD = float(os.getenv("ANALYSIS_CONFIDENCE_THRESHOLD", "0.75"))
+if ANALYSIS_MODE not in ("llm", "tiered", "local"):
+    raise ValueError(f"Unknown ANALYSIS_MODE: {ANALYSIS_MODE}")
+
+# Rule-based scores this far from the middle of the range are decisive
+ANALYSIS_SCORE_MIDPOINT = 60
+ANALYSIS_DECISIVE_MARGIN = 30
+
+# How much a rule-based verdict on one skill can be trusted
+SKILL_EVIDENCE_CERTAINTY = {
+    "direct": 1.0,  # taxonomy skill (or synonym) mentioned
+    "absent": 0.8,  # taxonomy skill with neither it nor a related skill mentioned
+    "keyword": 0.7,  # skill outside the taxonomy found by substring search
+    "related": 0.5,  # only related skills mentioned; how much they count is a judgment call
+    "unknown": 0.4  # skill outside the taxonomy, not found
+}
+
+_analysis_tier_counts = {"local": 0, "llm": 0, "fallback": 0, "tiered": 0, "escalated": 0}
+_analysis_tier_lock = threading.Lock()
+
+# Candidate ranking: resumes not indexed yet are queued for indexing, up to this many per request
+CANDIDATE_INDEX_BACKFILL_LIMIT = int(os.getenv("CANDIDATE_INDEX_BACKFILL_LIMIT", "200"))
+RANKING_DEFAULT_LIMIT = 50
+RANKING_MAX_LIMIT = 1000
+
+# Extracted resume text, keyed by resume content hash
+resume_text_cache = text_cache.TextCache(db.resume_texts)
 
-def extract_text_from_pdf(pdf_data):
-    """Extract text from PDF binary data."""
+def generate_text(prompt):
+    """Generate text with the shared Gemini model, serving repeated prompts from the response cache."""
+    return model_registry.generate_text(prompt)
+
+def extract_stored_resume_document(ref):
+    """Extract text from a resume stored in GridFS."""
+    with resume_storage.open_resume(db, ref) as resume_file:
+        return extraction_executor.extract_document(resume_file, ref.get("contentType", ""))
+
+def load_resume_text(application):
+    """
+    Return the resume text of an application, parsing the file only when the
+    extracted-text cache has no entry for its content hash.
+    """
     try:
-        # Convert base64 to binary if needed
-        if isinstance(pdf_data, str) and pdf_data.startswith('data:application/pdf;base64,'):
-            pdf_data = base64.b64decode(pdf_data.split(',')[1])
-        
-        # Open PDF from memory
-        pdf_file = fitz.open(stream=pdf_data, filetype="pdf")
-        text = ""
-        
-        # Extract text from each page
-        for page_num in range(len(pdf_file)):
-            page = pdf_file[page_num]
-            text += page.get_text()
-        
-        return text
+        ref = resume_storage.get_resume_ref(application)
+        if ref:
+            entry = resume_text_cache.get_or_extract(
+                ref["sha256"],
+                lambda: extract_stored_resume_document(ref),
+                ref.get("contentType", "")
+            )
+        else:
+            # Older applications still embed the resume as a data URL
+            resume_data = application.get('resumeData', '')
+            if not resume_data:
+                return ""
+            content_type, content = resume_storage.parse_data_url(resume_data)
+            entry = resume_text_cache.get_or_extract(
+                hashlib.sha256(content).hexdigest(),
+                lambda: extraction_executor.extract_document(content, content_type),
+                content_type
+            )
+        return entry["text"]
     except Exception as e:
-        print(f"Error extracting text from PDF: {str(e)}")
-        return ""
+        print(f"Error in load_resume_text: {str(e)}")
+        return "Error extracting text from resume"
+
+def record_analysis_tier(tier, escalated=None):
+    """Count which tier answered; escalated is set for results of the tiered mode."""
+    with _analysis_tier_lock:
+        _analysis_tier_counts[tier] += 1
+        if escalated is not None:
+            _analysis_tier_counts["tiered"] += 1
+            if escalated:
+                _analysis_tier_counts["escalated"] += 1
 
-def extract_text_from_docx(docx_data):
-    """Extract text from DOCX binary data."""
+def analysis_tier_stats():
+    with _analysis_tier_lock:
+        counts = dict(_analysis_tier_counts)
+    tiered = counts.pop("tiered")
+    escalated = counts.pop("escalated")
+    return {
+        "mode": ANALYSIS_MODE,
+        "confidence_threshold": ANALYSIS_CONFIDENCE_THRESHOLD,
+        "answered_by": counts,
+        "tiered": tiered,
+        "escalated": escalated,
+        "escalation_rate": round(escalated / tiered, 4) if tiered else None
+    }
+
+def index_resume_text(job_id, application_id, resume_text):
+    """Add a resume to its job's ranking index; failures are logged, never raised."""
     try:
-        # Convert base64 to binary if needed
-        if isinstance(docx_data, str) and docx_data.startswith('data:application/vnd.openxmlformats-officedocument.wordprocessingml.document;base64,'):
-            docx_data = base64.b64decode(docx_data.split(',')[1])
-        elif isinstance(docx_data, str) and docx_data.startswith('data:application/msword;base64,'):
-            docx_data = base64.b64decode(docx_data.split(',')[1])
-        
-        # Open DOCX from memory
-        doc = docx.Document(io.BytesIO(docx_data))
-        
-        # Extract text from paragraphs
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
+        candidate_index.get_index(job_id).add(application_id, resume_text)
     except Exception as e:
-        print(f"Error extracting text from DOCX: {str(e)}")
-        return ""
+        print(f"Failed to index resume for application {application_id}: {str(e)}")
+
+def analyze_job_application(resume_text, job_description, required_skills, mode=None):
+    """
+    Analyze a job application to determine match score and provide feedback.
 
-def extract_text_from_resume(resume_data):
-    """Extract text from resume based on file type."""
+    ANALYSIS_MODE chooses who answers:
+    - "llm": Gemini, with the rule-based matcher as a fallback if it fails
+    - "tiered": the rule-based matcher first; only results whose confidence is
+      below ANALYSIS_CONFIDENCE_THRESHOLD are escalated to Gemini
+    - "local": the rule-based matcher only
+    The result's "analysis_tier" records which tier answered: "local", "llm",
+    or "fallback" when Gemini was asked but failed.
+    """
+    mode = mode or ANALYSIS_MODE
+    local_result = None
+    if mode in ("tiered", "local"):
+        local_result = fallback_analyze_job_application(resume_text, job_description, required_skills)
+        confident = local_result.get("confidence", 0) >= ANALYSIS_CONFIDENCE_THRESHOLD
+        if mode == "local" or confident:
+            record_analysis_tier("local", escalated=False if mode == "tiered" else None)
+            local_result["analysis_tier"] = "local"
+            return local_result
+        print(f"Escalating analysis to Gemini (local confidence {local_result.get('confidence', 0)})")
+
+    escalated = True if mode == "tiered" else None
     try:
-        # Check if it's a base64 encoded file
-        if isinstance(resume_data, str):
-            if 'data:application/pdf;base64,' in resume_data:
-                return extract_text_from_pdf(resume_data)
-            elif 'data:application/vnd.openxmlformats-officedocument.wordprocessingml.document;base64,' in resume_data:
-                return extract_text_from_docx(resume_data)
-            elif 'data:application/msword;base64,' in resume_data:
-                return extract_text_from_docx(resume_data)
-            elif 'data:text/plain;base64,' in resume_data:
-                # Plain text
-                text_data = base64.b64decode(resume_data.split(',')[1]).decode('utf-8')
-                return text_data
-            elif resume_data.startswith('data:'):
-                # Try to extract from the base64 data directly
-                try:
-                    # Get the MIME type
-                    mime_type = resume_data.split(';')[0].split(':')[1]
-                    # Get the base64 part
-                    base64_data = resume_data.split(',')[1]
-                    # Decode
-                    decoded_data = base64.b64decode(base64_data)
-                    
-                    if 'pdf' in mime_type:
-                        return extract_text_from_pdf(decoded_data)
-                    elif 'word' in mime_type or 'docx' in mime_type or 'doc' in mime_type:
-                        return extract_text_from_docx(decoded_data)
-                    else:
-                        return decoded_data.decode('utf-8', errors='ignore')
-                except Exception as e:
-                    print(f"Failed to decode unknown MIME type: {str(e)}")
-                    return resume_data[:10000]  # Return a truncated version
-        
-        # If we couldn't determine the file type or extract text, return a portion of the data
-        return resume_data[:10000] if isinstance(resume_data, str) else "Unable to extract text from resume"
-    
+        result = llm_analyze_job_application(resume_text, job_description, required_skills)
+        result["analysis_tier"] = "llm"
+        record_analysis_tier("llm", escalated=escalated)
+        return result
     except Exception as e:
-        print(f"Error in extract_text_from_resume: {str(e)}")
-        return "Error extracting text from resume"
+        print(f"Gemini API error: {str(e)}")
+        print("Falling back to rule-based matching algorithm")
+        # Fall back to rule-based matching, reusing the local result if there is one
+        result = local_result or fallback_analyze_job_application(resume_text, job_description, required_skills)
+        record_analysis_tier("fallback", escalated=escalated)
+        result["analysis_tier"] = "fallback"
+        return result
 
-def analyze_job_application(resume_text, job_description, required_skills):
+def llm_analyze_job_application(resume_text, job_description, required_skills):
     """
     Analyze a job application using Gemini 1.5 to determine match score and provide feedback.
-    Falls back to rule-based matching if Gemini API is unavailable.
+    Raises if Gemini is unavailable or its response cannot be parsed.
     """
-    try:
-        # Format required skills for prompt
-        skills_text = "\n".join([f"- {skill['name']} (Importance: {skill['weight']}%)" for skill in required_skills])
-        
-        # Create a detailed prompt for Gemini with improved scoring guidelines
-        prompt = f"""
-        You are an expert AI recruitment assistant. Your task is to analyze a candidate's resume against a job description and required skills.
-        
-        # Job Description:
-        {job_description}
-        
-        # Required Skills (with importance weights):
-        {skills_text}
-        
-        # Candidate's Resume:
-        {resume_text}
-        
-        Perform a detailed analysis and provide the following outputs in a JSON structure:
-        
-        1. Calculate an overall match score (0-100) considering the weighted importance of each skill.
-        Follow these improved scoring guidelines:
-           - Be generous in recognizing skills - if the candidate mentions related technologies or frameworks, count them as partial matches
-           - Prioritize relevant experience over keyword matching
-           - Consider transferable skills and knowledge when direct mentions are missing
-           - Start with a baseline score of 70 for candidates who have most of the core skills
-           - Only reduce scores significantly when critical skills are completely missing
-        
-        2. For each required skill, determine if the candidate has it and assign a match score (0-100).
-           - Consider related technologies as partial matches (e.g., if MERN is required, having MongoDB + React experience counts significantly)
-           - Look for evidence of practical implementation, not just mentions of keywords
-           - Consider both direct mentions and implied knowledge through projects or experience
-        
-        3. Identify skills the candidate is lacking or needs improvement on.
-        
-        4. Provide specific, constructive feedback on how the candidate could improve their qualifications for this role.
-        
-        5. Summarize the candidate's strengths relevant to this role.
-        
-        Return your analysis as JSON with the following structure:
-        {{
-            "overall_match_score": <0-100>,
-            "skill_matches": [
-                {{
-                    "skill_name": "<name>",
-                    "importance_weight": <0-100>,
-                    "match_score": <0-100>,
-                    "evidence": "<evidence from resume>"
-                }},
-                ...
-            ],
-            "missing_skills": [
-                {{
-                    "skill_name": "<name>",
-                    "importance_weight": <0-100>,
-                    "improvement_suggestion": "<specific suggestion>"
-                }},
-                ...
-            ],
-            "strengths": ["<strength1>", "<strength2>", ...],
-            "improvement_areas": ["<area1>", "<area2>", ...],
-            "detailed_feedback": "<constructive feedback paragraph>"
-        }}
-        
-        IMPORTANT: 
-        - Be generous and optimistic in your evaluation
-        - Recognize both explicit mentions and implicit demonstrations of skills
-        - Consider the overall profile and relevant experience, not just keyword matching
-        - Start with a higher baseline score (70+) and only subtract if skills are clearly missing
-        - For tech roles, recognize that familiarity with one technology often indicates ability to quickly learn related ones
-        """
-        
+    # Format required skills for prompt
+    skills_text = "\n".join([f"- {skill['name']} (Importance: {skill['weight']}%)" for skill in required_skills])
+    
+    # Create a detailed prompt for Gemini with improved scoring guidelines
+    prompt = f"""
+    You are an expert AI recruitment assistant. Your task is to analyze a candidate's resume against a job description and required skills.
+    
+    # Job Description:
+    {job_description}
+    
+    # Required Skills (with importance weights):
+    {skills_text}
+    
+    # Candidate's Resume:
+    {resume_text}
+    
+    Perform a detailed analysis and provide the following outputs in a JSON structure:
+    
+    1. Calculate an overall match score (0-100) considering the weighted importance of each skill.
+    Follow these improved scoring guidelines:
+       - Be generous in recognizing skills - if the candidate mentions related technologies or frameworks, count them as partial matches
+       - Prioritize relevant experience over keyword matching
+       - Consider transferable skills and knowledge when direct mentions are missing
+       - Start with a baseline score of 70 for candidates who have most of the core skills
+       - Only reduce scores significantly when critical skills are completely missing
+    
+    2. For each required skill, determine if the candidate has it and assign a match score (0-100).
+       - Consider related technologies as partial matches (e.g., if MERN is required, having MongoDB + React experience counts significantly)
+       - Look for evidence of practical implementation, not just mentions of keywords
+       - Consider both direct mentions and implied knowledge through projects or experience
+    
+    3. Identify skills the candidate is lacking or needs improvement on.
+    
+    4. Provide specific, constructive feedback on how the candidate could improve their qualifications for this role.
+    
+    5. Summarize the candidate's strengths relevant to this role.
+    
+    Return your analysis as JSON with the following structure:
+    {{
+        "overall_match_score": <0-100>,
+        "skill_matches": [
+            {{
+                "skill_name": "<name>",
+                "importance_weight": <0-100>,
+                "match_score": <0-100>,
+                "evidence": "<evidence from resume>"
+            }},
+            ...
+        ],
+        "missing_skills": [
+            {{
+                "skill_name": "<name>",
+                "importance_weight": <0-100>,
+                "improvement_suggestion": "<specific suggestion>"
+            }},
+            ...
+        ],
+        "strengths": ["<strength1>", "<strength2>", ...],
+        "improvement_areas": ["<area1>", "<area2>", ...],
+        "detailed_feedback": "<constructive feedback paragraph>"
+    }}
+    
+    IMPORTANT: 
+    - Be generous and optimistic in your evaluation
+    - Recognize both explicit mentions and implicit demonstrations of skills
+    - Consider the overall profile and relevant experience, not just keyword matching
+    - Start with a higher baseline score (70+) and only subtract if skills are clearly missing
+    - For tech roles, recognize that familiarity with one technology often indicates ability to quickly learn related ones
+    """
+    
+    # Try to generate response from Gemini with timeout
+    response_text = generate_text(prompt)
+    
+    # Extract JSON from the response
+    json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
+    if json_match:
+        result_json = json.loads(json_match.group(1))
+    else:
         try:
-            # Try to generate response from Gemini with timeout
-            response = model.generate_content(prompt)
-            response_text = response.text
-            
-            # Extract JSON from the response
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
+            # Try direct parsing if no code blocks found
+            result_json = json.loads(response_text)
+        except:
+            # If still can't parse, try to extract anything between curly braces
+            json_match = re.search(r'({.*})', response_text, re.DOTALL)
             if json_match:
                 result_json = json.loads(json_match.group(1))
             else:
-                try:
-                    # Try direct parsing if no code blocks found
-                    result_json = json.loads(response_text)
-                except:
-                    # If still can't parse, try to extract anything between curly braces
-                    json_match = re.search(r'({.*})', response_text, re.DOTALL)
-                    if json_match:
-                        result_json = json.loads(json_match.group(1))
-                    else:
-                        raise ValueError("Could not extract JSON from Gemini response")
-            
-            # Apply additional score adjustments to ensure more balanced scoring
-            if "overall_match_score" in result_json:
-                # Adjust the final score to be more generous
-                original_score = result_json["overall_match_score"]
-                
-                # Boost scores below 75 to be more optimistic
-                if original_score < 75:
-                    # Scale up low scores more aggressively
-                    # Formula: new_score = original_score + (75 - original_score) * 0.4
-                    # This gives a boost proportional to how far below 75 the score is
-                    adjustment = (75 - original_score) * 0.4
-                    result_json["overall_match_score"] = min(98, int(original_score + adjustment))
-                    
-                    # Add a note about the adjustment
-                    result_json["score_note"] = "Score was adjusted to better reflect candidate potential and transferable skills."
+                raise ValueError("Could not extract JSON from Gemini response")
+    
+    # Apply additional score adjustments to ensure more balanced scoring
+    if "overall_match_score" in result_json:
+        # Adjust the final score to be more generous
+        original_score = result_json["overall_match_score"]
+        
+        # Boost scores below 75 to be more optimistic
+        if original_score < 75:
+            # Scale up low scores more aggressively
+            # Formula: new_score = original_score + (75 - original_score) * 0.4
+            # This gives a boost proportional to how far below 75 the score is
+            adjustment = (75 - original_score) * 0.4
+            result_json["overall_match_score"] = min(98, int(original_score + adjustment))
             
-            return result_json
-        except Exception as e:
-            print(f"Gemini API error: {str(e)}")
-            print("Falling back to rule-based matching algorithm")
-            # Fall back to rule-based matching
-            return fallback_analyze_job_application(resume_text, job_description, required_skills)
+            # Add a note about the adjustment
+            result_json["score_note"] = "Score was adjusted to better reflect candidate potential and transferable skills."
     
-    except Exception as e:
-        print(f"Error in analyze_job_application: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return fallback_analyze_job_application(resume_text, job_description, required_skills)
+    return result_json
 
 def fallback_analyze_job_application(resume_text, job_description, required_skills):
     """
     Fallback mechanism for resume analysis when Gemini API is unavailable.
-    Uses rule-based matching to generate scores and feedback.
+    Uses rule-based matching to generate scores and feedback. Also the first
+    tier of the tiered mode, so the result includes a "confidence" (0-1).
     """
     print("Using fallback analysis mechanism")
     try:
@@ -261,48 +311,59 @@ def fallback_analyze_job_application(resume_text, job_description, required_skil
         missing_skills = []
         total_score = 0
         total_weight = 0
+        total_certainty = 0
         resume_lower = resume_text.lower()
         
+        # One pass over the resume finds and scores every taxonomy skill it mentions
+        taxonomy = skill_taxonomy.get_taxonomy()
+        resume_skills = {scored["skill"]: scored for scored in skill_scoring.score_skills(resume_text, taxonomy)}
+        profile = None
+        
+        def context_at(offset):
+            # Text around a mention, used as evidence
+            return resume_text[max(0, offset - 50):offset + 50].replace('\n', ' ').strip()
+        
         # Analyze each required skill
         for skill in required_skills:
             skill_name = skill['name']
             importance_weight = skill['weight']
             total_weight += importance_weight
             
-            # Determine if skill is in resume (simple keyword matching)
-            skill_keywords = [skill_name.lower()]
-            # Add related terms for common skills
-            if skill_name.lower() == "javascript":
-                skill_keywords.extend(["js", "typescript", "react", "vue", "angular", "node"])
-            elif skill_name.lower() == "python":
-                skill_keywords.extend(["django", "flask", "pandas", "numpy", "scikit", "jupyter"])
-            elif skill_name.lower() == "java":
-                skill_keywords.extend(["spring", "hibernate", "j2ee", "maven", "gradle"])
-            
-            # Calculate match score based on keyword presence
+            # Calculate match score from the skill's prominence in the resume
             skill_score = 0
             evidence = ""
+            evidence_kind = "absent"
             
-            for keyword in skill_keywords:
-                if keyword in resume_lower:
-                    # Find the context around the keyword
-                    keyword_index = resume_lower.find(keyword)
-                    start_idx = max(0, keyword_index - 50)
-                    end_idx = min(len(resume_lower), keyword_index + 50)
-                    context = resume_text[start_idx:end_idx].replace('\n', ' ').strip()
-                    
-                    # Primary keyword gets higher score
-                    if keyword == skill_name.lower():
-                        skill_score = 90
-                        evidence = f"Direct mention of {skill_name} in context: '...{context}...'"
-                        break
-                    else:
-                        # Related keyword gets partial score
-                        skill_score = 70
-                        evidence = f"Related technology found ({keyword}) in context: '...{context}...'"
+            # Resolve synonyms (JS, ReactJS, Golang, ...) to the canonical skill
+            canonical = taxonomy.canonical(skill_name)
+            if canonical in resume_skills:
+                # Primary keyword gets higher score
+                found = resume_skills[canonical]
+                skill_score = skill_scoring.scale(found["score"], 70, 100)
+                evidence = f"Direct mention of {skill_name} in context: '...{context_at(found['offset'])}...'"
+                evidence_kind = "direct"
+            elif canonical:
+                # Related technology (React for JavaScript, Django for Python) gets partial score
+                related = [resume_skills[name] for name in taxonomy.related(canonical) if name in resume_skills]
+                if related:
+                    found = max(related, key=lambda item: (item["score"], item["skill"]))
+                    skill_score = skill_scoring.scale(found["score"], 50, 80)
+                    evidence = f"Related technology found ({found['skill']}) in context: '...{context_at(found['offset'])}...'"
+                    evidence_kind = "related"
+            else:
+                # Skills outside the taxonomy fall back to a plain substring search
+                needle = skill_name.lower()
+                evidence_kind = "unknown"
+                offsets = [match.start() for match in re.finditer(re.escape(needle), resume_lower)] if needle else []
+                if offsets:
+                    profile = profile or skill_scoring.ResumeProfile(resume_text)
+                    skill_score = skill_scoring.scale(profile.score(offsets)[0], 70, 100)
+                    evidence = f"Direct mention of {skill_name} in context: '...{context_at(offsets[0])}...'"
+                    evidence_kind = "keyword"
             
             # Weighted contribution to total score
             total_score += skill_score * importance_weight / 100
+            total_certainty += SKILL_EVIDENCE_CERTAINTY[evidence_kind] * importance_weight
             
             if skill_score > 0:
                 skill_matches.append({
@@ -321,6 +382,15 @@ def fallback_analyze_job_application(resume_text, job_description, required_skil
         # Calculate overall score
         overall_match_score = int(total_score / (total_weight / 100)) if total_weight > 0 else 70
         
+        # Confidence (0-1): how trustworthy the per-skill verdicts are, discounted
+        # when the score sits in the ambiguous middle of the range
+        if total_weight > 0:
+            certainty = total_certainty / total_weight
+            decisiveness = min(1.0, abs(overall_match_score - ANALYSIS_SCORE_MIDPOINT) / ANALYSIS_DECISIVE_MARGIN)
+            confidence = round(certainty * (0.4 + 0.6 * decisiveness), 3)
+        else:
+            confidence = 0.0
+        
         # Generate generic strengths based on skills matched
         strengths = []
         if skill_matches:
@@ -351,7 +421,8 @@ def fallback_analyze_job_application(resume_text, job_description, required_skil
             "strengths": strengths,
             "improvement_areas": improvement_areas,
             "detailed_feedback": detailed_feedback,
-            "score_note": "Score was calculated using our fallback algorithm. This provides a reasonable estimate but may be less precise than our AI-powered analysis."
+            "score_note": "Score was calculated using our fallback algorithm. This provides a reasonable estimate but may be less precise than our AI-powered analysis.",
+            "confidence": confidence
         }
         
     except Exception as e:
@@ -369,6 +440,256 @@ def fallback_analyze_job_application(resume_text, job_description, required_skil
             "detailed_feedback": "We encountered an issue analyzing your resume in detail, but your background appears relevant. For more accurate matching, ensure your resume clearly lists your technical skills and experience."
         }
 
+def build_application_analysis(application, job):
+    """Extract the resume text of an application and analyze it against the job."""
+    application_id = str(application.get("_id"))
+    job_id = str(job.get("_id"))
+    
+    # Extract text from resume
+    print(f"Extracting text from resume for application {application_id}")
+    resume_text = load_resume_text(application)
+    
+    if not resume_text or resume_text == "Error extracting text from resume":
+        print(f"Failed to extract text from resume for application {application_id}. Creating default analysis.")
+        analysis_result = {
+            "overall_match_score": 70,  # Default to a more positive score
+            "skill_matches": [],
+            "missing_skills": [],
+            "strengths": ["Unable to determine specific strengths due to resume processing issues"],
+            "improvement_areas": ["Please ensure your resume is properly formatted"],
+            "detailed_feedback": "We couldn't analyze your resume in detail, but we've assigned a provisional score. Please ensure your resume is in a standard format (PDF, DOCX) for better results."
+        }
+    else:
+        # Get job description and skills
+        job_description = job.get('description', '')
+        required_skills = job.get('skills', [])
+        
+        print(f"Resume text extracted successfully, length: {len(resume_text)} characters")
+        index_resume_text(job_id, application_id, resume_text)
+        
+        # If no skills were provided in the job, create a reasonable default
+        if not required_skills or len(required_skills) == 0:
+            print(f"No skills found for job {job_id}. Creating default skill requirements.")
+            job_title = job.get('title', '').lower()
+            
+            # Extract likely skills from job title
+            if "developer" in job_title or "engineer" in job_title:
+                if "front" in job_title:
+                    required_skills = [
+                        {"name": "HTML/CSS", "weight": 80},
+                        {"name": "JavaScript", "weight": 90}
+                    ]
+                elif "back" in job_title:
+                    required_skills = [
+                        {"name": "Server-side programming", "weight": 90},
+                        {"name": "Database skills", "weight": 80}
+                    ]
+                elif "full" in job_title:
+                    required_skills = [
+                        {"name": "Frontend technologies", "weight": 80},
+                        {"name": "Backend technologies", "weight": 80}
+                    ]
+                else:
+                    required_skills = [
+                        {"name": "Programming skills", "weight": 90},
+                        {"name": "Problem solving", "weight": 80}
+                    ]
+        
+        # Analyze the application
+        print(f"Starting analysis with {len(required_skills)} required skills")
+        analysis_result = analyze_job_application(resume_text, job_description, required_skills)
+        print(f"Analysis complete. Overall match score: {analysis_result.get('overall_match_score', 0)}")
+    
+    return analysis_result
+
+def save_analysis_result(application_id, analysis_result):
+    """Store an analysis result and match score on the application."""
+    db.applications.update_one(
+        {"_id": ObjectId(application_id)},
+        {
+            "$set": {
+                "analysis": analysis_result,
+                "matchScore": analysis_result.get("overall_match_score", 0),
+                "analyzed_at": datetime.datetime.utcnow()
+            }
+        }
+    )
+    application_view.invalidate(application_id)
+
+def handle_analysis_task(payload):
+    """Queue handler that analyzes one application; raising makes the queue retry it."""
+    application_id = payload["application_id"]
+    job_id = payload["job_id"]
+    
+    application = db.applications.find_one({"_id": ObjectId(application_id)})
+    if not application:
+        print(f"Application not found for queued analysis: {application_id}")
+        return
+    
+    job = db.jobs.find_one({"_id": ObjectId(job_id)})
+    if not job:
+        print(f"Job not found for queued analysis: {job_id}")
+        return
+    
+    analysis_result = build_application_analysis(application, job)
+    save_analysis_result(application_id, analysis_result)
+    print(f"Saved queued analysis for application {application_id}")
+
+def handle_index_task(payload):
+    """Queue handler that adds an application's resume to its job's ranking index; raising retries it."""
+    application_id = payload["application_id"]
+    job_id = payload["job_id"]
+    
+    index = candidate_index.get_index(job_id)
+    if application_id in index:
+        return
+    application = db.applications.find_one({"_id": ObjectId(application_id)}, REANALYSIS_PROJECTION)
+    if not application:
+        print(f"Application not found for queued indexing: {application_id}")
+        return
+    
+    resume_text = load_resume_text(application)
+    if not resume_text or resume_text == "Error extracting text from resume":
+        raise ValueError(f"Could not extract resume text for application {application_id}")
+    index.add(application_id, resume_text)
+
+# Applications store feedback in a field per final status
+FEEDBACK_FIELDS = application_view.FEEDBACK_FIELDS
+
+def generate_status_feedback(application, new_status, recruiter_notes):
+    """Write the candidate-facing message for a final decision, or return None for other statuses."""
+    if new_status == "rejected":
+        # Generate a personalized rejection feedback using Gemini
+        analysis = application.get("analysis", {})
+        missing_skills = analysis.get("missing_skills", [])
+        improvement_areas = analysis.get("improvement_areas", [])
+        
+        prompt = f"""
+        You're a helpful recruitment AI sending a rejection feedback email to a candidate.
+        
+        The candidate applied for the position: {application.get('jobTitle', 'the position')}
+        
+        Their application was rejected for the following reasons:
+        - Missing skills: {", ".join([skill.get("skill_name", "") for skill in missing_skills])}
+        - Areas for improvement: {", ".join(improvement_areas)}
+        - Recruiter notes: {recruiter_notes}
+        
+        Write a polite, constructive, and empathetic feedback message (150-200 words) to the candidate explaining:
+        1. Thank them for their application
+        2. Gently explain that they weren't selected
+        3. Provide constructive feedback on missing skills and how they could improve
+        4. Encourage them for future opportunities
+        
+        Keep the tone professional, kind, and helpful. Don't be overly negative or discouraging.
+        """
+        return generate_text(prompt)
+    
+    if new_status == "shortlisted":
+        # Generate acceptance feedback
+        prompt = f"""
+        You're a helpful recruitment AI sending a positive feedback email to a candidate.
+        
+        The candidate applied for the position: {application.get('jobTitle', 'the position')}
+        
+        Their application was shortlisted with these recruiter notes:
+        {recruiter_notes}
+        
+        Write a brief, professional, and encouraging message (100-150 words) to the candidate:
+        1. Thank them for their application
+        2. Inform them they've been shortlisted
+        3. Explain the next steps in the process
+        4. Mention that someone from the recruitment team will contact them soon
+        
+        Keep the tone professional but warm and positive.
+        """
+        return generate_text(prompt)
+    
+    return None
+
+def save_status_feedback(application_id, status, feedback):
+    """
+    Attach feedback to the application while it still has the status it was
+    written for. Returns False if the recruiter has changed the status since.
+    """
+    result = db.applications.update_one(
+        {"_id": ObjectId(application_id), "status": status},
+        {
+            "$set": {
+                FEEDBACK_FIELDS[status]: feedback,
+                "feedback_status": "ready",
+                "feedback_at": datetime.datetime.utcnow()
+            }
+        }
+    )
+    application_view.invalidate(application_id)
+    return result.matched_count > 0
+
+def handle_feedback_task(payload):
+    """Queue handler that writes decision feedback and notifies the applicant; raising retries it."""
+    application_id = payload["application_id"]
+    status = payload["status"]
+    
+    application = db.applications.find_one(
+        {"_id": ObjectId(application_id)},
+        {"status": 1, "analysis": 1, "jobTitle": 1, "companyName": 1, "jobId": 1, "applicantId": 1}
+    )
+    if not application:
+        print(f"Application not found for queued feedback: {application_id}")
+        return
+    if application.get("status") != status:
+        # The decision changed while this task waited; a newer task covers it
+        print(f"Skipping stale {status} feedback for application {application_id}")
+        return
+    
+    feedback = generate_status_feedback(application, status, payload.get("notes", ""))
+    if not save_status_feedback(application_id, status, feedback):
+        print(f"Status of application {application_id} changed during feedback generation")
+        return
+    
+    # auth.py streams new notifications to connected clients
+    if application.get("applicantId"):
+        db.notifications.insert_one({
+            "userId": application["applicantId"],
+            "type": "feedback",
+            "applicationId": application_id,
+            "jobId": str(application.get("jobId", "")),
+            "jobTitle": application.get("jobTitle", "Job"),
+            "company": application.get("companyName", "Company"),
+            "status": "accepted" if status == "shortlisted" else status,
+            "read": False,
+            "timestamp": datetime.datetime.utcnow()
+        })
+    print(f"Saved queued {status} feedback for application {application_id}")
+
+def handle_feedback_failure(payload, error):
+    """
+    Called once a feedback task has used up its attempts: mark the feedback
+    as failed so the application does not stay "queued" forever.
+    """
+    application_id = payload["application_id"]
+    result = db.applications.update_one(
+        {"_id": ObjectId(application_id), "status": payload["status"], "feedback_status": "queued"},
+        {"$set": {"feedback_status": "failed", "feedback_error": error, "feedback_at": datetime.datetime.utcnow()}}
+    )
+    application_view.invalidate(application_id)
+    if result.modified_count:
+        print(f"Gave up on {payload['status']} feedback for application {application_id}: {error}")
+
+# Start the queue workers when the module loads; tests and benchmarks turn this off
+ANALYSIS_WORKERS_AUTOSTART = os.getenv("ANALYSIS_WORKERS_AUTOSTART", "true").lower() == "true"
+
+# Bounded pool of workers consuming the durable analysis, feedback and indexing queue
+analysis_workers = task_queue.TaskWorkerPool(
+    db,
+    {
+        task_queue.TASK_ANALYSIS: handle_analysis_task,
+        task_queue.TASK_FEEDBACK: handle_feedback_task,
+        task_queue.TASK_INDEX: handle_index_task
+    },
+    num_workers=int(os.getenv("ANALYSIS_WORKERS", "4")),
+    failure_handlers={task_queue.TASK_FEEDBACK: handle_feedback_failure}
+)
+
 @app.route('/api/analyze-application', methods=['POST'])
 def analyze_application():
     """API endpoint to analyze a job application."""
@@ -410,73 +731,11 @@ def analyze_application():
             print(f"Job not found: {job_id}")
             return jsonify({"error": "Job not found"}), 404
         
-        # Extract text from resume
-        print(f"Extracting text from resume for application {application_id}")
-        resume_data = application.get('resumeData', '')
-        resume_text = extract_text_from_resume(resume_data)
-        
-        if not resume_text or resume_text == "Error extracting text from resume":
-            print(f"Failed to extract text from resume for application {application_id}. Creating default analysis.")
-            analysis_result = {
-                "overall_match_score": 70,  # Default to a more positive score
-                "skill_matches": [],
-                "missing_skills": [],
-                "strengths": ["Unable to determine specific strengths due to resume processing issues"],
-                "improvement_areas": ["Please ensure your resume is properly formatted"],
-                "detailed_feedback": "We couldn't analyze your resume in detail, but we've assigned a provisional score. Please ensure your resume is in a standard format (PDF, DOCX) for better results."
-            }
-        else:
-            # Get job description and skills
-            job_description = job.get('description', '')
-            required_skills = job.get('skills', [])
-            
-            print(f"Resume text extracted successfully, length: {len(resume_text)} characters")
-            
-            # If no skills were provided in the job, create a reasonable default
-            if not required_skills or len(required_skills) == 0:
-                print(f"No skills found for job {job_id}. Creating default skill requirements.")
-                job_title = job.get('title', '').lower()
-                
-                # Extract likely skills from job title
-                if "developer" in job_title or "engineer" in job_title:
-                    if "front" in job_title:
-                        required_skills = [
-                            {"name": "HTML/CSS", "weight": 80},
-                            {"name": "JavaScript", "weight": 90}
-                        ]
-                    elif "back" in job_title:
-                        required_skills = [
-                            {"name": "Server-side programming", "weight": 90},
-                            {"name": "Database skills", "weight": 80}
-                        ]
-                    elif "full" in job_title:
-                        required_skills = [
-                            {"name": "Frontend technologies", "weight": 80},
-                            {"name": "Backend technologies", "weight": 80}
-                        ]
-                    else:
-                        required_skills = [
-                            {"name": "Programming skills", "weight": 90},
-                            {"name": "Problem solving", "weight": 80}
-                        ]
-            
-            # Analyze the application
-            print(f"Starting analysis with {len(required_skills)} required skills")
-            analysis_result = analyze_job_application(resume_text, job_description, required_skills)
-            print(f"Analysis complete. Overall match score: {analysis_result.get('overall_match_score', 0)}")
+        analysis_result = build_application_analysis(application, job)
         
         # Save analysis result to the application
         try:
-            db.applications.update_one(
-                {"_id": ObjectId(application_id)},
-                {
-                    "$set": {
-                        "analysis": analysis_result,
-                        "matchScore": analysis_result.get("overall_match_score", 0),
-                        "analyzed_at": datetime.datetime.utcnow()
-                    }
-                }
-            )
+            save_analysis_result(application_id, analysis_result)
             print(f"Successfully saved analysis result for application {application_id}")
         except Exception as e:
             print(f"Error saving analysis result: {str(e)}")
@@ -525,110 +784,31 @@ def update_application_status():
         
         print(f"Found application: {application.get('applicantName', 'Unknown')} for job: {application.get('jobTitle', 'Unknown')}")
         
-        # Update application status
-        db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {
-                "$set": {
-                    "status": new_status,
-                    "notes": recruiter_notes,
-                    "updated_at": datetime.datetime.utcnow()
-                }
-            }
+        # Update application status and the job's status counters
+        application_counters.change_status(
+            db,
+            application_id,
+            new_status,
+            {"notes": recruiter_notes, "updated_at": datetime.datetime.utcnow()}
         )
         
-        # Generate feedback based on status
-        if new_status == "rejected":
-            # Generate a personalized rejection feedback using Gemini
-            analysis = application.get("analysis", {})
-            missing_skills = analysis.get("missing_skills", [])
-            improvement_areas = analysis.get("improvement_areas", [])
-            
-            prompt = f"""
-            You're a helpful recruitment AI sending a rejection feedback email to a candidate.
-            
-            The candidate applied for the position: {application.get('jobTitle', 'the position')}
-            
-            Their application was rejected for the following reasons:
-            - Missing skills: {", ".join([skill.get("skill_name", "") for skill in missing_skills])}
-            - Areas for improvement: {", ".join(improvement_areas)}
-            - Recruiter notes: {recruiter_notes}
-            
-            Write a polite, constructive, and empathetic feedback message (150-200 words) to the candidate explaining:
-            1. Thank them for their application
-            2. Gently explain that they weren't selected
-            3. Provide constructive feedback on missing skills and how they could improve
-            4. Encourage them for future opportunities
-            
-            Keep the tone professional, kind, and helpful. Don't be overly negative or discouraging.
-            """
-            
-            response = model.generate_content(prompt)
-            feedback = response.text
-            
-            # Save the feedback
-            db.applications.update_one(
-                {"_id": ObjectId(application_id)},
-                {
-                    "$set": {
-                        "rejection_feedback": feedback
-                    }
-                }
-            )
-            
-            # Here you would normally send an email to the candidate
-            # For now we'll just return the feedback
-            return jsonify({
-                "success": True,
-                "status": new_status,
-                "feedback": feedback
-            }), 200
-        
-        elif new_status == "shortlisted":
-            # Generate acceptance feedback
-            prompt = f"""
-            You're a helpful recruitment AI sending a positive feedback email to a candidate.
-            
-            The candidate applied for the position: {application.get('jobTitle', 'the position')}
-            
-            Their application was shortlisted with these recruiter notes:
-            {recruiter_notes}
-            
-            Write a brief, professional, and encouraging message (100-150 words) to the candidate:
-            1. Thank them for their application
-            2. Inform them they've been shortlisted
-            3. Explain the next steps in the process
-            4. Mention that someone from the recruitment team will contact them soon
-            
-            Keep the tone professional but warm and positive.
-            """
-            
-            response = model.generate_content(prompt)
-            feedback = response.text
-            
-            # Save the feedback
-            db.applications.update_one(
-                {"_id": ObjectId(application_id)},
-                {
-                    "$set": {
-                        "acceptance_feedback": feedback
-                    }
-                }
-            )
-            
-            # Here you would normally send an email to the candidate
-            return jsonify({
-                "success": True,
-                "status": new_status,
-                "feedback": feedback
-            }), 200
-        
-        else:
+        # Generate and save feedback for final decisions
+        feedback = generate_status_feedback(application, new_status, recruiter_notes)
+        if feedback is None:
             # For other statuses, just return success
             return jsonify({
                 "success": True,
                 "status": new_status
             }), 200
+        
+        save_status_feedback(application_id, new_status, feedback)
+        
+        # Here you would normally send an email to the candidate
+        return jsonify({
+            "success": True,
+            "status": new_status,
+            "feedback": feedback
+        }), 200
     
     except Exception as e:
         print(f"Error updating application status: {str(e)}")
@@ -644,48 +824,17 @@ def get_application_feedback():
         if not application_id:
             return jsonify({"error": "Application ID is required"}), 400
         
-        # Fetch application from database
-        try:
-            application = db.applications.find_one({"_id": ObjectId(application_id)})
-        except Exception as e:
-            print(f"Error converting to ObjectId: {str(e)}")
+        if not ObjectId.is_valid(application_id):
             return jsonify({"error": f"Invalid application ID format: {application_id}"}), 400
-            
-        if not application:
-            return jsonify({"error": "Application not found"}), 404
-        
-        # Prepare response based on status
-        status = application.get("status", "pending")
-        response_data = {
-            "status": status,
-            "jobTitle": application.get("jobTitle", ""),
-            "companyName": application.get("companyName", ""),
-            "appliedAt": application.get("created_at"),
-            "updatedAt": application.get("updated_at")
-        }
         
-        if status == "rejected" and "rejection_feedback" in application:
-            response_data["feedback"] = application["rejection_feedback"]
-            
-            # Add improvement suggestions from analysis
-            if "analysis" in application:
-                analysis = application["analysis"]
-                response_data["match_score"] = analysis.get("overall_match_score", 0)
-                response_data["missing_skills"] = analysis.get("missing_skills", [])
-                response_data["improvement_areas"] = analysis.get("improvement_areas", [])
-        
-        elif status == "shortlisted" and "acceptance_feedback" in application:
-            response_data["feedback"] = application["acceptance_feedback"]
-            
-            # Add strengths from analysis
-            if "analysis" in application:
-                analysis = application["analysis"]
-                response_data["match_score"] = analysis.get("overall_match_score", 0)
-                response_data["strengths"] = analysis.get("strengths", [])
+        # One projected read, shared with the auth service's status endpoint
+        view = application_view.get_feedback_view(db, application_id)
+        if not view:
+            return jsonify({"error": "Application not found"}), 404
         
         return jsonify({
             "success": True,
-            "application": response_data
+            "application": view
         }), 200
     
     except Exception as e:
@@ -694,9 +843,183 @@ def get_application_feedback():
         traceback.print_exc()
         return jsonify({"error": f"Failed to get application feedback: {str(e)}"}), 500
 
+@app.route('/api/rank-candidates', methods=['GET'])
+def rank_candidates():
+    """
+    API endpoint ranking a job's applicants by BM25 relevance of their resume
+    text to the job's description and skills, without calling Gemini.
+    Ranks what is indexed now. Applications not indexed yet are queued for
+    the workers (up to CANDIDATE_INDEX_BACKFILL_LIMIT per request) and
+    counted in "unindexed".
+    """
+    try:
+        job_id = request.args.get('job_id')
+        if not job_id:
+            return jsonify({"error": "Job ID is required"}), 400
+        try:
+            # One spelling (lowercase hex) for the index key and the jobId lookups
+            job_id = str(ObjectId(job_id))
+        except Exception:
+            return jsonify({"error": f"Invalid job ID format: {job_id}"}), 400
+        job = db.jobs.find_one({"_id": ObjectId(job_id)}, {"title": 1, "description": 1, "skills": 1})
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        
+        try:
+            limit = min(max(int(request.args.get('limit', RANKING_DEFAULT_LIMIT)), 1), RANKING_MAX_LIMIT)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        
+        index = candidate_index.get_index(job_id)
+        application_ids = [str(application["_id"]) for application in db.applications.find({"jobId": job_id}, {"_id": 1})]
+        
+        # Forget applications that no longer exist
+        for stale_id in index.ids() - set(application_ids):
+            index.remove(stale_id)
+        
+        # Queue applications whose resumes have not been seen yet; duplicates of waiting tasks are skipped
+        missing_ids = [application_id for application_id in application_ids if application_id not in index]
+        queued = task_queue.enqueue_many(
+            db,
+            task_queue.TASK_INDEX,
+            [
+                (application_id, {"application_id": application_id, "job_id": job_id})
+                for application_id in missing_ids[:CANDIDATE_INDEX_BACKFILL_LIMIT]
+            ]
+        )
+        if queued:
+            print(f"Queued {queued} resumes for indexing for job {job_id}")
+        
+        query = candidate_index.build_query(job.get('description', ''), job.get('skills', []))
+        ranked = index.rank(query, limit=limit)
+        
+        # Applicant details for the shortlist in one read
+        details = {
+            str(application["_id"]): application
+            for application in db.applications.find(
+                {"_id": {"$in": [ObjectId(application_id) for application_id, _ in ranked]}},
+                {"applicantId": 1, "applicantName": 1, "status": 1, "matchScore": 1}
+            )
+        }
+        top_score = ranked[0][1] if ranked else 0
+        candidates = []
+        for position, (application_id, score) in enumerate(ranked, start=1):
+            application = details.get(application_id, {})
+            candidates.append({
+                "rank": position,
+                "applicationId": application_id,
+                "applicantId": application.get("applicantId"),
+                "applicantName": application.get("applicantName", ""),
+                "status": application.get("status", "pending"),
+                "matchScore": application.get("matchScore", 0),
+                "relevance": int(round(100 * score / top_score)) if top_score else 0,
+                "score": round(score, 4)
+            })
+        
+        return jsonify({
+            "success": True,
+            "jobId": job_id,
+            "candidates": candidates,
+            "indexed": len(index),
+            "unindexed": len(missing_ids),
+            "queued": queued,
+            "total": len(application_ids)
+        }), 200
+    
+    except Exception as e:
+        print(f"Error ranking candidates: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Failed to rank candidates: {str(e)}"}), 500
+
+@app.route('/api/llm-cache/stats', methods=['GET'])
+def llm_cache_stats():
+    """API endpoint exposing LLM response cache hit/miss counters."""
+    return jsonify(response_cache.stats()), 200
+
+@app.route('/api/analysis-tiers/stats', methods=['GET'])
+def analysis_tiers_stats():
+    """API endpoint exposing which analysis tier answered and how often the tiered mode escalated."""
+    return jsonify(analysis_tier_stats()), 200
+
+@app.route('/api/text-cache/stats', methods=['GET'])
+def text_cache_stats():
+    """API endpoint exposing extracted-text cache and extraction pool counters."""
+    return jsonify({**resume_text_cache.stats(), "extraction": extraction_executor.stats()}), 200
+
+@app.route('/api/db/slow-queries', methods=['GET'])
+def db_slow_queries():
+    """API endpoint summarising slow and unindexed queries recorded by the MongoDB profiler."""
+    try:
+        min_millis = int(request.args.get('min_millis', 100))
+        return jsonify({"success": True, "queries": db_indexes.slow_queries(db, min_millis=min_millis)}), 200
+    except Exception as e:
+        print(f"Error reading profiler data: {str(e)}")
+        return jsonify({"error": f"Failed to read profiler data: {str(e)}"}), 500
+
+@app.route('/api/analysis-queue/stats', methods=['GET'])
+def analysis_queue_stats():
+    """API endpoint exposing work queue depth and lag."""
+    try:
+        return jsonify({"success": True, "queues": task_queue.queue_stats(db)}), 200
+    except Exception as e:
+        print(f"Error getting queue stats: {str(e)}")
+        return jsonify({"error": f"Failed to get queue stats: {str(e)}"}), 500
+
+def reanalyze_application(application, job_description, required_skills):
+    """Reanalyze one application; returns (application, result) with result None on failure."""
+    application_id = str(application.get("_id"))
+    try:
+        print(f"Reanalyzing application {application_id}")
+        
+        # Extract text from resume
+        resume_text = load_resume_text(application)
+        
+        if not resume_text or resume_text == "Error extracting text from resume":
+            print(f"Failed to extract text from resume for application {application_id}")
+            return application, None
+        
+        if application.get("jobId"):
+            index_resume_text(application["jobId"], application_id, resume_text)
+        return application, analyze_job_application(resume_text, job_description, required_skills)
+    except Exception as e:
+        print(f"Error reanalyzing application {application_id}: {str(e)}")
+        return application, None
+
+def format_reanalysis_run(run):
+    """Format a reanalysis run document as a progress report."""
+    if not run:
+        return None
+    return {
+        "status": run.get("status"),
+        "total": run.get("total", 0),
+        "processed": run.get("processed", 0),
+        "updated": run.get("updated", 0),
+        "failed": run.get("failed", 0),
+        "startedAt": run["started_at"].isoformat() if run.get("started_at") else None,
+        "updatedAt": run["updated_at"].isoformat() if run.get("updated_at") else None,
+        "completedAt": run["completed_at"].isoformat() if run.get("completed_at") else None
+    }
+
+@app.route('/api/reanalyze-job-applications/status', methods=['GET'])
+def reanalysis_status():
+    """API endpoint reporting the progress of the latest reanalysis run for a job."""
+    job_id = request.args.get('job_id')
+    if not job_id:
+        return jsonify({"error": "Job ID is required"}), 400
+    
+    run = db.reanalysis_runs.find_one({"_id": job_id})
+    if not run:
+        return jsonify({"error": "No reanalysis run found for this job"}), 404
+    
+    return jsonify({"success": True, "progress": format_reanalysis_run(run)}), 200
+
 @app.route('/api/reanalyze-job-applications', methods=['POST'])
 def reanalyze_job_applications():
-    """API endpoint to reanalyze all applications for a specific job."""
+    """
+    API endpoint to reanalyze all applications for a specific job.
+    Pass "resume": true to continue an interrupted run instead of starting over.
+    """
     try:
         data = request.json
         
@@ -724,59 +1047,140 @@ def reanalyze_job_applications():
         job_description = job.get('description', '')
         required_skills = job.get('skills', [])
         
-        # Fetch all applications for this job
-        applications = list(db.applications.find({"jobId": job_id}))
-        
-        if not applications:
+        # Only applications that have not been reanalyzed by this run yet
+        if db.applications.count_documents({"jobId": job_id}, limit=1) == 0:
             return jsonify({"message": "No applications found for this job"}), 200
         
+        now = datetime.datetime.utcnow()
+        # Take the job's run lock atomically: match unless a run is active and fresh,
+        # upserting the first run; a concurrent request fails with a duplicate key
+        try:
+            run = db.reanalysis_runs.find_one_and_update(
+                {
+                    "_id": job_id,
+                    "$or": [
+                        {"status": {"$ne": "running"}},
+                        {"updated_at": {"$lt": now - datetime.timedelta(seconds=REANALYSIS_STALE_SECONDS)}}
+                    ]
+                },
+                {"$set": {"status": "running", "updated_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            run = db.reanalysis_runs.find_one({"_id": job_id})
+            return jsonify({"error": "Reanalysis is already in progress for this job", "progress": format_reanalysis_run(run)}), 409
+        
+        if data.get('resume') and run and run.get("status") != "completed" and run.get("started_at"):
+            # Continue an interrupted run: skip applications it already reanalyzed
+            run_started_at = run["started_at"]
+            print(f"Resuming reanalysis run for job {job_id} started at {run_started_at}")
+        else:
+            run_started_at = now
+            db.reanalysis_runs.replace_one(
+                {"_id": job_id},
+                {
+                    "status": "running",
+                    "started_at": run_started_at,
+                    "updated_at": now,
+                    "total": db.applications.count_documents({"jobId": job_id}),
+                    "processed": 0,
+                    "updated": 0,
+                    "failed": 0
+                },
+                upsert=True
+            )
+        
+        query = {
+            "jobId": job_id,
+            "$or": [
+                {"reanalyzed_at": {"$exists": False}},
+                {"reanalyzed_at": {"$lt": run_started_at}}
+            ]
+        }
+        
+        # Stream applications with a projection instead of loading them all
+        cursor = db.applications.find(query, REANALYSIS_PROJECTION).sort("_id", 1).batch_size(REANALYSIS_BATCH_SIZE)
+        
         updated_applications = 0
         results = []
-        
-        # Process each application
-        for application in applications:
-            try:
-                application_id = str(application.get("_id"))
-                print(f"Reanalyzing application {application_id}")
-                
-                # Extract text from resume
-                resume_data = application.get('resumeData', '')
-                resume_text = extract_text_from_resume(resume_data)
-                
-                if not resume_text or resume_text == "Error extracting text from resume":
-                    print(f"Failed to extract text from resume for application {application_id}")
-                    continue
-                
-                # Analyze the application
-                analysis_result = analyze_job_application(resume_text, job_description, required_skills)
-                
-                # Save updated analysis result
-                db.applications.update_one(
-                    {"_id": application.get("_id")},
-                    {
-                        "$set": {
-                            "analysis": analysis_result,
-                            "matchScore": analysis_result.get("overall_match_score", 0),
-                            "reanalyzed_at": datetime.datetime.utcnow()
-                        }
+        pending_updates = []
+        pending_ids = []
+        progress = {"processed": 0, "updated": 0, "failed": 0}
+        
+        def flush():
+            # Write a batch of results and record progress so the run can be resumed
+            if pending_updates:
+                db.applications.bulk_write(pending_updates, ordered=False)
+                application_view.invalidate(*pending_ids)
+                pending_updates.clear()
+                pending_ids.clear()
+            db.reanalysis_runs.update_one(
+                {"_id": job_id},
+                {"$inc": dict(progress), "$set": {"updated_at": datetime.datetime.utcnow()}}
+            )
+            for key in progress:
+                progress[key] = 0
+        
+        def collect(future):
+            nonlocal updated_applications
+            application, analysis_result = future.result()
+            progress["processed"] += 1
+            if analysis_result is None:
+                progress["failed"] += 1
+                return
+            
+            pending_updates.append(UpdateOne(
+                {"_id": application["_id"]},
+                {
+                    "$set": {
+                        "analysis": analysis_result,
+                        "matchScore": analysis_result.get("overall_match_score", 0),
+                        "reanalyzed_at": datetime.datetime.utcnow()
                     }
-                )
-                
-                updated_applications += 1
-                results.append({
-                    "application_id": application_id,
-                    "applicant_name": application.get("applicantName", "Unknown"),
-                    "previous_score": application.get("matchScore", 0),
-                    "new_score": analysis_result.get("overall_match_score", 0)
-                })
-                
-            except Exception as e:
-                print(f"Error reanalyzing application {application.get('_id')}: {str(e)}")
+                }
+            ))
+            pending_ids.append(application["_id"])
+            progress["updated"] += 1
+            updated_applications += 1
+            results.append({
+                "application_id": str(application["_id"]),
+                "applicant_name": application.get("applicantName", "Unknown"),
+                "previous_score": application.get("matchScore", 0),
+                "new_score": analysis_result.get("overall_match_score", 0)
+            })
+            if len(pending_updates) >= REANALYSIS_BATCH_SIZE:
+                flush()
+        
+        try:
+            # Keep a bounded number of applications in flight on the worker pool
+            with ThreadPoolExecutor(max_workers=REANALYSIS_WORKERS, thread_name_prefix="reanalysis") as executor:
+                in_flight = set()
+                for application in cursor:
+                    in_flight.add(executor.submit(reanalyze_application, application, job_description, required_skills))
+                    if len(in_flight) >= REANALYSIS_WORKERS * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(future)
+                for future in as_completed(in_flight):
+                    collect(future)
+            flush()
+        except Exception:
+            flush()
+            db.reanalysis_runs.update_one({"_id": job_id}, {"$set": {"status": "interrupted"}})
+            raise
+        
+        run = db.reanalysis_runs.find_one_and_update(
+            {"_id": job_id},
+            {"$set": {"status": "completed", "completed_at": datetime.datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
         
         return jsonify({
             "success": True,
             "message": f"Reanalyzed {updated_applications} applications",
-            "results": results
+            "results": results,
+            "progress": format_reanalysis_run(run)
         }), 200
     
     except Exception as e:
@@ -785,12 +1189,18 @@ def reanalyze_job_applications():
         traceback.print_exc()
         return jsonify({"error": f"Failed to reanalyze applications: {str(e)}"}), 500
 
+# The workers start with the app, whatever server loads it. With the reloader on,
+# the parent process only watches for changes; the child (WERKZEUG_RUN_MAIN)
+# serves requests and consumes the queue.
+if ANALYSIS_WORKERS_AUTOSTART and (__name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+    analysis_workers.start()
+
 if __name__ == "__main__":
     # Check if Gemini API key is valid
     api_available = False
     try:
         print("Checking connection to Gemini API...")
-        test_response = model.generate_content("Hello, please respond with just the word 'Connected' to verify the connection.")
+        test_response = model_registry.get_model().generate_content("Hello, please respond with just the word 'Connected' to verify the connection.")
         if "Connected" in test_response.text:
             print("✓ Successfully connected to Gemini API")
             api_available = True
@@ -805,5 +1215,10 @@ if __name__ == "__main__":
         print("🔄 Job matching will use rule-based analysis instead of AI")
         print("💡 To use AI matching, please check your Google API key and quota")
     
+    try:
+        db_indexes.ensure_indexes(db)
+    except Exception as e:
+        print(f"⚠️ Could not create database indexes: {str(e)}")
+    
     # Start the Flask app even if the API isn't available
     app.run(debug=True, port=5002) 
\ No newline at end of file
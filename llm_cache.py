@@ -0,0 +1,234 @@
+"""
+Content-addressed cache for Gemini responses.
+
+Responses are keyed by a hash of the model name, the generation config and the
+prompt contents, so re-analysing the same resume against the same job returns
+the stored text instead of paying for another model round-trip. Entries live in
+an in-memory LRU tier and, optionally, in a persistent tier (local disk or a
+MongoDB collection) shared between processes and restarts.
+"""
+import os
+import json
+import time
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))  # seconds
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "").lower()  # "", "disk" or "mongo"
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+LLM_CACHE_MONGO_URI = os.getenv("LLM_CACHE_MONGO_URI", "mongodb://localhost:27017/jobmatchdb")
+LLM_CACHE_COLLECTION = "llm_cache"
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with a size bound and an optional per-entry TTL."""
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskStore:
+    """Persistent tier storing one JSON file per cache key."""
+
+    name = "disk"
+
+    def __init__(self, directory, ttl=None):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        if self.ttl and time.time() - entry.get("created_at", 0) > self.ttl:
+            return None
+        return entry.get("value")
+
+    def set(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"value": value, "created_at": time.time()}, f)
+        os.replace(tmp_path, path)
+
+
+class MongoStore:
+    """Persistent tier storing entries in a MongoDB collection with a TTL index."""
+
+    name = "mongo"
+
+    def __init__(self, collection, ttl=None):
+        self.collection = collection
+        self.ttl = ttl
+        self._index_ready = False
+
+    def _ensure_index(self):
+        if self._index_ready or not self.ttl:
+            return
+        self.collection.create_index("created_at", expireAfterSeconds=self.ttl)
+        self._index_ready = True
+
+    def get(self, key):
+        entry = self.collection.find_one({"_id": key}, {"value": 1, "created_at": 1})
+        if not entry:
+            return None
+        # The TTL monitor only runs once a minute, so check expiry here as well
+        if self.ttl and (datetime.datetime.utcnow() - entry["created_at"]).total_seconds() > self.ttl:
+            return None
+        return entry.get("value")
+
+    def set(self, key, value):
+        self._ensure_index()
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": {"value": value, "created_at": datetime.datetime.utcnow()}},
+            upsert=True
+        )
+
+
+class ResponseCache:
+    """Two-tier cache for model responses with hit/miss counters."""
+
+    def __init__(self, max_size=512, ttl=None, persistent=None, enabled=True):
+        self.enabled = enabled
+        self.memory = LRUCache(max_size=max_size, ttl=ttl)
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "persistent_hits": 0, "misses": 0, "persistent_errors": 0}
+
+    @staticmethod
+    def make_key(model_name, generation_config, contents):
+        """Hash the model name, generation config and prompt into a cache key."""
+        payload = json.dumps(
+            {"model": model_name, "config": generation_config or {}, "contents": contents},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits")
+            return value
+        if self.persistent is not None:
+            try:
+                value = self.persistent.get(key)
+            except Exception as e:
+                print(f"LLM cache persistent read failed: {str(e)}")
+                self._count("persistent_errors")
+                value = None
+            if value is not None:
+                self.memory.set(key, value)
+                self._count("persistent_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            try:
+                self.persistent.set(key, value)
+            except Exception as e:
+                print(f"LLM cache persistent write failed: {str(e)}")
+                self._count("persistent_errors")
+
+    def get_or_generate(self, model_name, generation_config, contents, generate):
+        """Return the cached response for this prompt, calling generate() on a miss."""
+        if not self.enabled:
+            return generate()
+        key = self.make_key(model_name, generation_config, contents)
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = generate()
+        if value:
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["persistent_hits"] + counters["misses"]
+        counters["hit_rate"] = round((counters["hits"] + counters["persistent_hits"]) / lookups, 4) if lookups else 0.0
+        counters["entries"] = len(self.memory)
+        counters["max_entries"] = self.memory.max_size
+        counters["backend"] = self.persistent.name if self.persistent is not None else "memory"
+        counters["enabled"] = self.enabled
+        return counters
+
+
+def create_persistent_store():
+    """Build the persistent tier selected by LLM_CACHE_BACKEND, if any."""
+    if LLM_CACHE_BACKEND == "disk":
+        return DiskStore(LLM_CACHE_DIR, ttl=LLM_CACHE_TTL)
+    if LLM_CACHE_BACKEND == "mongo":
+        from pymongo import MongoClient
+        client = MongoClient(LLM_CACHE_MONGO_URI)
+        return MongoStore(client.get_default_database()[LLM_CACHE_COLLECTION], ttl=LLM_CACHE_TTL)
+    return None
+
+
+# Shared cache used by both services
+response_cache = ResponseCache(
+    max_size=LLM_CACHE_MAX_ENTRIES,
+    ttl=LLM_CACHE_TTL,
+    persistent=create_persistent_store(),
+    enabled=LLM_CACHE_ENABLED
+)
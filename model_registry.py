@@ -0,0 +1,121 @@
+"""
+Shared registry of configured Gemini models.
+
+Both services ask the registry for a model instead of building a new
+GenerativeModel per call. One instance is kept per (model_name,
+generation_config) pair and reused across requests and worker threads. When
+the API key changes, the registry reconfigures the client and drops the cached
+instances so they are rebuilt once with the new key.
+"""
+import os
+import json
+import threading
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from dotenv import dotenv_values
+from llm_cache import response_cache
+
+DEFAULT_MODEL_NAME = "gemini-1.5-pro"
+DEFAULT_GENERATION_CONFIG = {
+    "temperature": 0.2,  # Lower temperature for more consistent outputs
+    "top_p": 0.95,
+    "top_k": 64,
+    "max_output_tokens": 8192,
+}
+
+_models = {}
+_lock = threading.Lock()
+_api_key = None
+_model_factory = None
+
+
+def _registry_key(model_name, generation_config):
+    return model_name, json.dumps(generation_config or {}, sort_keys=True)
+
+
+def configure(api_key):
+    """Configure the Gemini client with this key, dropping models built with an older one."""
+    global _api_key
+    with _lock:
+        if api_key == _api_key:
+            return False
+        genai.configure(api_key=api_key)
+        _api_key = api_key
+        _models.clear()
+        return True
+
+
+def refresh_api_key(api_key=None):
+    """
+    Re-read GOOGLE_API_KEY from .env (or use the given key) and reconfigure if
+    it changed. Only that one value is read; the process environment is left
+    alone.
+    """
+    if api_key is None:
+        api_key = dotenv_values().get("GOOGLE_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return False
+    changed = configure(api_key)
+    if changed:
+        print("Gemini API key changed, models will be rebuilt on next use")
+    return changed
+
+
+def is_auth_error(error):
+    """True for errors caused by a missing, invalid or revoked API key."""
+    if isinstance(error, (google_exceptions.PermissionDenied, google_exceptions.Unauthenticated)):
+        return True
+    # An invalid key is reported as a 400 that names the key
+    return isinstance(error, google_exceptions.InvalidArgument) and "api key" in str(error).lower()
+
+
+def set_model_factory(factory):
+    """
+    Build models with factory(model_name, generation_config) instead of
+    genai.GenerativeModel, e.g. a fake backend for benchmarks. Pass None to
+    go back to the real client.
+    """
+    global _model_factory
+    with _lock:
+        _model_factory = factory
+        _models.clear()
+
+
+def get_model(model_name=DEFAULT_MODEL_NAME, generation_config=None):
+    """Return the shared model for this name and generation config."""
+    if generation_config is None:
+        generation_config = DEFAULT_GENERATION_CONFIG
+    key = _registry_key(model_name, generation_config)
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            if _model_factory is not None:
+                model = _model_factory(model_name, dict(generation_config))
+            else:
+                model = genai.GenerativeModel(
+                    model_name=model_name,
+                    generation_config=dict(generation_config)
+                )
+            _models[key] = model
+        return model
+
+
+def generate_text(contents, model_name=DEFAULT_MODEL_NAME, generation_config=None):
+    """Generate text with a shared model, serving repeated prompts from the response cache."""
+    if generation_config is None:
+        generation_config = DEFAULT_GENERATION_CONFIG
+
+    def generate():
+        try:
+            return get_model(model_name, generation_config).generate_content(contents).text
+        except Exception as e:
+            # Retry once if the key was rotated since the model was built;
+            # timeouts, quota errors and blocked prompts are raised as they are
+            if not is_auth_error(e) or not refresh_api_key():
+                raise
+            return get_model(model_name, generation_config).generate_content(contents).text
+
+    return response_cache.get_or_generate(model_name, generation_config, contents, generate)
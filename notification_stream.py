@@ -0,0 +1,163 @@
+"""
+Push delivery of new notifications to Server-Sent Events connections.
+
+NotificationBroker keeps one bounded queue per open SSE connection, grouped
+by user id, and fans new notifications out to them. Notifications reach the
+broker from three places:
+- publish() calls right after a notification is inserted in this process
+  (delivered instantly)
+- a MongoDB change stream on the notifications collection, which also sees
+  inserts made by other processes
+- a lightweight poller used instead when change streams are unavailable
+  (a standalone mongod without a replica set). It issues one _id range
+  query per interval for the whole process, however many clients are
+  connected.
+
+The same notification can arrive from more than one source, so recently
+delivered ids are remembered and duplicates are dropped.
+"""
+import os
+import queue
+import datetime
+import threading
+from collections import OrderedDict
+from bson.objectid import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "200"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+NOTIFICATION_POLL_INTERVAL = float(os.getenv("NOTIFICATION_POLL_INTERVAL", "2"))  # seconds
+RECENT_IDS = 4096
+
+
+class TooManyConnections(Exception):
+    pass
+
+
+class NotificationBroker:
+    """In-process pub/sub of serialized notifications keyed by user id."""
+
+    def __init__(self, serialize, max_connections=SSE_MAX_CONNECTIONS, queue_size=SSE_QUEUE_SIZE,
+                 poll_interval=NOTIFICATION_POLL_INTERVAL):
+        self.serialize = serialize
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.source = None
+        self._subscribers = {}
+        self._connections = 0
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._counters = {"published": 0, "delivered": 0, "dropped": 0, "rejected": 0}
+
+    def subscribe(self, user_id):
+        """Register a connection and return its queue of (event_id, data) tuples."""
+        with self._lock:
+            if self._connections >= self.max_connections:
+                self._counters["rejected"] += 1
+                raise TooManyConnections(f"Limit of {self.max_connections} notification streams reached")
+            subscriber = queue.Queue(maxsize=self.queue_size)
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+            self._connections += 1
+            return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers and subscriber in subscribers:
+                subscribers.discard(subscriber)
+                self._connections -= 1
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def publish(self, notification):
+        """Deliver an inserted notification to its user's open connections."""
+        event_id = str(notification["_id"])
+        user_id = notification.get("userId")
+        with self._lock:
+            if event_id in self._recent:
+                return
+            self._recent[event_id] = True
+            if len(self._recent) > RECENT_IDS:
+                self._recent.popitem(last=False)
+            self._counters["published"] += 1
+            subscribers = list(self._subscribers.get(user_id, ()))
+        if not subscribers:
+            return
+        event = (event_id, self.serialize(notification))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+                self._count("delivered")
+            except queue.Full:
+                # A stalled client; it catches up from Last-Event-ID when it reconnects
+                self._count("dropped")
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["connections"] = self._connections
+            counters["users"] = len(self._subscribers)
+        counters["source"] = self.source
+        return counters
+
+    def start(self, collection):
+        """Start feeding the broker from the collection, once per process."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(collection,), name="notification-feed")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, collection):
+        try:
+            self._watch(collection)
+        except OperationFailure as e:
+            print(f"Notification change stream unavailable ({str(e)}), polling instead")
+        except Exception as e:
+            print(f"Notification change stream failed ({str(e)}), polling instead")
+        self._poll(collection)
+
+    def _watch(self, collection):
+        with collection.watch([{"$match": {"operationType": "insert"}}]) as stream:
+            self.source = "change_stream"
+            print("Streaming notifications from the MongoDB change stream")
+            while not self._stop.is_set():
+                change = stream.try_next()
+                if change is None:
+                    self._stop.wait(0.2)
+                    continue
+                self.publish(change["fullDocument"])
+
+    def _poll(self, collection):
+        self.source = "poller"
+        last_id = ObjectId.from_datetime(datetime.datetime.utcnow())
+        while not self._stop.wait(self.poll_interval):
+            with self._lock:
+                idle = not self._subscribers
+            if idle:
+                # Nobody is listening; skip ahead instead of querying
+                last_id = ObjectId.from_datetime(datetime.datetime.utcnow())
+                continue
+            # ObjectIds from other processes are only ordered to the second, so
+            # re-read a short window; publish() drops the repeats
+            window_start = ObjectId.from_datetime(last_id.generation_time - datetime.timedelta(seconds=2))
+            try:
+                for notification in collection.find({"_id": {"$gt": window_start}}).sort("_id", 1).limit(500):
+                    last_id = max(last_id, notification["_id"])
+                    self.publish(notification)
+            except PyMongoError as e:
+                print(f"Notification poll failed: {str(e)}")
@@ -0,0 +1,101 @@
+"""
+Keyset pagination and field projection for list endpoints.
+
+Pages are ordered newest first on (<time field>, _id), where the time field
+is created_at unless the caller names another one. The cursor is an opaque
+token encoding the sort key of the last document on the previous page. The
+next page is read with a range condition on the index instead of skip(), so
+each page costs the same however deep the client goes. newer_than() uses the
+same cursors to fetch only documents added after one the client has seen.
+"""
+import os
+import json
+import base64
+import binascii
+import datetime
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+TIME_FIELD = "created_at"
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+def encode_cursor(document, field=TIME_FIELD):
+    created_at = document.get(field) or datetime.datetime.min
+    payload = {"t": created_at.isoformat(), "id": str(document["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Return the (time, _id) sort key encoded in a cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId, binascii.Error):
+        raise InvalidPageRequest("Invalid cursor")
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidPageRequest("limit must be an integer")
+    if limit < 1:
+        raise InvalidPageRequest("limit must be at least 1")
+    return min(limit, maximum)
+
+
+def parse_fields(value, allowed, aliases=None, field=TIME_FIELD):
+    """
+    Turn a comma-separated fields parameter into a projection. The sort keys
+    are always included so the next cursor can be built.
+    """
+    if not value:
+        return None
+    aliases = aliases or {}
+    projection = {"_id": 1, field: 1}
+    for name in value.split(","):
+        name = aliases.get(name.strip(), name.strip())
+        if not name:
+            continue
+        if name not in allowed:
+            raise InvalidPageRequest(f"Unknown field: {name}")
+        projection[name] = 1
+    return projection
+
+
+def _after(cursor, field, op):
+    value, last_id = decode_cursor(cursor)
+    return {"$or": [{field: {op: value}}, {field: value, "_id": {op: last_id}}]}
+
+
+def fetch_page(collection, query, cursor=None, limit=DEFAULT_PAGE_SIZE, projection=None, field=TIME_FIELD):
+    """Return (documents, next_cursor) for one page; next_cursor is None on the last page."""
+    if cursor:
+        query = {"$and": [query, _after(cursor, field, "$lt")]}
+    sort = [(field, -1), ("_id", -1)]
+    documents = list(collection.find(query, projection).sort(sort).limit(limit + 1))
+    if len(documents) > limit:
+        documents = documents[:limit]
+        return documents, encode_cursor(documents[-1], field)
+    return documents, None
+
+
+def newer_than(collection, query, cursor, limit=DEFAULT_PAGE_SIZE, projection=None, field=TIME_FIELD):
+    """
+    Return (documents, has_more) for documents after the cursor, oldest first.
+    When more than limit are new, the oldest limit are returned; the caller
+    continues from the last one while has_more is True.
+    """
+    query = {"$and": [query, _after(cursor, field, "$gt")]}
+    sort = [(field, 1), ("_id", 1)]
+    documents = list(collection.find(query, projection).sort(sort).limit(limit + 1))
+    return documents[:limit], len(documents) > limit
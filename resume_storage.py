@@ -0,0 +1,157 @@
+"""
+Resume storage backed by GridFS.
+
+Uploaded resumes arrive as base64 data URLs. They are decoded once, stored as
+binary in the "resumes" GridFS bucket and deduplicated by SHA-256 (a unique
+index keeps concurrent uploads of the same file from storing it twice), so
+application documents only keep a small reference. Reads go through GridFS
+file objects, which fetch the file chunk by chunk.
+
+Run this module directly to move resumes still embedded as resumeData in
+existing application documents into GridFS.
+"""
+import base64
+import hashlib
+import binascii
+from bson.objectid import ObjectId
+from gridfs import GridFS
+from gridfs.errors import FileExists, NoFile
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+RESUME_BUCKET = "resumes"
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+_indexed_databases = set()
+
+
+class InvalidResumeData(ValueError):
+    pass
+
+
+def parse_data_url(resume_data):
+    """Split a data URL into (content_type, bytes); plain strings are stored as text."""
+    if isinstance(resume_data, str) and resume_data.startswith("data:"):
+        try:
+            header, encoded = resume_data.split(",", 1)
+            content_type = header[5:].split(";")[0] or "application/octet-stream"
+            return content_type, base64.b64decode(encoded)
+        except (ValueError, binascii.Error) as e:
+            raise InvalidResumeData(f"Invalid resume data URL: {str(e)}")
+    if isinstance(resume_data, str):
+        return "text/plain", resume_data.encode("utf-8")
+    raise InvalidResumeData("Resume data must be a data URL or text")
+
+
+def _bucket(db):
+    return GridFS(db, collection=RESUME_BUCKET)
+
+
+def ensure_resume_indexes(db):
+    """Index stored resumes by content hash, one file per hash."""
+    if db.name in _indexed_databases:
+        return
+    files = db[f"{RESUME_BUCKET}.files"]
+    try:
+        files.create_index("metadata.sha256", unique=True, sparse=True)
+    except OperationFailure as e:
+        if e.code not in (85, 86):  # IndexOptionsConflict, IndexKeySpecsConflict
+            raise
+        # Replace the non-unique index created by earlier versions
+        files.drop_index("metadata.sha256_1")
+        files.create_index("metadata.sha256", unique=True, sparse=True)
+    _indexed_databases.add(db.name)
+
+
+def store_resume(db, resume_data, filename=None):
+    """Store a resume once per content hash and return the reference kept on the application."""
+    content_type, content = parse_data_url(resume_data)
+    sha256 = hashlib.sha256(content).hexdigest()
+    try:
+        ensure_resume_indexes(db)
+    except OperationFailure as e:
+        # Usually duplicates stored before the index was unique; don't retry on every upload
+        print(f"Could not create the unique resume hash index: {str(e)}")
+        _indexed_databases.add(db.name)
+
+    files = db[f"{RESUME_BUCKET}.files"]
+    existing = files.find_one({"metadata.sha256": sha256}, {"_id": 1})
+    if existing:
+        file_id = existing["_id"]
+    else:
+        file_id = ObjectId()
+        try:
+            _bucket(db).put(
+                content,
+                _id=file_id,
+                filename=filename or sha256,
+                metadata={"sha256": sha256, "contentType": content_type}
+            )
+        except (FileExists, DuplicateKeyError):
+            # A concurrent upload stored the same content first: drop our chunks and reuse its file
+            db[f"{RESUME_BUCKET}.chunks"].delete_many({"files_id": file_id})
+            existing = files.find_one({"metadata.sha256": sha256}, {"_id": 1})
+            if not existing:
+                raise
+            file_id = existing["_id"]
+
+    return {
+        "fileId": file_id,
+        "sha256": sha256,
+        "contentType": content_type,
+        "length": len(content),
+        "filename": filename or ""
+    }
+
+
+def get_resume_ref(application):
+    """Return the stored resume reference of an application, if it has one."""
+    ref = application.get("resume")
+    return ref if isinstance(ref, dict) and ref.get("fileId") else None
+
+
+def open_resume(db, ref):
+    """Open a stored resume as a seekable file object that reads chunks on demand."""
+    try:
+        return _bucket(db).get(ref["fileId"])
+    except NoFile:
+        raise FileNotFoundError(f"Resume file {ref['fileId']} not found")
+
+
+def iter_resume_chunks(resume_file, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Yield an opened resume in chunks for streamed downloads, closing it at the end."""
+    with resume_file:
+        while True:
+            chunk = resume_file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def migrate_inline_resumes(db, batch_size=100):
+    """Move resumeData strings embedded in application documents into GridFS."""
+    migrated = 0
+    cursor = db.applications.find(
+        {"resumeData": {"$exists": True}, "resume": {"$exists": False}},
+        {"resumeData": 1}
+    ).batch_size(batch_size)
+
+    for application in cursor:
+        try:
+            ref = store_resume(db, application["resumeData"])
+        except InvalidResumeData as e:
+            print(f"Skipping application {application['_id']}: {str(e)}")
+            continue
+        db.applications.update_one(
+            {"_id": application["_id"]},
+            {"$set": {"resume": ref}, "$unset": {"resumeData": ""}}
+        )
+        migrated += 1
+    return migrated
+
+
+if __name__ == "__main__":
+    from pymongo import MongoClient
+
+    client = MongoClient("mongodb://localhost:27017/")
+    count = migrate_inline_resumes(client["jobmatchdb"])
+    print(f"Moved {count} inline resumes into GridFS")
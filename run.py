@@ -161,7 +161,6 @@ def install_requirements():
         "flask-cors", 
         "python-dotenv", 
         "google-generativeai", 
-        "PyPDF2",
         "flask-pymongo",
         "pymongo",
         "bcrypt",
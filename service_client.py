@@ -0,0 +1,179 @@
+"""
+Pooled HTTP client for calls from the auth server to the job matching service.
+
+One requests.Session per target service keeps connections alive and bounds
+how many are opened. Every call has a connect and a read timeout. A circuit
+breaker stops calling a service after repeated failures and only probes it
+again after a cool-down, so a slow or dead AI service costs a request thread
+a few milliseconds instead of a full timeout. Per-endpoint call counts, errors
+and latency percentiles are exposed through stats().
+"""
+import os
+import time
+import threading
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://localhost:5002")
+SERVICE_CONNECT_TIMEOUT = float(os.getenv("SERVICE_CONNECT_TIMEOUT", "1"))  # seconds
+SERVICE_READ_TIMEOUT = float(os.getenv("SERVICE_READ_TIMEOUT", "5"))  # seconds
+SERVICE_POOL_SIZE = int(os.getenv("SERVICE_POOL_SIZE", "20"))
+SERVICE_BREAKER_FAILURES = int(os.getenv("SERVICE_BREAKER_FAILURES", "5"))
+SERVICE_BREAKER_RESET = float(os.getenv("SERVICE_BREAKER_RESET", "30"))  # seconds
+LATENCY_SAMPLES = 1000
+
+
+class ServiceUnavailable(Exception):
+    """The service is failing, timed out, or its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures. While open, calls are
+    refused until reset_timeout has passed; then a single trial call is let
+    through (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=SERVICE_BREAKER_FAILURES, reset_timeout=SERVICE_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let one request probe the service
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class ServiceClient:
+    """Calls one service over a shared, bounded connection pool."""
+
+    def __init__(self, base_url, connect_timeout=SERVICE_CONNECT_TIMEOUT, read_timeout=SERVICE_READ_TIMEOUT,
+                 pool_size=SERVICE_POOL_SIZE, breaker=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def request(self, method, path, timeout=None, **kwargs):
+        """
+        Send a request and return the response. Raises ServiceUnavailable on
+        connection errors, timeouts, 5xx responses or an open breaker; 4xx
+        responses are returned to the caller.
+        """
+        if not self.breaker.allow():
+            self._record(path, 0.0, "rejected")
+            raise ServiceUnavailable(f"{self.base_url} is unavailable (circuit open)")
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=timeout or self.timeout, **kwargs)
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            self._record(path, time.perf_counter() - started, "error")
+            raise ServiceUnavailable(f"{method} {path} failed: {str(e)}")
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            self._record(path, elapsed, "error")
+            raise ServiceUnavailable(f"{method} {path} returned {response.status_code}")
+        self.breaker.record_success()
+        self._record(path, elapsed, "ok")
+        return response
+
+    def get(self, path, params=None, timeout=None):
+        return self.request("GET", path, timeout=timeout, params=params)
+
+    def post(self, path, json=None, timeout=None):
+        return self.request("POST", path, timeout=timeout, json=json)
+
+    def get_json(self, path, params=None, timeout=None):
+        """GET a JSON body; returns (status_code, body), with body None if it is not JSON."""
+        response = self.get(path, params=params, timeout=timeout)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+    def _record(self, path, elapsed, outcome):
+        with self._lock:
+            metrics = self._metrics.setdefault(path, {
+                "calls": 0, "errors": 0, "rejected": 0, "latencies": deque(maxlen=LATENCY_SAMPLES)
+            })
+            metrics["calls"] += 1
+            if outcome == "error":
+                metrics["errors"] += 1
+            elif outcome == "rejected":
+                metrics["rejected"] += 1
+            else:
+                metrics["latencies"].append(elapsed * 1000)
+
+    def stats(self):
+        with self._lock:
+            endpoints = {}
+            for path, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies"])
+                endpoints[path] = {
+                    "calls": metrics["calls"],
+                    "errors": metrics["errors"],
+                    "rejected": metrics["rejected"],
+                    "p50_ms": round(_percentile(latencies, 50), 2) if latencies else None,
+                    "p95_ms": round(_percentile(latencies, 95), 2) if latencies else None,
+                    "max_ms": round(latencies[-1], 2) if latencies else None
+                }
+        return {
+            "base_url": self.base_url,
+            "breaker": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                "rejected": self.breaker.rejected
+            },
+            "endpoints": endpoints
+        }
+
+
+def _percentile(sorted_values, pct):
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# Shared client for the job matching service (job_matching_ai.py)
+ai_service = ServiceClient(AI_SERVICE_URL)
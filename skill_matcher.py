@@ -0,0 +1,85 @@
+"""
+Single-pass keyword matcher for skills.
+
+The skill names and aliases of a taxonomy are compiled once into a single
+regular expression. The alternation is shaped like a trie: terms that share a
+prefix share a branch. The regex engine therefore only follows branches that
+agree with the text, so matching costs about the same for thirty terms or
+several thousand. One finditer() pass returns every mention with its offsets.
+Matches are case-insensitive. They cannot start or end inside a word, which
+lets names like "C#", "C++", "Node.js" and ".NET" match where a \\b pattern
+would not. Spaces in a term match any run of whitespace.
+
+skill_taxonomy builds the matcher for the shared taxonomy file.
+"""
+import re
+
+_END = ""
+
+
+def normalize_term(term):
+    return " ".join(term.lower().split())
+
+
+def _trie_pattern(node):
+    branches = []
+    for char in sorted(key for key in node if key != _END):
+        piece = r"\s+" if char == " " else re.escape(char)
+        branches.append(piece + _trie_pattern(node[char]))
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if _END in node:
+        # A term ends here but longer ones continue; the greedy ? prefers the longest
+        pattern = "(?:" + pattern + ")?"
+    return pattern
+
+
+class SkillMatcher:
+    """Finds every taxonomy skill mentioned in a text in one pass."""
+
+    def __init__(self, skills):
+        """skills: skill names, or entries like {"name": ..., "aliases": [...]}."""
+        self.terms = {}
+        self.names = []
+        for skill in skills:
+            if isinstance(skill, str):
+                skill = {"name": skill}
+            self.names.append(skill["name"])
+            for term in [skill["name"]] + list(skill.get("aliases", [])):
+                # The first skill to claim a term keeps it
+                self.terms.setdefault(normalize_term(term), skill["name"])
+
+        trie = {}
+        for term in self.terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[_END] = True
+        body = _trie_pattern(trie) or "(?!)"
+        self.pattern = re.compile(r"(?<!\w)(?:" + body + r")(?!\w)", re.IGNORECASE)
+
+    def __len__(self):
+        return len(self.names)
+
+    def iter_matches(self, text):
+        """Yield (skill name, start, end) for each mention, in text order."""
+        for match in self.pattern.finditer(text or ""):
+            yield self.terms[normalize_term(match.group(0))], match.start(), match.end()
+
+    def find_all(self, text):
+        """
+        Return {skill name: {"count": n, "offsets": [(start, end), ...]}},
+        ordered by first mention.
+        """
+        found = {}
+        for name, start, end in self.iter_matches(text):
+            entry = found.setdefault(name, {"count": 0, "offsets": []})
+            entry["count"] += 1
+            entry["offsets"].append((start, end))
+        return found
+
+    def match_names(self, text):
+        """Return the set of skill names mentioned in the text."""
+        return {name for name, _, _ in self.iter_matches(text)}
+
@@ -0,0 +1,162 @@
+"""
+Deterministic skill prominence scoring for the keyword fallbacks.
+
+A skill's score (0-100) combines three signals from the resume text:
+- term frequency: how often the skill is mentioned, saturating after a few
+  mentions
+- section: the most telling section it appears in (a Skills or Experience
+  section counts more than Education or text outside any section)
+- recency: the latest year written near a mention, relative to the latest
+  year in the resume ("Present" counts as that latest year). Without nearby
+  years, earlier mentions count as more recent, because resumes are usually
+  in reverse chronological order.
+
+Nothing depends on the clock or on randomness, so the same text always
+scores the same against the same taxonomy. Results are cached by text hash,
+taxonomy fingerprint and SCORING_VERSION. Bump SCORING_VERSION whenever the
+weights change so cached and stored results can be told apart.
+"""
+import os
+import re
+import math
+import bisect
+import hashlib
+from dotenv import load_dotenv
+from llm_cache import LRUCache
+import skill_taxonomy
+
+load_dotenv()
+
+SCORING_VERSION = 1
+
+SKILL_SCORE_CACHE_MAX_ENTRIES = int(os.getenv("SKILL_SCORE_CACHE_MAX_ENTRIES", "2048"))
+
+# Signal weights; they sum to 1
+FREQUENCY_WEIGHT = 0.5
+SECTION_WEIGHT = 0.3
+RECENCY_WEIGHT = 0.2
+
+# Mentions at which the frequency signal reaches its maximum
+FREQUENCY_SATURATION = 5
+
+# Characters around a mention searched for a year, and years for recency to decay to zero
+RECENCY_WINDOW = 300
+RECENCY_SPAN_YEARS = 10
+
+SECTION_WEIGHTS = {
+    "skills": 1.0,
+    "experience": 0.9,
+    "projects": 0.8,
+    "summary": 0.7,
+    "certifications": 0.7,
+    "education": 0.5,
+    None: 0.6
+}
+
+SECTION_HEADINGS = {
+    "skills": "skills", "technical skills": "skills", "core competencies": "skills", "technologies": "skills",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment history": "experience", "work history": "experience",
+    "projects": "projects", "personal projects": "projects",
+    "summary": "summary", "profile": "summary", "professional summary": "summary", "objective": "summary",
+    "certifications": "certifications", "certificates": "certifications", "awards": "certifications",
+    "education": "education"
+}
+
+_HEADING_PATTERN = re.compile(
+    r"^[ \t]*(" + "|".join(re.escape(heading) for heading in sorted(SECTION_HEADINGS, key=len, reverse=True)) + r")[ \t]*:?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE
+)
+_YEAR_PATTERN = re.compile(r"\b(?:(19[5-9]\d|20\d\d)|present)\b", re.IGNORECASE)
+
+score_cache = LRUCache(max_size=SKILL_SCORE_CACHE_MAX_ENTRIES)
+
+
+class ResumeProfile:
+    """Section boundaries and year mentions of one text, used to score any set of mentions."""
+
+    def __init__(self, text):
+        self.length = max(1, len(text))
+        self.section_starts = []
+        self.section_names = []
+        for match in _HEADING_PATTERN.finditer(text):
+            self.section_starts.append(match.start())
+            self.section_names.append(SECTION_HEADINGS[" ".join(match.group(1).lower().split())])
+
+        self.year_offsets = []
+        self.years = []
+        for match in _YEAR_PATTERN.finditer(text):
+            self.year_offsets.append(match.start())
+            self.years.append(int(match.group(1)) if match.group(1) else None)
+        known_years = [year for year in self.years if year is not None]
+        self.latest_year = max(known_years) if known_years else None
+        # "Present" is as recent as anything in the resume
+        self.years = [self.latest_year if year is None else year for year in self.years]
+
+    def section_at(self, offset):
+        index = bisect.bisect_right(self.section_starts, offset) - 1
+        return self.section_names[index] if index >= 0 else None
+
+    def recency_at(self, offset):
+        index = bisect.bisect_left(self.year_offsets, offset)
+        nearest = None
+        for candidate in (index - 1, index):
+            if 0 <= candidate < len(self.year_offsets):
+                distance = abs(self.year_offsets[candidate] - offset)
+                if distance <= RECENCY_WINDOW and (nearest is None or distance < nearest[0]):
+                    nearest = (distance, self.years[candidate])
+        if nearest is None or nearest[1] is None:
+            return 1.0 - 0.5 * offset / self.length
+        return max(0.0, 1.0 - (self.latest_year - nearest[1]) / RECENCY_SPAN_YEARS)
+
+    def score(self, offsets):
+        """Return (score 0-100, best section) for the mentions starting at the given offsets."""
+        if not offsets:
+            return 0, None
+        frequency = min(1.0, math.log(1 + len(offsets)) / math.log(1 + FREQUENCY_SATURATION))
+        sections = [self.section_at(offset) for offset in offsets]
+        best_section = max(sections, key=lambda section: SECTION_WEIGHTS[section])
+        recency = max(self.recency_at(offset) for offset in offsets)
+        value = (
+            FREQUENCY_WEIGHT * frequency
+            + SECTION_WEIGHT * SECTION_WEIGHTS[best_section]
+            + RECENCY_WEIGHT * recency
+        )
+        return int(round(100 * value)), best_section
+
+
+def _score_all(text, taxonomy):
+    profile = ResumeProfile(text)
+    scored = []
+    for name, mentions in taxonomy.find_skills(text).items():
+        offsets = [start for start, _ in mentions["offsets"]]
+        score, section = profile.score(offsets)
+        scored.append({
+            "skill": name,
+            "score": score,
+            "count": mentions["count"],
+            "section": section,
+            "offset": offsets[0]
+        })
+    # Highest score first; name breaks ties so the order is stable
+    scored.sort(key=lambda item: (-item["score"], item["skill"]))
+    return scored
+
+
+def score_skills(text, taxonomy=None):
+    """
+    Score every taxonomy skill mentioned in the text. Returns a list of
+    {"skill", "score", "count", "section", "offset"} sorted by score.
+    """
+    taxonomy = taxonomy or skill_taxonomy.get_taxonomy()
+    key = (SCORING_VERSION, taxonomy.fingerprint, hashlib.sha256((text or "").encode("utf-8")).hexdigest())
+    scored = score_cache.get(key)
+    if scored is None:
+        scored = _score_all(text or "", taxonomy)
+        score_cache.set(key, scored)
+    return [dict(item) for item in scored]
+
+
+def scale(score, low, high):
+    """Map a 0-100 score onto the band [low, high]."""
+    return int(round(low + (high - low) * score / 100))
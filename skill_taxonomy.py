@@ -0,0 +1,164 @@
+"""
+Skill taxonomy shared by the ATS and job matching services.
+
+skill_taxonomy.json lists, one entry per line:
+- canonical skills, each with a category, aliases (synonyms) and "related"
+  technologies whose use is evidence of the skill (React for JavaScript,
+  Django for Python)
+- job roles with the keywords that identify them in a job description
+- prompt roles: the phrases that pick ats.py's role-specific resume
+  analysis prompt, checked in file order so the first listed role wins
+
+Taxonomy turns the file into lookup indexes once: synonym -> canonical name,
+skill -> related skills, keyword -> roles. It also compiles the skill and
+role keyword matchers. Lookups are dictionary reads and text is scanned in a
+single pass.
+
+get_taxonomy() returns the current snapshot. Every
+SKILL_TAXONOMY_RELOAD_INTERVAL seconds it checks the file's modification
+time, and it builds a new snapshot if the file has changed. The taxonomy can
+therefore be edited without restarting the services. A file that fails to
+load is reported and the previous snapshot stays in use.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from dotenv import load_dotenv
+from skill_matcher import SkillMatcher, normalize_term
+
+load_dotenv()
+
+SKILL_TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+)
+SKILL_TAXONOMY_RELOAD_INTERVAL = float(os.getenv("SKILL_TAXONOMY_RELOAD_INTERVAL", "30"))  # seconds; 0 disables
+
+
+class Taxonomy:
+    """Immutable snapshot of the taxonomy file with precomputed indexes."""
+
+    def __init__(self, data, source=None):
+        self.source = source
+        self.version = data.get("version")
+        # Identifies the content, so results computed against it can be cached
+        self.fingerprint = hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+        self.skills = {}
+        self.synonyms = {}
+        self.categories = {}
+        for entry in data.get("skills", []):
+            name = entry["name"]
+            self.skills[name] = entry
+            self.categories[name] = entry.get("category")
+            for term in [name] + entry.get("aliases", []):
+                self.synonyms.setdefault(normalize_term(term), name)
+
+        self.related_skills = {}
+        for name, entry in self.skills.items():
+            related = [self.synonyms.get(normalize_term(term)) for term in entry.get("related", [])]
+            self.related_skills[name] = tuple(skill for skill in related if skill and skill != name)
+
+        self.roles = [role["name"] for role in data.get("roles", [])]
+        self.role_keywords = {}
+        for role in data.get("roles", []):
+            for keyword in role.get("keywords", []):
+                roles = self.role_keywords.setdefault(normalize_term(keyword), [])
+                if role["name"] not in roles:
+                    roles.append(role["name"])
+
+        self.prompt_roles = [
+            (role["name"], tuple(phrase.lower() for phrase in role.get("phrases", [])))
+            for role in data.get("prompt_roles", [])
+        ]
+
+        self.matcher = SkillMatcher(data.get("skills", []))
+        self.role_matcher = SkillMatcher(list(self.role_keywords))
+
+    def canonical(self, term):
+        """Canonical skill name for a name or synonym, or None if unknown."""
+        return self.synonyms.get(normalize_term(term))
+
+    def related(self, name):
+        """Skills whose use counts as evidence of the given skill."""
+        return self.related_skills.get(name, ())
+
+    def find_skills(self, text):
+        """{canonical skill: {"count", "offsets"}} for every skill mentioned in the text."""
+        return self.matcher.find_all(text)
+
+    def detect_role(self, text, default=None):
+        """
+        The role with the most distinct keywords in the text. Ties go to the
+        role whose matched keywords are more specific (more words in total),
+        then to the one mentioned first, then by name; never by file order.
+        """
+        matches = {}
+        for keyword, start, _ in self.role_matcher.iter_matches(text):
+            for role in self.role_keywords[keyword]:
+                keywords, first = matches.get(role, (set(), start))
+                keywords.add(keyword)
+                matches[role] = (keywords, first)
+        if not matches:
+            return default
+        return min(matches, key=lambda role: (
+            -len(matches[role][0]),
+            -sum(len(keyword.split()) for keyword in matches[role][0]),
+            matches[role][1],
+            role
+        ))
+
+    def detect_prompt_role(self, text, default=None):
+        """The first prompt role, in file order, with a phrase contained in the text."""
+        text = (text or "").lower()
+        for role, phrases in self.prompt_roles:
+            if any(phrase in text for phrase in phrases):
+                return role
+        return default
+
+    def stats(self):
+        return {
+            "source": self.source,
+            "version": self.version,
+            "skills": len(self.skills),
+            "terms": len(self.synonyms),
+            "roles": len(self.roles)
+        }
+
+
+def load(path=SKILL_TAXONOMY_PATH):
+    with open(path, encoding="utf-8") as f:
+        return Taxonomy(json.load(f), source=path)
+
+
+_current = None
+_mtime = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def reload(path=SKILL_TAXONOMY_PATH):
+    """Load the file now and make it the current snapshot; returns it."""
+    global _current, _mtime, _checked_at
+    with _lock:
+        mtime = os.path.getmtime(path)
+        taxonomy = load(path)
+        _current, _mtime, _checked_at = taxonomy, mtime, time.monotonic()
+    print(f"Loaded skill taxonomy: {taxonomy.stats()['skills']} skills, {taxonomy.stats()['roles']} roles")
+    return taxonomy
+
+
+def get_taxonomy(path=SKILL_TAXONOMY_PATH):
+    """Return the current snapshot, reloading it if the file has changed."""
+    global _checked_at
+    if _current is None:
+        return reload(path)
+    if SKILL_TAXONOMY_RELOAD_INTERVAL and time.monotonic() - _checked_at >= SKILL_TAXONOMY_RELOAD_INTERVAL:
+        _checked_at = time.monotonic()
+        try:
+            if os.path.getmtime(path) != _mtime:
+                return reload(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Keeping the previous skill taxonomy; reload failed: {str(e)}")
+    return _current
@@ -0,0 +1,286 @@
+"""
+Durable MongoDB-backed work queue.
+
+The auth server enqueues work (for example, analysing a new application or
+writing feedback on a recruiter's decision) and the job matching service
+runs a bounded pool of workers that claim tasks with an atomic
+find-and-modify. Tasks are deduplicated by key, retried with
+exponential backoff and re-claimed when a worker dies mid-task, so nothing is
+lost if either process restarts.
+"""
+import os
+import time
+import uuid
+import socket
+import datetime
+import threading
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUEUE_COLLECTION = "task_queue"
+
+# Task types shared by the services
+TASK_ANALYSIS = "analysis"
+TASK_FEEDBACK = "feedback"
+TASK_INDEX = "index"
+
+# Task states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+TASK_RETRY_BASE_DELAY = float(os.getenv("TASK_RETRY_BASE_DELAY", "5"))  # seconds
+TASK_RETRY_MAX_DELAY = float(os.getenv("TASK_RETRY_MAX_DELAY", "600"))  # seconds
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "300"))
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", "1"))  # seconds
+
+
+def ensure_queue_indexes(db):
+    """Create the indexes used to claim tasks and report queue depth."""
+    db[QUEUE_COLLECTION].create_index([("status", 1), ("type", 1), ("available_at", 1)])
+    db[QUEUE_COLLECTION].create_index([("status", 1), ("lease_expires_at", 1)])
+
+
+def task_id(task_type, dedupe_key):
+    return f"{task_type}:{dedupe_key}"
+
+
+def enqueue(db, task_type, dedupe_key, payload, delay=0, max_attempts=TASK_MAX_ATTEMPTS):
+    """
+    Queue a task unless one with the same key is already waiting or running.
+    Finished or failed tasks with the same key are re-armed. Returns True if the
+    task was queued.
+    """
+    now = datetime.datetime.utcnow()
+    fields = {
+        "type": task_type,
+        "payload": payload,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "enqueued_at": now,
+        "available_at": now + datetime.timedelta(seconds=delay),
+        "lease_expires_at": None,
+        "last_error": None
+    }
+    try:
+        db[QUEUE_COLLECTION].insert_one({"_id": task_id(task_type, dedupe_key), **fields})
+        return True
+    except DuplicateKeyError:
+        result = db[QUEUE_COLLECTION].update_one(
+            {"_id": task_id(task_type, dedupe_key), "status": {"$in": [DONE, FAILED]}},
+            {"$set": fields}
+        )
+        return result.modified_count > 0
+
+
+def enqueue_many(db, task_type, tasks, delay=0, max_attempts=TASK_MAX_ATTEMPTS):
+    """
+    Queue several (dedupe_key, payload) tasks with one insert_many, re-arming
+    finished or failed duplicates with one bulk_write. Returns the number of
+    tasks queued.
+    """
+    if not tasks:
+        return 0
+    now = datetime.datetime.utcnow()
+    fields = {
+        "type": task_type,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "enqueued_at": now,
+        "available_at": now + datetime.timedelta(seconds=delay),
+        "lease_expires_at": None,
+        "last_error": None
+    }
+    documents = [{"_id": task_id(task_type, key), "payload": payload, **fields} for key, payload in tasks]
+    try:
+        db[QUEUE_COLLECTION].insert_many(documents, ordered=False)
+        return len(documents)
+    except BulkWriteError as e:
+        duplicates = {error["index"] for error in e.details.get("writeErrors", []) if error.get("code") == 11000}
+        if len(duplicates) < len(e.details.get("writeErrors", [])):
+            raise
+        queued = e.details.get("nInserted", 0)
+
+    operations = [
+        UpdateOne(
+            {"_id": documents[i]["_id"], "status": {"$in": [DONE, FAILED]}},
+            {"$set": {key: value for key, value in documents[i].items() if key != "_id"}}
+        )
+        for i in sorted(duplicates)
+    ]
+    return queued + db[QUEUE_COLLECTION].bulk_write(operations, ordered=False).modified_count
+
+
+def claim(db, task_types, worker_id, lease_seconds=TASK_LEASE_SECONDS):
+    """Atomically claim the oldest ready task, including tasks whose lease has expired."""
+    now = datetime.datetime.utcnow()
+    return db[QUEUE_COLLECTION].find_one_and_update(
+        {
+            "type": {"$in": list(task_types)},
+            "$or": [
+                {"status": QUEUED, "available_at": {"$lte": now}},
+                {"status": RUNNING, "lease_expires_at": {"$lte": now}}
+            ]
+        },
+        {
+            "$set": {
+                "status": RUNNING,
+                "started_at": now,
+                "lease_expires_at": now + datetime.timedelta(seconds=lease_seconds),
+                "worker": worker_id
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("available_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def complete(db, task):
+    db[QUEUE_COLLECTION].update_one(
+        {"_id": task["_id"], "worker": task.get("worker")},
+        {"$set": {"status": DONE, "finished_at": datetime.datetime.utcnow(), "lease_expires_at": None}}
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff for the given number of attempts so far."""
+    return min(TASK_RETRY_MAX_DELAY, TASK_RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)))
+
+
+def fail(db, task, error):
+    """Schedule a retry with backoff, or mark the task failed once attempts run out."""
+    now = datetime.datetime.utcnow()
+    attempts = task.get("attempts", 1)
+    if attempts >= task.get("max_attempts", TASK_MAX_ATTEMPTS):
+        update = {"status": FAILED, "finished_at": now, "lease_expires_at": None, "last_error": error}
+    else:
+        update = {
+            "status": QUEUED,
+            "available_at": now + datetime.timedelta(seconds=retry_delay(attempts)),
+            "lease_expires_at": None,
+            "last_error": error
+        }
+    db[QUEUE_COLLECTION].update_one({"_id": task["_id"], "worker": task.get("worker")}, {"$set": update})
+    return update["status"]
+
+
+def queue_stats(db):
+    """Report queue depth per type and state, and how long the oldest ready task has waited."""
+    now = datetime.datetime.utcnow()
+    stats = {}
+    pipeline = [
+        {"$group": {
+            "_id": {"type": "$type", "status": "$status"},
+            "count": {"$sum": 1},
+            "oldest_enqueued_at": {"$min": "$enqueued_at"}
+        }}
+    ]
+    for row in db[QUEUE_COLLECTION].aggregate(pipeline):
+        type_stats = stats.setdefault(row["_id"]["type"], {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0})
+        type_stats[row["_id"]["status"]] = row["count"]
+
+    for task_type, type_stats in stats.items():
+        oldest_ready = db[QUEUE_COLLECTION].find_one(
+            {"type": task_type, "status": QUEUED, "available_at": {"$lte": now}},
+            {"available_at": 1},
+            sort=[("available_at", 1)]
+        )
+        type_stats["depth"] = type_stats[QUEUED] + type_stats[RUNNING]
+        type_stats["lag_seconds"] = round((now - oldest_ready["available_at"]).total_seconds(), 3) if oldest_ready else 0.0
+    return stats
+
+
+class TaskWorkerPool:
+    """
+    Bounded pool of threads that claim and run queued tasks. failure_handlers
+    maps a task type to a callable(payload, error) that runs once a task of
+    that type has failed its last attempt.
+    """
+
+    def __init__(self, db, handlers, num_workers=4, poll_interval=TASK_POLL_INTERVAL, failure_handlers=None):
+        self.db = db
+        self.handlers = handlers
+        self.failure_handlers = failure_handlers or {}
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def started(self):
+        return self._started
+
+    def start(self):
+        """Start the workers, once per process. Never waits on the database."""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            self._stop.clear()
+            # A slow or unreachable server must not hold up the caller
+            thread = threading.Thread(target=self._ensure_indexes, name="task-queue-indexes")
+            thread.daemon = True
+            thread.start()
+            for i in range(self.num_workers):
+                thread = threading.Thread(target=self._run, args=(f"{self._prefix}:{i}",), name=f"task-worker-{i}")
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        print(f"Started {self.num_workers} task workers for: {', '.join(self.handlers)}")
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._started = False
+
+    def _ensure_indexes(self):
+        try:
+            ensure_queue_indexes(self.db)
+        except Exception as e:
+            print(f"Could not create task queue indexes: {str(e)}")
+
+    def _run(self, worker_name):
+        while not self._stop.is_set():
+            try:
+                task = claim(self.db, self.handlers.keys(), f"{worker_name}:{uuid.uuid4().hex[:8]}")
+            except Exception as e:
+                print(f"Task worker {worker_name} could not claim a task: {str(e)}")
+                self._stop.wait(self.poll_interval * 5)
+                continue
+
+            if not task:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self.run_task(task)
+
+    def run_task(self, task):
+        """Run one claimed task and record the outcome; returns the task's new status."""
+        started = time.monotonic()
+        try:
+            self.handlers[task["type"]](task["payload"])
+            complete(self.db, task)
+            print(f"Task {task['_id']} done in {time.monotonic() - started:.2f}s")
+            return DONE
+        except Exception as e:
+            status = fail(self.db, task, str(e))
+            print(f"Task {task['_id']} attempt {task.get('attempts')} failed: {str(e)} ({status})")
+            if status == FAILED and task["type"] in self.failure_handlers:
+                try:
+                    self.failure_handlers[task["type"]](task["payload"], str(e))
+                except Exception as hook_error:
+                    print(f"Failure handler for task {task['_id']} failed: {str(hook_error)}")
+            return status
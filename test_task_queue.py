@@ -0,0 +1,93 @@
+"""
+Queue behaviour of feedback tasks, run against mongomock:
+
+    pip install pytest mongomock
+    python -m pytest test_task_queue.py
+"""
+import os
+import datetime
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("ANALYSIS_WORKERS_AUTOSTART", "false")
+
+import task_queue
+import application_view
+import job_matching_ai
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = mongomock.MongoClient().jobmatchdb
+    monkeypatch.setattr(job_matching_ai, "db", database)
+    return database
+
+
+def test_feedback_task_that_runs_out_of_attempts_marks_feedback_failed(db, monkeypatch):
+    def gemini_down(prompt):
+        raise RuntimeError("Gemini unavailable")
+    monkeypatch.setattr(job_matching_ai, "generate_text", gemini_down)
+
+    application_id = db.applications.insert_one({
+        "status": "rejected",
+        "feedback_status": "queued",
+        "jobTitle": "Backend Developer",
+        "applicantId": "applicant-1",
+        "updated_at": datetime.datetime.utcnow()
+    }).inserted_id
+    task_queue.enqueue(
+        db,
+        task_queue.TASK_FEEDBACK,
+        f"{application_id}:rejected",
+        {"application_id": str(application_id), "status": "rejected", "notes": ""},
+        max_attempts=2
+    )
+    pool = task_queue.TaskWorkerPool(
+        db,
+        {task_queue.TASK_FEEDBACK: job_matching_ai.handle_feedback_task},
+        failure_handlers={task_queue.TASK_FEEDBACK: job_matching_ai.handle_feedback_failure}
+    )
+
+    statuses = []
+    for attempt in range(2):
+        # Make the retry due immediately instead of waiting out the backoff
+        db[task_queue.QUEUE_COLLECTION].update_many({}, {"$set": {"available_at": datetime.datetime.utcnow()}})
+        task = task_queue.claim(db, [task_queue.TASK_FEEDBACK], f"worker-{attempt}")
+        statuses.append(pool.run_task(task))
+        application = db.applications.find_one({"_id": application_id})
+        if attempt == 0:
+            assert application["feedback_status"] == "queued"
+
+    assert statuses == [task_queue.QUEUED, task_queue.FAILED]
+    assert db[task_queue.QUEUE_COLLECTION].find_one()["status"] == task_queue.FAILED
+    application = db.applications.find_one({"_id": application_id})
+    assert application["feedback_status"] == "failed"
+    assert "Gemini unavailable" in application["feedback_error"]
+    assert "rejection_feedback" not in application
+    assert db.notifications.count_documents({}) == 0
+
+
+def test_failure_handler_leaves_a_changed_decision_alone(db):
+    application_id = db.applications.insert_one({"status": "shortlisted", "feedback_status": "queued"}).inserted_id
+
+    job_matching_ai.handle_feedback_failure({"application_id": str(application_id), "status": "rejected"}, "boom")
+
+    assert db.applications.find_one({"_id": application_id})["feedback_status"] == "queued"
+
+
+def test_marking_feedback_queued_keeps_ready_feedback_and_other_decisions(db):
+    ready = db.applications.insert_one({
+        "status": "rejected", "feedback_status": "ready", "rejection_feedback": "Thank you for applying"
+    }).inserted_id
+    previous_decision = db.applications.insert_one({
+        "status": "rejected", "feedback_status": "ready", "acceptance_feedback": "Welcome aboard"
+    }).inserted_id
+    moved_on = db.applications.insert_one({"status": "shortlisted"}).inserted_id
+
+    application_view.mark_feedback_queued(db, [ready, previous_decision, moved_on], "rejected")
+
+    assert db.applications.find_one({"_id": ready})["feedback_status"] == "ready"
+    assert db.applications.find_one({"_id": previous_decision})["feedback_status"] == "queued"
+    assert "feedback_status" not in db.applications.find_one({"_id": moved_on})
@@ -0,0 +1,103 @@
+"""
+Cache of extracted resume text keyed by the SHA-256 of the resume content.
+
+Parsing PDFs and DOCX files is the most expensive local step of an analysis,
+and the same resume is parsed again on every analysis and reanalysis. Entries
+hold the normalized text, page count and extraction metadata in an in-memory
+LRU tier and, when a collection is given, in MongoDB. Every entry records the
+extractor version, so bumping EXTRACTOR_VERSION invalidates all entries
+produced by older extraction logic.
+"""
+import os
+import re
+import datetime
+import threading
+from dotenv import load_dotenv
+from llm_cache import LRUCache
+
+load_dotenv()
+
+# Bump whenever extraction or normalization changes the produced text
+EXTRACTOR_VERSION = "2"
+
+TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES", "256"))
+
+
+def normalize_text(text):
+    """Collapse runs of spaces and blank lines left behind by the extractors."""
+    text = text.replace("\x00", "")
+    lines = [re.sub(r"[ \t\f\v]+", " ", line).strip() for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+class TextCache:
+    """Extracted-text cache with an in-memory tier and an optional MongoDB tier."""
+
+    def __init__(self, collection=None, max_size=TEXT_CACHE_MAX_ENTRIES):
+        self.collection = collection
+        self.memory = LRUCache(max_size=max_size)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "persistent_hits": 0, "misses": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, content_hash):
+        entry = self.memory.get(content_hash)
+        if entry is not None:
+            self._count("hits")
+            return entry
+        if self.collection is not None:
+            try:
+                entry = self.collection.find_one({"_id": content_hash, "extractor_version": EXTRACTOR_VERSION})
+            except Exception as e:
+                print(f"Text cache read failed: {str(e)}")
+                entry = None
+            if entry:
+                self.memory.set(content_hash, entry)
+                self._count("persistent_hits")
+                return entry
+        self._count("misses")
+        return None
+
+    def put(self, content_hash, result, content_type=""):
+        text = normalize_text(result.get("text") or "")
+        entry = {
+            "_id": content_hash,
+            "text": text,
+            "char_count": len(text),
+            "page_count": result.get("page_count"),
+            "extractor": result.get("extractor", ""),
+            "extractor_version": EXTRACTOR_VERSION,
+            "content_type": content_type,
+            "extracted_at": datetime.datetime.utcnow()
+        }
+        self.memory.set(content_hash, entry)
+        if self.collection is not None:
+            try:
+                self.collection.replace_one({"_id": content_hash}, entry, upsert=True)
+            except Exception as e:
+                print(f"Text cache write failed: {str(e)}")
+        return entry
+
+    def get_or_extract(self, content_hash, extract, content_type=""):
+        """
+        Return the cached entry for this content, calling extract() on a miss.
+        extract() returns a dict with "text" and optionally "page_count" and
+        "extractor". Empty results are returned but not cached.
+        """
+        entry = self.get(content_hash)
+        if entry is not None:
+            return entry
+        result = extract()
+        if not (result.get("text") or "").strip():
+            return {"text": "", "page_count": result.get("page_count"), "extractor": result.get("extractor", "")}
+        return self.put(content_hash, result, content_type)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters["entries"] = len(self.memory)
+        counters["extractor_version"] = EXTRACTOR_VERSION
+        return counters